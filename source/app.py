@@ -2,6 +2,12 @@
 Module contenant l'interface utilisateur de la librairie `lib_taxi`.
 
 - les commandes `bouchons` et `travaux` permettent une interaction utilisateur spécifique pour recalculer ou non un trajet.
+- avec l'option `--journal` (ou la variable d'environnement `TAXIDRIVER_JOURNAL`), les modifications de la carte sont
+conservées d'une exécution à l'autre.
+- la commande `shell` enchaîne les commandes dans un même processus : la carte, son graphe et le cache des
+trajets restent en mémoire, et les modifications peuvent être annulées.
+- la commande `export` écrit les routes, les durées entre toutes les paires d'emplacements ou un lot de trajets
+dans un format en colonnes (Parquet, Arrow, NPZ ou JSON lines).
 
 Développé par :
     - Corentin Ducloux (https://github.com/CDucloux/)
@@ -13,21 +19,110 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import shlex
+import time
+from collections import deque
 import typer
 from rich import print
 from rich.table import Table
 from rich.markdown import Markdown
 from source import libtaxi as lt
 from source import libformat as lf
+from source import libtournee as ltr
+from source import libaffectation as la
+from source import libisochrone as li
+from source import libinstantane as lin
+from source import libcriticite as lc
+from source import libflux as lfx
+from source import libjournal as ljr
+from source import liboracle as lo
+from source import libexport as lex
 
 
 app = typer.Typer()
 
+DEPOT = lin.DepotVille(lt.CARTE_VILLE, cache=lt.CacheTrajets())
+"""Version courante de la carte de la ville, modifiée par les commandes `bouchons` et `travaux`."""
+
+JOURNAL: ljr.Journal | None = None
+"""Journal persistant des modifications, actif seulement si un dossier de journalisation est spécifié."""
+
+HISTORIQUE: deque[lt.Ville] = deque(maxlen=100)
+"""États précédents de la carte, pour annuler les dernières modifications (commande `shell`)."""
+
+SESSION = False
+"""Vrai pendant une session interactive : les commandes ne proposent pas de recalculer un trajet."""
+
+
+@app.callback()
+def principal(
+    journal: str = typer.Option(
+        None,
+        envvar="TAXIDRIVER_JOURNAL",
+        help="Dossier dans lequel les modifications de la carte sont conservées entre deux exécutions.",
+    )
+):
+    """Calcul d'itinéraires de taxi dans la ville."""
+    global JOURNAL
+    if journal is None:
+        JOURNAL = None
+        return
+    try:
+        JOURNAL = ljr.Journal(journal)
+        DEPOT.publie(JOURNAL.charge(lt.CARTE_VILLE))
+    except (OSError, ljr.JournalCorrompu) as e:
+        print(e)
+        raise typer.Exit(code=1)
+
+
+def _modifie(evenement: lfx.Evenement) -> None:
+    """Applique une modification à la carte courante puis la journalise si le journal est actif."""
+    precedente = DEPOT.ville
+    instantane = DEPOT.modifie(lambda ville: ljr.applique(evenement, ville))
+    HISTORIQUE.append(precedente)
+    if JOURNAL is not None:
+        JOURNAL.ajoute(evenement, instantane.ville)
+
+
+def _annule() -> None:
+    """Rétablit la carte précédant la dernière modification.
+
+    - Si le journal est actif, l'état rétabli est compacté dans l'instantané : il sera retrouvé
+    à la prochaine exécution
+    """
+    if not HISTORIQUE:
+        print("Aucune modification à annuler.")
+        return
+    precedente = HISTORIQUE.pop()
+    DEPOT.publie(precedente)
+    if JOURNAL is not None:
+        JOURNAL.compacte(precedente)
+    print(":leftwards_arrow_with_hook: Dernière modification annulée.")
+
+
+def _propose_trajet() -> None:
+    """Propose de recalculer un itinéraire après une modification de la carte (hors session)."""
+    if SESSION:
+        return
+    nouvel_itineraire = typer.prompt(
+        "Voulez-vous recalculer un nouvel itinéraire ? ",
+        type=bool,
+        prompt_suffix="",
+    )
+    if nouvel_itineraire:
+        depart = typer.prompt("Départ ", type=int)
+        arrivee = typer.prompt("Arrivée ", type=int)
+        graphe = typer.prompt("Graphe ", type=bool)
+        if graphe:
+            trajet(depart, arrivee, graphe=True)
+        else:
+            trajet(depart, arrivee)
+
 
 @app.command()
 def emplacements():
     """Affiche les emplacements desservis par le taxi."""
-    print(lf.format_emplacement(lt.CARTE_VILLE))
+    print(lf.format_emplacement(DEPOT.ville))
 
 
 @app.command()
@@ -38,9 +133,9 @@ def routes(graphe: bool = False):
     --graphe : Si vrai, affiche la carte de la ville sous forme de graphe, sinon sous forme de tableau.
     """
     if graphe:
-        print(lt.carte_graphe(lt.CARTE_VILLE))
+        print(lt.carte_graphe(DEPOT.ville))
     else:
-        print(lf.format_routes(lt.CARTE_VILLE))
+        print(lf.format_routes(DEPOT.ville))
 
 
 @app.command()
@@ -51,11 +146,12 @@ def trajet(depart: int, arrivee: int, graphe: bool = False):
     --graphe : Si vrai, affiche le trajet sous forme de graphe, sinon sous forme de sortie markdown.
     """
     resultat = None  # pour éviter les problèmes d'assignement du try except
+    instantane = DEPOT.instantane  # la même version sert au calcul et à l'affichage
     try:
-        resultat = lt.determine_trajet(
+        resultat = instantane.determine_trajet(
             depart=lt.Emplacement(nom=depart),
             arrivee=lt.Emplacement(nom=arrivee),
-            ville=lt.CARTE_VILLE,
+            cache=DEPOT.cache,
         )
     except lt.PasDeChemin as e:
         print(e)
@@ -65,12 +161,170 @@ def trajet(depart: int, arrivee: int, graphe: bool = False):
         print(e)
         pass
     if graphe:
-        print(lt.carte_graphe(lt.CARTE_VILLE, resultat))
+        print(lt.carte_graphe(instantane.ville, resultat))
     else:
         if resultat is None:
             pass
         else:
-            print(lf.format_trajet(resultat))
+            print(lf.format_trajet(resultat, instantane.ville))
+
+
+@app.command()
+def tournee(depart: int, arrets: list[int], retour: bool = False):
+    """Calcule l'ordre de visite le plus rapide de plusieurs arrêts depuis un départ.
+
+    Arguments:
+    --retour : Si vrai, le taxi revient au point de départ à la fin de la tournée.
+    """
+    try:
+        resultat = ltr.ordonne_tournee(
+            depart=lt.Emplacement(nom=depart),
+            arrets=[lt.Emplacement(nom=e) for e in arrets],
+            ville=DEPOT.ville,
+            retour=retour,
+        )
+    except lt.PasDeChemin as e:
+        print(e)
+    except lt.EmplacementInconnu as e:
+        print(e)
+    except lt.MemeEmplacement as e:
+        print(e)
+    else:
+        print(lf.format_tournee(resultat))
+
+
+@app.command()
+def taxis(client: int, stationnements: list[int], nombre: int = 1):
+    """Trouve les taxis les plus proches d'un client parmi les taxis stationnés.
+
+    Les taxis sont numérotés dans l'ordre des emplacements de stationnement spécifiés.
+
+    Arguments:
+    --nombre : Nombre de taxis les plus proches à afficher.
+    """
+    try:
+        resultat = la.taxis_proches(
+            client=lt.Emplacement(nom=client),
+            taxis={
+                f"Taxi {i}": lt.Emplacement(nom=e)
+                for i, e in enumerate(stationnements, start=1)
+            },
+            ville=DEPOT.ville,
+            nombre=nombre,
+        )
+    except lt.EmplacementInconnu as e:
+        print(e)
+    else:
+        if resultat:
+            print(lf.format_affectations(resultat))
+        else:
+            print(f"Aucun taxi ne peut rejoindre l'emplacement {client} !")
+
+
+@app.command()
+def isochrone(depart: int, durees: list[float], graphe: bool = False):
+    """Affiche les emplacements accessibles depuis un départ en moins des durées spécifiées.
+
+    Arguments:
+    --graphe : Si vrai, colore la carte de la ville selon les zones atteintes.
+    """
+    try:
+        zones = li.isochrones(
+            depart=lt.Emplacement(nom=depart), budgets=durees, ville=DEPOT.ville
+        )
+    except lt.EmplacementInconnu as e:
+        print(e)
+    except lt.DureeNegative as e:
+        print(e)
+    else:
+        if graphe:
+            print(
+                lt.carte_graphe(
+                    DEPOT.ville, isochrone=li.zones_isochrones(zones)
+                )
+            )
+        else:
+            print(lf.format_isochrones(lt.Emplacement(nom=depart), zones))
+
+
+@app.command()
+def criticite(nombre: int = 10, processus: int = None):
+    """Classe les routes selon l'impact de leur fermeture sur l'ensemble des trajets de la ville.
+
+    Arguments:
+    --nombre : Nombre de routes à afficher.
+    --processus : Nombre de processus utilisés pour le calcul (par défaut, un par processeur).
+    """
+    analyse = lc.analyse_criticite(DEPOT.ville, processus=processus)
+    print(lf.format_criticite(analyse, nombre))
+
+
+@app.command()
+def flux(fichier: str = "-", fenetre: float = 0.05, graphe: bool = False):
+    """Intègre un flux d'événements de trafic au format JSON lines (fichier ou entrée standard).
+
+    Arguments:
+    --fichier : Chemin du fichier d'événements, "-" pour l'entrée standard.
+    --fenetre : Durée (secondes) pendant laquelle les événements sont regroupés avant publication.
+    --graphe : Si vrai, affiche la carte de la ville mise à jour sous forme de graphe.
+    """
+    integration = lfx.FluxTrafic(DEPOT, fenetre=fenetre)
+    try:
+        if fichier == "-":
+            statistiques = integration.traite(sys.stdin)
+        else:
+            with open(fichier, encoding="utf-8") as lignes:
+                statistiques = integration.traite(lignes)
+    except OSError as e:
+        print(e)
+    else:
+        print(lf.format_flux(statistiques))
+        routes(graphe=graphe)
+
+
+@app.command()
+def oracle(fichier: str = None):
+    """Construit l'oracle des durées de trajet de la ville et affiche sa taille.
+
+    Arguments:
+    --fichier : Si spécifié, l'oracle est sauvegardé dans ce fichier (voir la commande `duree`).
+    """
+    debut = time.perf_counter()
+    resultat = lo.construit_oracle(DEPOT.ville)
+    construction = time.perf_counter() - debut
+    print(lf.format_oracle(resultat, construction))
+    if fichier is not None:
+        try:
+            resultat.sauvegarde(fichier)
+        except OSError as e:
+            print(e)
+        else:
+            print(f":floppy_disk: Oracle sauvegardé dans {fichier}")
+
+
+@app.command()
+def duree(depart: int, arrivee: int, oracle: str = None):
+    """Affiche la durée du trajet le plus court entre deux emplacements, sans calculer le chemin.
+
+    Arguments:
+    --oracle : Fichier d'un oracle sauvegardé par la commande `oracle`, sinon l'oracle est construit.
+    """
+    try:
+        if oracle is None:
+            index = lo.construit_oracle(DEPOT.ville)
+        else:
+            index = lo.charge_oracle(oracle)
+        resultat = index.duree(lt.Emplacement(nom=depart), lt.Emplacement(nom=arrivee))
+    except (OSError, lo.OracleCorrompu) as e:
+        print(e)
+    except lt.EmplacementInconnu as e:
+        print(e)
+    except lt.PasDeChemin as e:
+        print(e)
+    else:
+        print(
+            f":taxi: Le trajet le plus court entre {depart} et {arrivee} dure {resultat} minutes."
+        )
 
 
 @app.command()
@@ -82,13 +336,13 @@ def bouchons(depart: int, arrivee: int, duree: float, fluidification: bool = Fal
     """
     if fluidification:
         duree = -duree
+    evenement = lfx.Evenement(
+        type="bouchon" if duree >= 0 else "fluidification",
+        emplacements=(lt.Emplacement(nom=depart), lt.Emplacement(nom=arrivee)),
+        duree=abs(duree),
+    )
     try:
-        lt.CARTE_VILLE = lt.genere_bouchons(
-            lt.Emplacement(nom=depart),
-            lt.Emplacement(nom=arrivee),
-            duree=duree,
-            ville=lt.CARTE_VILLE,
-        )
+        _modifie(evenement)
     except lt.EmplacementInconnu as e:
         print(e)
     except lt.MemeEmplacement as e:
@@ -107,21 +361,7 @@ def bouchons(depart: int, arrivee: int, duree: float, fluidification: bool = Fal
             print(
                 f":warning: La route {depart}-{arrivee} a {duree} minutes de bouchons !"
             )
-        nouvel_itineraire = typer.prompt(
-            "Voulez-vous recalculer un nouvel itinéraire ? ",
-            type=bool,
-            prompt_suffix="",
-        )
-        if nouvel_itineraire:
-            dep_trajet_bouchon = typer.prompt("Départ ", type=int)
-            arr_trajet_bouchon = typer.prompt("Arrivée ", type=int)
-            graphe = typer.prompt("Graphe ", type=bool)
-            if graphe:
-                trajet(dep_trajet_bouchon, arr_trajet_bouchon, graphe=True)
-            else:
-                trajet(dep_trajet_bouchon, arr_trajet_bouchon)
-        else:
-            pass
+        _propose_trajet()
 
 
 @app.command()
@@ -129,8 +369,10 @@ def travaux(emplacements: list[int], duree: float):
     """Ajoute des travaux à certains emplacements de la ville."""
     liste_emplacements = [lt.Emplacement(nom=e) for e in emplacements]
     try:
-        lt.CARTE_VILLE = lt.genere_travaux(
-            emplacements=liste_emplacements, duree=duree, ville=lt.CARTE_VILLE
+        _modifie(
+            lfx.Evenement(
+                type="travaux", emplacements=tuple(liste_emplacements), duree=duree
+            )
         )
     except lt.EmplacementInconnu as e:
         print(e)
@@ -146,22 +388,114 @@ def travaux(emplacements: list[int], duree: float):
             print(
                 f":construction: Les emplacements {[x.nom for x in liste_emplacements]} sont en travaux ! Durée des travaux : {duree} minutes."
             )
-        lt.carte_graphe(travaux=liste_emplacements, ville=lt.CARTE_VILLE)
-        nouvel_itineraire = typer.prompt(
-            "Voulez-vous recalculer un nouvel itinéraire ? ",
-            type=bool,
-            prompt_suffix="",
-        )
-        if nouvel_itineraire:
-            dep_trajet_travaux = typer.prompt("Départ ", type=int)
-            arr_trajet_travaux = typer.prompt("Arrivée ", type=int)
-            graphe = typer.prompt("Graphe ", type=bool)
-            if graphe:
-                trajet(dep_trajet_travaux, arr_trajet_travaux, graphe=True)
+        lt.carte_graphe(travaux=liste_emplacements, ville=DEPOT.ville)
+        _propose_trajet()
+
+
+def _lit_paires(lignes):
+    """Couples (départ, arrivée) d'un fichier texte, un couple par ligne ("1 16" ou "1,16")."""
+    for ligne in lignes:
+        mots = ligne.replace(",", " ").split()
+        if not mots:
+            continue
+        if len(mots) != 2:
+            raise ValueError(f"Ligne invalide (départ et arrivée attendus) : {ligne.strip()}")
+        yield lt.Emplacement(nom=int(mots[0])), lt.Emplacement(nom=int(mots[1]))
+
+
+@app.command()
+def export(table: str, fichier: str, paires: str = "-"):
+    """Exporte une table de la ville dans un format en colonnes pour l'analyse.
+
+    Le format est déduit de l'extension du fichier : .parquet, .arrow (avec le paquet `pyarrow`),
+    .npz ou .jsonl. Sans `pyarrow`, un export Parquet ou Arrow est écrit au format .npz.
+
+    Arguments:
+    table : "routes" (routes de la carte), "durees" (durées entre toutes les paires
+    d'emplacements) ou "trajets" (trajets les plus courts des couples du fichier `--paires`).
+    --paires : Fichier des couples "départ arrivée" (un par ligne) pour la table "trajets",
+    "-" pour l'entrée standard.
+    """
+    ville = DEPOT.ville
+    try:
+        if table == "routes":
+            resultat = lex.exporte_routes(ville, fichier)
+        elif table == "durees":
+            resultat = lex.exporte_durees(ville, fichier)
+        elif table == "trajets":
+            if paires == "-":
+                resultat = lex.exporte_trajets(ville, _lit_paires(sys.stdin), fichier)
             else:
-                trajet(dep_trajet_travaux, arr_trajet_travaux)
+                with open(paires, encoding="utf-8") as lignes:
+                    resultat = lex.exporte_trajets(ville, _lit_paires(lignes), fichier)
         else:
-            pass
+            print(f"Table inconnue : {table} (routes, durees ou trajets)")
+            raise typer.Exit(code=1)
+    except (OSError, ValueError) as e:
+        print(e)
+    except lt.EmplacementInconnu as e:
+        print(e)
+    except lt.MemeEmplacement as e:
+        print(e)
+    else:
+        if resultat.chemin != fichier:
+            print(f"Le paquet pyarrow n'est pas installé, export au format {resultat.format}.")
+        print(
+            f":floppy_disk: {resultat.lignes} lignes exportées dans {resultat.chemin}"
+        )
+
+
+@app.command()
+def shell():
+    """Session interactive : enchaîne les commandes sur la même carte, gardée en mémoire.
+
+    - `trajet`, `bouchons`, `travaux`, `routes`... s'utilisent comme en ligne de commande
+    - `annule` annule la dernière modification de la carte, `aide` liste les commandes,
+    `quitte` (ou Ctrl-D) termine la session
+    - La durée d'exécution de chaque commande est affichée
+    """
+    global SESSION
+    commandes = typer.main.get_command(app).commands
+    disponibles = sorted(nom for nom in commandes if nom != "shell")
+    DEPOT.prechauffage = True  # le graphe de la carte modifiée est construit en arrière-plan
+    SESSION = True
+    try:
+        while True:
+            try:
+                ligne = input("taxi> ")
+            except EOFError:
+                break
+            try:
+                mots = shlex.split(ligne)
+            except ValueError as e:
+                print(e)
+                continue
+            if not mots:
+                continue
+            nom, arguments = mots[0], mots[1:]
+            if nom in ("quitte", "exit"):
+                break
+            debut = time.perf_counter()
+            if nom == "aide":
+                print(
+                    "Commandes : " + ", ".join(disponibles + ["annule", "aide", "quitte"])
+                )
+            elif nom == "annule":
+                _annule()
+            elif nom in disponibles:
+                try:
+                    commandes[nom].main(
+                        args=arguments, prog_name=nom, standalone_mode=True
+                    )
+                except SystemExit:
+                    pass  # fin normale de la commande ou erreur d'arguments déjà affichée
+            else:
+                print(f"Commande inconnue : {nom} (tapez `aide`)")
+                continue
+            print(f":stopwatch: {1000 * (time.perf_counter() - debut):.1f} ms")
+    finally:
+        SESSION = False
+        DEPOT.prechauffage = False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+"""# libaffectation
+
+`libaffectation` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de trouver les taxis les plus proches d'un client avec un unique parcours de Dijkstra
+depuis le client (les routes étant à double sens, c'est équivalent à une recherche depuis tous les
+taxis à la fois).
+- Il permet aussi d'affecter un ensemble de taxis à un ensemble de clients en minimisant la durée
+totale d'approche, à partir d'une table des durées (méthode hongroise).
+
+L'importation classique du module se fait comme suit ::
+
+    import libaffectation as la
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dataclasses import dataclass
+from source import libtaxi as lt
+
+
+@dataclass
+class Affectation:
+    """Représente l'affectation d'un taxi à un client.
+
+    `taxi`: identifiant du taxi
+    `client`: emplacement du client
+    `duree`: durée d'approche du taxi jusqu'au client
+    `itineraire`: trajet du taxi jusqu'au client, `None` si le taxi est déjà sur place
+
+    Exemple :
+    >>> Affectation(
+    ...     taxi="A", client=Emplacement(nom=3), duree=1.0,
+    ...     itineraire=Itineraire(etapes=[Emplacement(nom=6), Emplacement(nom=3)]),
+    ... )
+    """
+
+    taxi: str
+    client: lt.Emplacement
+    duree: float
+    itineraire: lt.Itineraire | None
+
+
+def _verifie_emplacements(emplacements: list[lt.Emplacement], ville: lt.Ville) -> None:
+    """Vérifie que les emplacements spécifiés existent dans la ville."""
+    for emplacement in emplacements:
+        if emplacement not in ville:
+            raise lt.EmplacementInconnu(
+                f"Attention, {emplacement} n'est pas un emplacement valide !"
+            )
+
+
+def _itineraire(chemin: list[lt.Emplacement]) -> lt.Itineraire | None:
+    """Construit l'itinéraire d'approche, `None` si le taxi est déjà chez le client."""
+    return lt.Itineraire(etapes=chemin) if len(chemin) > 1 else None
+
+
+def taxis_proches(
+    client: lt.Emplacement,
+    taxis: dict[str, lt.Emplacement],
+    ville: lt.Ville,
+    nombre: int = 1,
+) -> list[Affectation]:
+    """Détermine les `nombre` taxis les plus proches d'un client, du plus proche au plus éloigné.
+
+    - Un seul parcours de Dijkstra depuis le client, arrêté dès que `nombre` taxis sont atteints
+    - Plusieurs taxis peuvent stationner au même emplacement
+    - Les taxis non connectés au client ne sont jamais renvoyés
+
+    Exemple :
+
+    >>> taxis_proches(
+    ...     client=Emplacement(nom=3),
+    ...     taxis={"A": Emplacement(nom=16), "B": Emplacement(nom=6)},
+    ...     ville=CARTE_VILLE,
+    ... )
+    ... [Affectation(taxi='B', client=Emplacement(nom=3), duree=1.0, itineraire=...)]
+    """
+    if nombre < 1:
+        raise ValueError("Le nombre de taxis demandé doit être strictement positif.")
+    _verifie_emplacements([client, *taxis.values()], ville)
+
+    stationnements: dict[lt.Emplacement, list[str]] = {}
+    for taxi, emplacement in taxis.items():
+        stationnements.setdefault(emplacement, []).append(taxi)
+
+    G = lt._convertit_en_nx(ville)
+    predecesseurs: dict[lt.Emplacement, lt.Emplacement] = {}
+    resultat: list[Affectation] = []
+    for emplacement, duree in lt._parcours_dijkstra(G, client, predecesseurs):
+        if emplacement not in stationnements:
+            continue
+        chemin = lt._remonte_chemin(predecesseurs, client, emplacement)[::-1]
+        for taxi in stationnements[emplacement]:
+            resultat.append(
+                Affectation(
+                    taxi=taxi,
+                    client=client,
+                    duree=duree,
+                    itineraire=_itineraire(chemin),
+                )
+            )
+        if len(resultat) >= nombre:
+            break
+    return resultat[:nombre]
+
+
+def _methode_hongroise(couts: list[list[float]]) -> list[int]:
+    """Affectation de coût total minimal pour une matrice de `n` lignes et `m` colonnes (n <= m).
+
+    - Algorithme hongrois avec potentiels, complexité en O(n^2 * m)
+    - Renvoie pour chaque ligne l'indice de la colonne affectée
+    """
+    n, m = len(couts), len(couts[0])
+    infini = float("inf")
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    lignes = [0] * (m + 1)  # lignes[j] : ligne (indexée à partir de 1) affectée à la colonne j
+    chemin = [0] * (m + 1)
+    for i in range(1, n + 1):
+        lignes[0] = i
+        j0 = 0
+        minimums = [infini] * (m + 1)
+        utilisees = [False] * (m + 1)
+        while True:
+            utilisees[j0] = True
+            i0, delta, j1 = lignes[j0], infini, 0
+            for j in range(1, m + 1):
+                if utilisees[j]:
+                    continue
+                reduit = couts[i0 - 1][j - 1] - u[i0] - v[j]
+                if reduit < minimums[j]:
+                    minimums[j], chemin[j] = reduit, j0
+                if minimums[j] < delta:
+                    delta, j1 = minimums[j], j
+            for j in range(m + 1):
+                if utilisees[j]:
+                    u[lignes[j]] += delta
+                    v[j] -= delta
+                else:
+                    minimums[j] -= delta
+            j0 = j1
+            if lignes[j0] == 0:
+                break
+        while j0:
+            j1 = chemin[j0]
+            lignes[j0] = lignes[j1]
+            j0 = j1
+    affectation = [0] * n
+    for j in range(1, m + 1):
+        if lignes[j]:
+            affectation[lignes[j] - 1] = j - 1
+    return affectation
+
+
+def affecte_taxis(
+    clients: list[lt.Emplacement],
+    taxis: dict[str, lt.Emplacement],
+    ville: lt.Ville,
+) -> list[Affectation | None]:
+    """Affecte au plus un taxi à chaque client en minimisant la durée totale d'approche.
+
+    - La table des durées clients x taxis est construite directement : un parcours de Dijkstra
+    par client, arrêté dès que tous les emplacements des taxis sont atteints (les routes étant à
+    double sens, le trajet d'approche est le trajet du client vers le taxi, inversé)
+    - Renvoie une affectation par client, dans l'ordre des clients
+    - Un client reçoit `None` s'il n'y a pas assez de taxis ou si aucun taxi libre ne peut le rejoindre
+
+    Exemple :
+
+    >>> affecte_taxis(
+    ...     clients=[Emplacement(nom=3), Emplacement(nom=16)],
+    ...     taxis={"A": Emplacement(nom=15), "B": Emplacement(nom=6)},
+    ...     ville=CARTE_VILLE,
+    ... )
+    ... [Affectation(taxi='B', ...), Affectation(taxi='A', ...)]
+    """
+    if not clients or not taxis:
+        return [None] * len(clients)
+    _verifie_emplacements([*clients, *taxis.values()], ville)
+
+    identifiants = list(taxis)
+    G = lt._convertit_en_nx(ville)
+    stationnements = set(taxis.values())
+    parcours = {
+        client: lt._dijkstra(G, client, cibles=stationnements)
+        for client in dict.fromkeys(clients)
+    }
+    durees = [
+        [parcours[client][0].get(taxis[t], float("inf")) for t in identifiants]
+        for client in clients
+    ]
+
+    # Les couples non connectés reçoivent un coût plus élevé que toute affectation réalisable
+    finies = [d for ligne in durees for d in ligne if d != float("inf")]
+    penalite = sum(finies) + 1
+    couts = [[d if d != float("inf") else penalite for d in ligne] for ligne in durees]
+    transpose = len(clients) > len(identifiants)
+    if transpose:
+        couts = [list(colonne) for colonne in zip(*couts)]
+    colonnes = _methode_hongroise(couts)
+    paires = (
+        {client: taxi for taxi, client in enumerate(colonnes)}
+        if transpose
+        else dict(enumerate(colonnes))
+    )
+
+    resultat: list[Affectation | None] = []
+    for i, client in enumerate(clients):
+        j = paires.get(i)
+        if j is None or durees[i][j] == float("inf"):
+            resultat.append(None)
+            continue
+        taxi = identifiants[j]
+        chemin = lt._remonte_chemin(parcours[client][1], client, taxis[taxi])[::-1]
+        resultat.append(
+            Affectation(
+                taxi=taxi,
+                client=client,
+                duree=durees[i][j],
+                itineraire=_itineraire(chemin),
+            )
+        )
+    return resultat
@@ -0,0 +1,220 @@
+"""# libasynchrone
+
+`libasynchrone` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet d'appeler `libtaxi` depuis une application asyncio sans bloquer la boucle d'événements :
+le calcul des trajets est délégué à un exécuteur (threads ou processus).
+- Les requêtes identiques en cours de calcul sont regroupées en un seul calcul.
+- Le nombre de calculs simultanés et de requêtes en attente est borné (contre-pression).
+
+L'importation classique du module se fait comme suit ::
+
+    import libasynchrone as las
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from source import libtaxi as lt
+
+
+class SurchargeRoutage(Exception):
+    pass
+
+
+class RoutageAsynchrone:
+    """Calcul asynchrone des trajets sur un exécuteur de threads ou de processus.
+
+    `executeur`: exécuteur utilisé pour les calculs (par défaut, un pool de threads)
+    `max_en_cours`: nombre maximal de calculs confiés simultanément à l'exécuteur
+    `max_en_attente`: nombre maximal de calculs en attente d'une place, au-delà l'exception
+    SurchargeRoutage est levée immédiatement
+    `cache`: cache de trajets optionnel, consulté dans la boucle d'événements avant tout calcul
+
+    - Deux requêtes identiques (même version de ville, même départ, même arrivée) en cours au même
+    moment partagent un seul calcul
+    - Avec un pool de processus, la ville est transmise à chaque calcul : le cache reste dans le
+    processus de la boucle d'événements
+
+    Exemple :
+
+    >>> routage = RoutageAsynchrone(max_en_cours=4)
+    >>> await routage.determine_trajet(Emplacement(nom=2), Emplacement(nom=3), ville=village)
+    ... Itineraire(etapes=[Emplacement(nom=2), Emplacement(nom=4), Emplacement(nom=3)])
+    """
+
+    def __init__(
+        self,
+        executeur: Executor = None,
+        max_en_cours: int = 8,
+        max_en_attente: int = 256,
+        cache: lt.CacheTrajets = None,
+    ):
+        if max_en_cours < 1 or max_en_attente < 0:
+            raise ValueError("Les limites de calcul doivent être positives.")
+        self.executeur = executeur if executeur is not None else ThreadPoolExecutor()
+        self.max_en_cours = max_en_cours
+        self.max_en_attente = max_en_attente
+        self.cache = cache
+        self.calculs = 0
+        self.regroupements = 0
+        self._en_attente = 0
+        # les primitives asyncio sont liées à une boucle : un état par boucle d'événements
+        self._boucles: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _etat(self) -> tuple[asyncio.Semaphore, dict[tuple, asyncio.Future]]:
+        """Sémaphore des places de calcul et calculs en cours de la boucle courante."""
+        boucle = asyncio.get_running_loop()
+        if boucle not in self._boucles:
+            self._boucles[boucle] = (asyncio.Semaphore(self.max_en_cours), {})
+        return self._boucles[boucle]
+
+    @property
+    def en_attente(self) -> int:
+        """Nombre de calculs en attente d'une place auprès de l'exécuteur."""
+        return self._en_attente
+
+    async def _calcule(
+        self, depart: lt.Emplacement, arrivee: lt.Emplacement, ville: lt.Ville
+    ) -> lt.Itineraire:
+        """Confie un calcul à l'exécuteur dès qu'une place se libère."""
+        places, _ = self._etat()
+        if places.locked():
+            if self._en_attente >= self.max_en_attente:
+                raise SurchargeRoutage(
+                    "Attention, trop de trajets sont en attente de calcul !"
+                )
+            self._en_attente += 1
+            try:
+                await places.acquire()
+            finally:
+                self._en_attente -= 1
+        else:
+            await places.acquire()
+        try:
+            self.calculs += 1
+            boucle = asyncio.get_running_loop()
+            return await boucle.run_in_executor(
+                self.executeur, lt.determine_trajet, depart, arrivee, ville
+            )
+        finally:
+            places.release()
+
+    async def determine_trajet(
+        self, depart: lt.Emplacement, arrivee: lt.Emplacement, ville: lt.Ville
+    ) -> lt.Itineraire:
+        """Détermine de manière asynchrone le trajet le plus court entre deux emplacements.
+
+        - Les vérifications (emplacements inconnus, identiques) sont faites sans exécuteur
+        """
+        lt._determine_probleme(depart, arrivee, ville)
+        if self.cache is not None:
+            resultat = self.cache.cherche(ville, depart, arrivee)
+            if resultat is not None:
+                return resultat
+
+        _, en_cours = self._etat()
+        cle = (ville.version, depart.nom, arrivee.nom)
+        calcul = en_cours.get(cle)
+        if calcul is not None:
+            self.regroupements += 1
+        else:
+            calcul = asyncio.ensure_future(self._calcule(depart, arrivee, ville))
+            en_cours[cle] = calcul
+            calcul.add_done_callback(lambda _: en_cours.pop(cle, None))
+            if self.cache is not None:
+                calcul.add_done_callback(
+                    lambda fin: self._memorise(fin, ville, depart, arrivee)
+                )
+        # shield : l'annulation d'un demandeur n'annule pas le calcul partagé
+        resultat = await asyncio.shield(calcul)
+        return lt.Itineraire(etapes=list(resultat.etapes))
+
+    def _memorise(
+        self,
+        calcul: asyncio.Future,
+        ville: lt.Ville,
+        depart: lt.Emplacement,
+        arrivee: lt.Emplacement,
+    ) -> None:
+        if calcul.cancelled():
+            return
+        erreur = calcul.exception()
+        if erreur is None:
+            self.cache.ajoute(ville, depart, arrivee, calcul.result())
+        elif isinstance(erreur, lt.PasDeChemin):
+            self.cache.ajoute(ville, depart, arrivee, None)
+
+    async def determine_trajets(
+        self,
+        paires: list[tuple[lt.Emplacement, lt.Emplacement]],
+        ville: lt.Ville,
+        erreurs: bool = False,
+    ) -> list[lt.Itineraire | Exception]:
+        """Détermine de manière asynchrone les trajets de plusieurs couples (départ, arrivée).
+
+        - `erreurs` : si vrai, les exceptions sont renvoyées à la place des itinéraires concernés,
+        sinon la première exception est levée
+        """
+        return await asyncio.gather(
+            *(self.determine_trajet(depart, arrivee, ville) for depart, arrivee in paires),
+            return_exceptions=erreurs,
+        )
+
+
+_ROUTAGE_DEFAUT: RoutageAsynchrone | None = None
+
+
+def _routage_defaut() -> RoutageAsynchrone:
+    global _ROUTAGE_DEFAUT
+    if _ROUTAGE_DEFAUT is None:
+        _ROUTAGE_DEFAUT = RoutageAsynchrone()
+    return _ROUTAGE_DEFAUT
+
+
+async def determine_trajet_async(
+    depart: lt.Emplacement,
+    arrivee: lt.Emplacement,
+    ville: lt.Ville,
+    routage: RoutageAsynchrone = None,
+) -> lt.Itineraire:
+    """Équivalent asynchrone de `determine_trajet`.
+
+    - `routage` : configuration de l'exécuteur, par défaut un pool de threads partagé
+
+    Exemple :
+
+    >>> await determine_trajet_async(Emplacement(nom=2), Emplacement(nom=3), ville=village)
+    ... Itineraire(etapes=[Emplacement(nom=2), Emplacement(nom=4), Emplacement(nom=3)])
+    """
+    routage = routage if routage is not None else _routage_defaut()
+    return await routage.determine_trajet(depart, arrivee, ville)
+
+
+async def determine_trajets_async(
+    paires: list[tuple[lt.Emplacement, lt.Emplacement]],
+    ville: lt.Ville,
+    routage: RoutageAsynchrone = None,
+    erreurs: bool = False,
+) -> list[lt.Itineraire | Exception]:
+    """Équivalent asynchrone de plusieurs appels à `determine_trajet` sur la même ville.
+
+    Exemple :
+
+    >>> await determine_trajets_async(
+    ...     [(Emplacement(nom=2), Emplacement(nom=3)), (Emplacement(nom=3), Emplacement(nom=4))],
+    ...     ville=village,
+    ... )
+    ... [Itineraire(etapes=[...]), Itineraire(etapes=[...])]
+    """
+    routage = routage if routage is not None else _routage_defaut()
+    return await routage.determine_trajets(paires, ville, erreurs=erreurs)
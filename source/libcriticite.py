@@ -0,0 +1,235 @@
+"""# libcriticite
+
+`libcriticite` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de classer les routes et les emplacements de la ville selon leur importance, pour
+anticiper l'effet de bouchons ou de travaux :
+    - intermédiarité (algorithme de Brandes) : nombre de trajets les plus courts passant par une
+    route ou un emplacement
+    - impact de fermeture : augmentation de la somme des durées de tous les trajets de la ville si
+    la route est fermée, et nombre de trajets devenus impossibles
+- Les emplacements de départ sont répartis entre plusieurs processus.
+
+L'importation classique du module se fait comme suit ::
+
+    import libcriticite as lc
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from source import libtaxi as lt
+
+Adjacence = list[list[tuple[int, int, float]]]
+"""Pour chaque indice dense d'emplacement : liste de (voisin, indice de la route, durée)."""
+
+
+@dataclass
+class CriticiteRoute:
+    """Importance d'une route de la ville.
+
+    `depart`, `arrivee`: extrémités de la route
+    `intermediarite`: nombre (pondéré par la multiplicité des plus courts chemins) de trajets
+    optimaux entre deux emplacements qui empruntent la route
+    `impact`: augmentation de la somme des durées des trajets réalisables si la route est fermée
+    `paires_deconnectees`: nombre de trajets (non orientés) devenus impossibles si la route est fermée
+    """
+
+    depart: lt.Emplacement
+    arrivee: lt.Emplacement
+    intermediarite: float
+    impact: float
+    paires_deconnectees: int
+
+
+@dataclass
+class AnalyseCriticite:
+    """Résultat de l'analyse de criticité de la ville.
+
+    `routes`: routes de la plus critique à la moins critique (impact de fermeture puis intermédiarité)
+    `emplacements`: intermédiarité de chaque emplacement
+    """
+
+    routes: list[CriticiteRoute]
+    emplacements: dict[lt.Emplacement, float]
+
+
+def _adjacence(ville: lt.Ville) -> Adjacence:
+    """Construit les listes d'adjacence (sérialisables) de la ville à partir des tableaux denses.
+
+    - Le poids de `u` vers `v` est la durée de la route plus la pénalité de travaux de `v` :
+    les parcours comptent la pénalité de chaque emplacement traversé, sauf celle du départ
+    """
+    topologie = ville._topologie
+    penalites = ville._penalites
+    adjacence: Adjacence = [[] for _ in topologie.noms]
+    for k, (u, v, poids) in enumerate(
+        zip(topologie.depart, topologie.arrivee, ville._duree)
+    ):
+        adjacence[u].append((v, k, poids + penalites.get(v, 0.0)))
+        adjacence[v].append((u, k, poids + penalites.get(u, 0.0)))
+    return adjacence
+
+
+def _distances(adjacence: Adjacence, source: int, exclue: int = -1) -> list[float]:
+    """Dijkstra depuis `source` en ignorant la route d'indice `exclue`."""
+    infini = float("inf")
+    distances = [infini] * len(adjacence)
+    distances[source] = 0.0
+    tas = [(0.0, source)]
+    while tas:
+        d, u = heapq.heappop(tas)
+        if d > distances[u]:
+            continue
+        for v, k, poids in adjacence[u]:
+            if k != exclue and d + poids < distances[v]:
+                distances[v] = d + poids
+                heapq.heappush(tas, (d + poids, v))
+    return distances
+
+
+def _brandes(adjacence: Adjacence, source: int):
+    """Parcours de Brandes depuis `source`.
+
+    Renvoie les distances, les emplacements par distance croissante, le nombre de plus courts
+    chemins `sigma` et, pour chaque emplacement, ses prédécesseurs sous la forme (emplacement, route).
+    """
+    infini = float("inf")
+    n = len(adjacence)
+    distances = [infini] * n
+    sigma = [0] * n
+    predecesseurs: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+    ordre = []
+    distances[source], sigma[source] = 0.0, 1
+    definitifs = [False] * n
+    tas = [(0.0, source)]
+    while tas:
+        d, u = heapq.heappop(tas)
+        if definitifs[u]:
+            continue
+        definitifs[u] = True
+        ordre.append(u)
+        for v, k, poids in adjacence[u]:
+            nouvelle = d + poids
+            if nouvelle < distances[v]:
+                distances[v] = nouvelle
+                sigma[v] = sigma[u]
+                predecesseurs[v] = [(u, k)]
+                heapq.heappush(tas, (nouvelle, v))
+            elif nouvelle == distances[v] and not definitifs[v]:
+                sigma[v] += sigma[u]
+                predecesseurs[v].append((u, k))
+    return distances, ordre, sigma, predecesseurs
+
+
+_ADJACENCE: Adjacence = []
+"""Adjacence de la ville analysée, transmise une seule fois à chaque processus."""
+
+
+def _initialise(adjacence: Adjacence) -> None:
+    global _ADJACENCE
+    _ADJACENCE = adjacence
+
+
+def _analyse_sources(sources: list[int]):
+    """Contributions d'un lot d'emplacements de départ (exécuté dans un processus du pool).
+
+    - Intermédiarité : accumulation des dépendances de Brandes
+    - Impact : seules les routes du graphe des plus courts chemins depuis la source peuvent
+    allonger un trajet partant de cette source, on ne relance Dijkstra que pour celles-ci
+    """
+    adjacence = _ADJACENCE
+    n = len(adjacence)
+    m = 1 + max((k for voisins in adjacence for _, k, _ in voisins), default=-1)
+    inter_routes, inter_emplacements = [0.0] * m, [0.0] * n
+    impacts, deconnectees = [0.0] * m, [0] * m
+    for source in sources:
+        distances, ordre, sigma, predecesseurs = _brandes(adjacence, source)
+        dependance = [0.0] * n
+        for w in reversed(ordre):
+            for v, k in predecesseurs[w]:
+                c = sigma[v] / sigma[w] * (1 + dependance[w])
+                inter_routes[k] += c
+                dependance[v] += c
+            if w != source:
+                inter_emplacements[w] += dependance[w]
+
+        utilisees = {k for w in ordre for _, k in predecesseurs[w]}
+        for k in utilisees:
+            nouvelles = _distances(adjacence, source, exclue=k)
+            for t in ordre:
+                if nouvelles[t] == float("inf"):
+                    deconnectees[k] += 1
+                else:
+                    impacts[k] += nouvelles[t] - distances[t]
+    return inter_routes, inter_emplacements, impacts, deconnectees
+
+
+def analyse_criticite(ville: lt.Ville, processus: int = None) -> AnalyseCriticite:
+    """Calcule l'intermédiarité et l'impact de fermeture de toutes les routes de la ville.
+
+    - `processus` : nombre de processus du pool (par défaut, le nombre de processeurs),
+    avec `processus=1` le calcul se fait dans le processus courant
+    - Les paires d'emplacements ne sont comptées qu'une fois (routes à double sens)
+
+    Exemple :
+
+    >>> analyse = analyse_criticite(CARTE_VILLE)
+    >>> analyse.routes[0]
+    ... CriticiteRoute(depart=Emplacement(nom=...), arrivee=Emplacement(nom=...), ...)
+    """
+    adjacence = _adjacence(ville)
+    n = len(adjacence)
+    if processus is None:
+        processus = os.cpu_count() or 1
+    lots = [list(range(i, n, processus)) for i in range(min(processus, n))]
+
+    if processus == 1 or len(lots) <= 1:
+        _initialise(adjacence)
+        resultats = [_analyse_sources(lot) for lot in lots]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=len(lots), initializer=_initialise, initargs=(adjacence,)
+        ) as pool:
+            resultats = list(pool.map(_analyse_sources, lots))
+
+    topologie = ville._topologie
+    m = len(topologie.depart)
+    inter_routes, inter_emplacements = [0.0] * m, [0.0] * n
+    impacts, deconnectees = [0.0] * m, [0] * m
+    for routes, emplacements, impact, deconnexion in resultats:
+        for k in range(m):
+            inter_routes[k] += routes[k]
+            impacts[k] += impact[k]
+            deconnectees[k] += deconnexion[k]
+        for i in range(n):
+            inter_emplacements[i] += emplacements[i]
+
+    objets = topologie.objets
+    routes = [
+        CriticiteRoute(
+            depart=objets[topologie.depart[k]],
+            arrivee=objets[topologie.arrivee[k]],
+            intermediarite=inter_routes[k] / 2,
+            impact=impacts[k] / 2,
+            paires_deconnectees=deconnectees[k] // 2,
+        )
+        for k in range(m)
+    ]
+    routes.sort(
+        key=lambda r: (r.paires_deconnectees, r.impact, r.intermediarite),
+        reverse=True,
+    )
+    return AnalyseCriticite(
+        routes=routes,
+        emplacements={objets[i]: inter_emplacements[i] / 2 for i in range(n)},
+    )
@@ -0,0 +1,615 @@
+"""# libdifferentiel
+
+`libdifferentiel` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de vérifier que tous les moteurs de calcul de trajets (recherche networkx de
+`determine_trajet`, caches, requêtes asynchrones, matrice des durées, table de routage, oracle,
+routage régional...)
+trouvent des trajets aussi courts que la référence : un Dijkstra networkx indépendant.
+- Les villes sont générées aléatoirement à partir d'une graine (reproductibles) : tailles variées,
+villes non connexes (trajets impossibles), emplacements en travaux, coordonnées pour A*.
+- Pour chaque moteur et chaque couple d'emplacements, la durée est comparée à celle de la référence
+et l'itinéraire est vérifié (extrémités, routes existantes, pas de boucle, durée annoncée).
+- Une ville sur laquelle un moteur se trompe est réduite pas à pas (emplacements, routes, travaux,
+coordonnées, durées) jusqu'à une ville minimale sur laquelle il se trompe encore, affichée sous
+forme de code Python prêt à être collé dans un test.
+
+Les nouveaux moteurs s'ajoutent au dictionnaire `MOTEURS`.
+
+L'importation classique du module se fait comme suit ::
+
+    import libdifferentiel as ld
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import networkx as nx
+from source import libtaxi as lt
+from source import libinstantane as lin
+from source import libasynchrone as las
+from source import libroutage as lrt
+from source import liboracle as lo
+from source import libregion as lr
+from source import libaffectation as la
+from source import libexport as lex
+from source import libparcours as lp
+
+Reponse = tuple[float | None, list[lt.Emplacement] | None]
+"""Réponse d'un moteur : durée annoncée et étapes du trajet (None si le moteur ne les fournit
+pas)."""
+
+Requete = Callable[[lt.Emplacement, lt.Emplacement], Reponse]
+"""Calcul d'un trajet par un moteur préparé pour une ville (PasDeChemin si aucun trajet)."""
+
+Moteur = Callable[[lt.Ville], Requete]
+"""Préparation d'un moteur pour une ville (construction des tables, index, caches...)."""
+
+TOLERANCE = 1e-9
+"""Écart relatif (et absolu) toléré entre deux durées."""
+
+
+def _itineraire(itineraire: lt.Itineraire) -> Reponse:
+    return None, itineraire.etapes
+
+
+def _moteur_determine_trajet(ville: lt.Ville) -> Requete:
+    return lambda depart, arrivee: _itineraire(lt.determine_trajet(depart, arrivee, ville))
+
+
+def _variante(ville: lt.Ville) -> lt.Ville:
+    """Ville de même topologie aux durées modifiées : ses trajets ne doivent jamais être
+    réutilisés."""
+    if not ville.arretes:
+        return lt.genere_travaux(ville.emplacements[:1], 1.0, ville)
+    depart, arrivee, _ = ville.arretes[0]
+    return lt.genere_bouchons(depart, arrivee, 7.0, ville)
+
+
+def _moteur_cache(ville: lt.Ville) -> Requete:
+    """`determine_trajet` avec un petit cache (évictions fréquentes) déjà rempli par une autre
+    version."""
+    cache = lt.CacheTrajets(capacite=8)
+    variante = _variante(ville)
+    for depart, arrivee in zip(ville.emplacements, ville.emplacements[1:]):
+        try:
+            lt.determine_trajet(depart, arrivee, variante, cache=cache)
+        except lt.PasDeChemin:
+            pass
+
+    def requete(depart: lt.Emplacement, arrivee: lt.Emplacement) -> Reponse:
+        lt.determine_trajet(arrivee, depart, ville, cache=cache)
+        return _itineraire(lt.determine_trajet(depart, arrivee, ville, cache=cache))
+
+    return requete
+
+
+def _moteur_depot(ville: lt.Ville) -> Requete:
+    """Dépôt publié après une autre version, cache partagé entre les versions."""
+    depot = lin.DepotVille(_variante(ville), cache=lt.CacheTrajets())
+    emplacements = ville.emplacements
+    if len(emplacements) > 1:
+        try:
+            depot.determine_trajet(emplacements[0], emplacements[-1])
+        except lt.PasDeChemin:
+            pass
+    depot.publie(ville)
+    return lambda depart, arrivee: _itineraire(depot.determine_trajet(depart, arrivee))
+
+
+def _moteur_asynchrone(ville: lt.Ville) -> Requete:
+    """Tous les trajets demandés en même temps (`libasynchrone`), chacun deux fois.
+
+    - Les demandes identiques partagent un calcul, peu de calculs simultanés (attente bornée)
+    """
+    emplacements = ville.emplacements
+    paires = [(u, v) for u in emplacements for v in emplacements if u != v]
+    with ThreadPoolExecutor(max_workers=4) as executeur:
+        routage = las.RoutageAsynchrone(
+            executeur, max_en_cours=2, max_en_attente=2 * len(paires)
+        )
+        resultats = asyncio.run(
+            routage.determine_trajets(paires + paires, ville, erreurs=True)
+        )
+    trajets = dict(zip(paires + paires, resultats))
+
+    def requete(depart: lt.Emplacement, arrivee: lt.Emplacement) -> Reponse:
+        resultat = trajets[(depart, arrivee)]
+        if isinstance(resultat, Exception):
+            raise resultat
+        return _itineraire(resultat)
+
+    return requete
+
+
+def _moteur_matrice(ville: lt.Ville) -> Requete:
+    matrice = lt.matrice_durees(ville.emplacements, ville)
+    index = {e: i for i, e in enumerate(matrice.emplacements)}
+
+    def requete(depart: lt.Emplacement, arrivee: lt.Emplacement) -> Reponse:
+        i, j = index[depart], index[arrivee]
+        return matrice.durees[i][j], matrice.chemin(i, j)
+
+    return requete
+
+
+def _moteur_table(ville: lt.Ville) -> Requete:
+    table = lrt.construit_table(ville)
+    return lambda depart, arrivee: (
+        table.duree(depart, arrivee),
+        table.chemin(depart, arrivee).etapes,
+    )
+
+
+def _moteur_oracle(ville: lt.Ville) -> Requete:
+    oracle = lo.construit_oracle(ville)
+    return lambda depart, arrivee: (oracle.duree(depart, arrivee), None)
+
+
+def _moteur_regional(ville: lt.Ville) -> Requete:
+    routage = lr.RoutageRegional(ville, regions=3, processus=False)
+    return lambda depart, arrivee: _itineraire(routage.determine_trajet(depart, arrivee))
+
+
+def _moteur_taxis(ville: lt.Ville) -> Requete:
+    """Taxi stationné au départ, appelé par un client à l'arrivée."""
+
+    def requete(depart: lt.Emplacement, arrivee: lt.Emplacement) -> Reponse:
+        affectations = la.taxis_proches(arrivee, {"taxi": depart}, ville)
+        if not affectations:
+            raise lt.PasDeChemin(f"Aucun taxi ne rejoint {arrivee} depuis {depart} !")
+        return affectations[0].duree, affectations[0].itineraire.etapes
+
+    return requete
+
+
+def _moteur_export(ville: lt.Ville) -> Requete:
+    """Trajets exportés par lots (`libexport`)."""
+
+    def requete(depart: lt.Emplacement, arrivee: lt.Emplacement) -> Reponse:
+        (lot,) = lex.lots_trajets(ville, [(depart, arrivee)])
+        if lot["longueur"][0] == 0:
+            raise lt.PasDeChemin(f"Les emplacements {depart} et {arrivee} ne sont pas connectés !")
+        return float(lot["duree"][0]), [lt.Emplacement(nom=int(e)) for e in lot["etapes"]]
+
+    return requete
+
+
+def _moteur_delta(ville: lt.Ville) -> Requete:
+    """Delta-stepping vectorisé (`libparcours`), un arbre des trajets par départ."""
+    graphe = lp.graphe_csr(ville)
+    arbres = {}
+
+    def requete(depart: lt.Emplacement, arrivee: lt.Emplacement) -> Reponse:
+        i, j = ville._topologie.index[depart.nom], ville._topologie.index[arrivee.nom]
+        if i not in arbres:
+            arbres[i] = lp.arbre_delta(graphe, i)
+        distances, predecesseurs = arbres[i]
+        etapes = lp.chemin(predecesseurs, i, j)
+        return float(distances[j]), [lt.Emplacement(nom=int(graphe.noms[k])) for k in etapes]
+
+    return requete
+
+
+MOTEURS: dict[str, Moteur] = {
+    "determine_trajet": _moteur_determine_trajet,
+    "cache": _moteur_cache,
+    "depot": _moteur_depot,
+    "asynchrone": _moteur_asynchrone,
+    "matrice_durees": _moteur_matrice,
+    "table_routage": _moteur_table,
+    "oracle": _moteur_oracle,
+    "regional": _moteur_regional,
+    "taxis_proches": _moteur_taxis,
+    "export": _moteur_export,
+    "delta": _moteur_delta,
+}
+"""Moteurs comparés à la référence, par nom."""
+
+
+def ville_aleatoire(
+    graine: int,
+    emplacements: int = None,
+    composantes: int = None,
+) -> lt.Ville:
+    """Génère une ville aléatoire reproductible à partir de `graine`.
+
+    - `emplacements` : nombre d'emplacements (par défaut, tiré entre 2 et 24)
+    - `composantes` : nombre de groupes d'emplacements jamais reliés entre eux (par défaut, tiré au
+    hasard : une ville sur deux n'est pas connexe)
+    - Certains couples d'emplacements sont reliés par plusieurs routes (la ville garde la plus
+    rapide)
+    - Numéros d'emplacements non contigus, durées entières ou décimales, travaux sur certains
+    emplacements, coordonnées (recherche A*) pour une ville sur deux
+
+    Exemple :
+
+    >>> ville_aleatoire(3)
+    ... Ville(emplacements=[Emplacement(nom=412), ...], arretes=[...], travaux={...})
+    """
+    generateur = random.Random(graine)
+    n = emplacements if emplacements is not None else generateur.randint(2, 24)
+    k = composantes if composantes is not None else generateur.choice([1, 1, 2, 3])
+    noms = generateur.sample(range(1000), n)
+    lieux = [lt.Emplacement(nom=nom) for nom in noms]
+    groupes = [generateur.randrange(min(k, n)) for _ in range(n)]
+
+    arretes = []
+    for _ in range(generateur.randint(n - 1, 2 * n)):
+        u, v = generateur.randrange(n), generateur.randrange(n)
+        if u == v or groupes[u] != groupes[v]:
+            continue
+        if generateur.random() < 0.5:
+            duree = float(generateur.randint(1, 20))
+        else:
+            duree = round(generateur.uniform(0.1, 20.0), 1)
+        arretes.append((lieux[u], lieux[v], duree))
+
+    travaux = {
+        e: float(generateur.randint(1, 5)) for e in lieux if generateur.random() < 0.2
+    }
+    coordonnees = None
+    if generateur.random() < 0.5:
+        coordonnees = {
+            e: (generateur.uniform(0.0, 10.0), generateur.uniform(0.0, 10.0))
+            for e in lieux
+        }
+    return lt.Ville(
+        emplacements=lieux, arretes=arretes, coordonnees=coordonnees, travaux=travaux
+    )
+
+
+class _Reference:
+    """Durées de référence : Dijkstra networkx, une fois par emplacement de départ.
+
+    - Le poids d'une route est sa durée plus la pénalité de l'emplacement d'arrivée ; la pénalité
+    du départ est ajoutée ensuite
+    """
+
+    def __init__(self, ville: lt.Ville):
+        self.ville = ville
+        self.graphe = lt._convertit_en_nx(ville)
+        penalites = ville.travaux
+        self._poids = lambda u, v, attributs: attributs["duree"] + penalites.get(v, 0.0)
+        self._durees: dict[lt.Emplacement, dict[lt.Emplacement, float]] = {}
+
+    def duree(self, depart: lt.Emplacement, arrivee: lt.Emplacement) -> float | None:
+        """Durée du trajet le plus court, None si les emplacements ne sont pas reliés."""
+        if depart not in self._durees:
+            self._durees[depart] = nx.single_source_dijkstra_path_length(
+                self.graphe, depart, weight=self._poids
+            )
+        duree = self._durees[depart].get(arrivee)
+        return None if duree is None else duree + self.ville.penalite(depart)
+
+    def cout(self, etapes: list[lt.Emplacement]) -> float:
+        """Durée d'un itinéraire sur la ville, ValueError s'il n'est pas valide."""
+        if len(set(etapes)) != len(etapes):
+            raise ValueError("l'itinéraire passe deux fois par le même emplacement")
+        total = sum(self.ville.penalite(e) for e in etapes)
+        for u, v in zip(etapes, etapes[1:]):
+            if not self.graphe.has_edge(u, v):
+                raise ValueError(f"aucune route entre {u} et {v}")
+            total += self.graphe[u][v]["duree"]
+        return total
+
+
+def _proches(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=TOLERANCE, abs_tol=TOLERANCE)
+
+
+@dataclass
+class Ecart:
+    """Désaccord entre un moteur et la référence.
+
+    `moteur`: nom du moteur
+    `depart`, `arrivee`: couple d'emplacements concerné (None si la préparation du moteur a échoué)
+    `attendu`: durée de référence, None si les emplacements ne sont pas reliés
+    `message`: description du désaccord
+    """
+
+    moteur: str
+    depart: lt.Emplacement | None
+    arrivee: lt.Emplacement | None
+    attendu: float | None
+    message: str
+
+
+def _verifie_reponse(
+    reference: _Reference,
+    depart: lt.Emplacement,
+    arrivee: lt.Emplacement,
+    attendu: float,
+    reponse: Reponse,
+) -> str | None:
+    """Description du problème d'une réponse, None si elle est correcte."""
+    duree, etapes = reponse
+    if etapes is not None:
+        if len(etapes) < 2 or etapes[0] != depart or etapes[-1] != arrivee:
+            return f"itinéraire {[e.nom for e in etapes]} aux mauvaises extrémités"
+        try:
+            cout = reference.cout(etapes)
+        except ValueError as e:
+            return f"itinéraire {[e.nom for e in etapes]} invalide : {e}"
+        if duree is not None and not _proches(duree, cout):
+            return f"durée annoncée {duree} pour un itinéraire de {cout}"
+        duree = cout
+    if not _proches(duree, attendu):
+        return f"durée {duree} au lieu de {attendu}"
+    return None
+
+
+def compare(
+    ville: lt.Ville,
+    moteurs: dict[str, Moteur] = None,
+    paires: Iterable[tuple[lt.Emplacement, lt.Emplacement]] = None,
+) -> list[Ecart]:
+    """Compare les moteurs à la référence sur les couples d'emplacements `paires`.
+
+    - Par défaut, tous les moteurs de `MOTEURS` et tous les couples d'emplacements distincts
+    - Un moteur qui lève une exception inattendue est en désaccord avec la référence
+
+    Exemple :
+
+    >>> compare(ville_aleatoire(3))
+    ... []
+    """
+    moteurs = MOTEURS if moteurs is None else moteurs
+    if paires is None:
+        paires = [(u, v) for u in ville.emplacements for v in ville.emplacements if u != v]
+    else:
+        paires = list(paires)
+    reference = _Reference(ville)
+    ecarts = []
+    for nom, moteur in moteurs.items():
+        try:
+            requete = moteur(ville)
+        except Exception as e:
+            ecarts.append(Ecart(nom, None, None, None, f"préparation impossible : {e!r}"))
+            continue
+        for depart, arrivee in paires:
+            attendu = reference.duree(depart, arrivee)
+            try:
+                reponse = requete(depart, arrivee)
+            except lt.PasDeChemin:
+                if attendu is not None:
+                    ecarts.append(
+                        Ecart(nom, depart, arrivee, attendu, "pas de chemin trouvé")
+                    )
+                continue
+            except Exception as e:
+                ecarts.append(Ecart(nom, depart, arrivee, attendu, f"exception {e!r}"))
+                continue
+            if attendu is None:
+                message = "trajet trouvé entre des emplacements non reliés"
+            else:
+                message = _verifie_reponse(reference, depart, arrivee, attendu, reponse)
+            if message is not None:
+                ecarts.append(Ecart(nom, depart, arrivee, attendu, message))
+    return ecarts
+
+
+@dataclass
+class _Carte:
+    """Ingrédients d'une ville, modifiables pendant la réduction."""
+
+    emplacements: list[lt.Emplacement]
+    arretes: list[tuple[lt.Emplacement, lt.Emplacement, float]]
+    coordonnees: dict[lt.Emplacement, tuple[float, float]] = field(default_factory=dict)
+    travaux: dict[lt.Emplacement, float] = field(default_factory=dict)
+
+    def ville(self) -> lt.Ville:
+        presents = set(self.emplacements)
+        return lt.Ville(
+            emplacements=self.emplacements,
+            arretes=[a for a in self.arretes if a[0] in presents and a[1] in presents],
+            coordonnees={e: p for e, p in self.coordonnees.items() if e in presents},
+            travaux={e: p for e, p in self.travaux.items() if e in presents},
+        )
+
+
+def _sans_morceaux(elements: list, taille: int) -> Iterable[list]:
+    """Listes obtenues en retirant des morceaux consécutifs de `taille` éléments."""
+    for debut in range(0, len(elements), taille):
+        yield elements[:debut] + elements[debut + taille :]
+
+
+def reduit(ville: lt.Ville, echoue: Callable[[lt.Ville], bool]) -> lt.Ville:
+    """Réduit une ville tant que `echoue` reste vrai sur la ville réduite.
+
+    - Retire des emplacements (par moitiés, puis quarts... puis un par un) et leurs routes, des
+    routes, fusionne les extrémités de routes, retire les travaux et les coordonnées, puis
+    simplifie les durées (1 minute, puis entiers) et renumérote les emplacements à partir de 1
+    (chaque route part de son plus petit numéro)
+    - Recommence tant qu'une réduction réussit : aucun élément de la ville renvoyée ne peut être
+    retiré sans faire disparaître l'échec
+
+    Exemple :
+
+    >>> reduit(ville, lambda v: bool(compare(v, {"oracle": MOTEURS["oracle"]})))
+    ... Ville(emplacements=[Emplacement(nom=1), Emplacement(nom=2)], arretes=[...])
+    """
+    carte = _Carte(ville.emplacements, ville.arretes, ville.coordonnees, ville.travaux)
+
+    def essaie(candidate: _Carte) -> bool:
+        nonlocal carte
+        try:
+            ville = candidate.ville()
+            if not echoue(ville):
+                return False
+        except (ValueError, lt.MemeEmplacement, lt.EmplacementInconnu):
+            return False
+        # les routes, travaux et coordonnées des emplacements retirés disparaissent aussi
+        carte = _Carte(ville.emplacements, ville.arretes, ville.coordonnees, ville.travaux)
+        return True
+
+    def reduit_liste(attribut: str) -> bool:
+        reussi = False
+        taille = max(len(getattr(carte, attribut)) // 2, 1)
+        while taille >= 1 and getattr(carte, attribut):
+            for reste in _sans_morceaux(getattr(carte, attribut), taille):
+                if essaie(_Carte(**{**carte.__dict__, attribut: reste})):
+                    reussi = True
+                    break
+            else:
+                taille //= 2
+        return reussi
+
+    def contracte() -> bool:
+        """Fusionne les deux extrémités d'une route (raccourcit les cycles)."""
+        for u, v, longueur in carte.arretes:
+            if u == v:
+                continue
+            arretes = []
+            for a, b, duree in carte.arretes:
+                if v in (a, b):
+                    # les trajets passant par la route fusionnée gardent leur durée
+                    a, b, duree = (u if a == v else a), (u if b == v else b), duree + longueur
+                # les routes devenues multiples sont fusionnées par la ville (la plus rapide)
+                if a != b:
+                    arretes.append((a, b, duree))
+            candidate = _Carte(
+                [e for e in carte.emplacements if e != v],
+                arretes,
+                carte.coordonnees,
+                carte.travaux,
+            )
+            if essaie(candidate):
+                return True
+        return False
+
+    progres = True
+    while progres:
+        progres = reduit_liste("emplacements")
+        progres |= reduit_liste("arretes")
+        progres |= contracte()
+        for attribut in ("travaux", "coordonnees"):
+            if getattr(carte, attribut):
+                progres |= essaie(_Carte(**{**carte.__dict__, attribut: {}}))
+        for k, (u, v, duree) in enumerate(carte.arretes):
+            for simple in (1.0, float(max(round(duree), 1))):
+                if simple < duree or (simple != duree and simple == 1.0):
+                    arretes = list(carte.arretes)
+                    arretes[k] = (u, v, simple)
+                    if essaie(_Carte(**{**carte.__dict__, "arretes": arretes})):
+                        progres = True
+                        break
+        for emplacement, penalite in list(carte.travaux.items()):
+            if penalite != 1.0:
+                travaux = {**carte.travaux, emplacement: 1.0}
+                progres |= essaie(_Carte(**{**carte.__dict__, "travaux": travaux}))
+
+    nouveaux = {e: lt.Emplacement(nom=i) for i, e in enumerate(carte.emplacements, 1)}
+    arretes = [
+        (*sorted((nouveaux[u], nouveaux[v]), key=lambda e: e.nom), d)
+        for u, v, d in carte.arretes
+    ]
+    if list(nouveaux) != list(nouveaux.values()) or arretes != carte.arretes:
+        essaie(
+            _Carte(
+                emplacements=list(nouveaux.values()),
+                arretes=arretes,
+                coordonnees={nouveaux[e]: p for e, p in carte.coordonnees.items()},
+                travaux={nouveaux[e]: p for e, p in carte.travaux.items()},
+            )
+        )
+    return carte.ville()
+
+
+def reproduction(ville: lt.Ville) -> str:
+    """Code Python construisant `ville`, à coller dans un test.
+
+    Exemple :
+
+    >>> print(reproduction(ville))
+    ... Ville(
+    ...     emplacements=[Emplacement(nom=1), Emplacement(nom=2)],
+    ...     arretes=[(Emplacement(nom=1), Emplacement(nom=2), 1.0)],
+    ...     travaux={Emplacement(nom=2): 1.0},
+    ... )
+    """
+    lignes = [
+        "Ville(",
+        f"    emplacements={ville.emplacements!r},",
+        f"    arretes={ville.arretes!r},",
+    ]
+    if ville.coordonnees:
+        lignes.append(f"    coordonnees={ville.coordonnees!r},")
+    if ville.travaux:
+        lignes.append(f"    travaux={ville.travaux!r},")
+    lignes.append(")")
+    return "\n".join(lignes)
+
+
+@dataclass
+class Rapport:
+    """Échec d'un moteur sur une ville générée.
+
+    `graine`: graine de la ville générée (voir `ville_aleatoire`)
+    `moteur`: nom du moteur en désaccord avec la référence
+    `ecarts`: désaccords constatés sur la ville générée
+    `reduite`: plus petite ville trouvée sur laquelle le moteur est encore en désaccord
+    `ecarts_reduite`: désaccords constatés sur la ville réduite
+    """
+
+    graine: int
+    moteur: str
+    ecarts: list[Ecart]
+    reduite: lt.Ville
+    ecarts_reduite: list[Ecart]
+
+    def __str__(self) -> str:
+        details = "\n".join(
+            f"    {e.depart} => {e.arrivee} : {e.message}" for e in self.ecarts_reduite[:5]
+        )
+        return (
+            f"Moteur {self.moteur!r}, graine {self.graine} : {len(self.ecarts)} désaccord(s).\n"
+            f"Ville minimale :\n{reproduction(self.reduite)}\n{details}"
+        )
+
+
+def verifie(
+    graines: Iterable[int],
+    moteurs: dict[str, Moteur] = None,
+    **options,
+) -> list[Rapport]:
+    """Compare les moteurs à la référence sur une ville générée par graine.
+
+    - `options` : paramètres transmis à `ville_aleatoire`
+    - Chaque moteur en désaccord donne un rapport avec sa ville minimale
+
+    Exemple :
+
+    >>> for rapport in verifie(range(100)):
+    ...     print(rapport)
+    """
+    moteurs = MOTEURS if moteurs is None else moteurs
+    rapports = []
+    for graine in graines:
+        ville = ville_aleatoire(graine, **options)
+        ecarts = compare(ville, moteurs)
+        for nom in dict.fromkeys(e.moteur for e in ecarts):
+            moteur = {nom: moteurs[nom]}
+            reduite = reduit(ville, lambda v: bool(compare(v, moteur)))
+            rapports.append(
+                Rapport(
+                    graine=graine,
+                    moteur=nom,
+                    ecarts=[e for e in ecarts if e.moteur == nom],
+                    reduite=reduite,
+                    ecarts_reduite=compare(reduite, moteur),
+                )
+            )
+    return rapports
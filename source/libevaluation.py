@@ -0,0 +1,220 @@
+"""# libevaluation
+
+`libevaluation` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de recalculer en une seule fois la durée d'un grand nombre de trajets déjà effectués
+(audit des courses) sur l'état courant de la carte de la ville.
+- Les trajets sont rangés dans des tableaux NumPy plats (emplacements successifs et positions de
+début de chaque trajet), les durées des routes sont retrouvées par recherche dichotomique vectorisée.
+- Un tronçon qui ne correspond à aucune route de la ville est signalé, et le trajet concerné est
+marqué invalide au lieu de compter une durée nulle.
+
+L'importation classique du module se fait comme suit ::
+
+    import libevaluation as lev
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dataclasses import dataclass
+import numpy as np
+from source import libtaxi as lt
+
+
+class IndexRoutes:
+    """Index vectorisé des durées des routes de la ville.
+
+    - Les numéros d'emplacements sont convertis en indices denses par recherche dichotomique
+    - Chaque route est identifiée par la clé `min(i, j) * n + max(i, j)` de ses extrémités,
+    les clés sont triées pour une recherche dichotomique (routes à double sens)
+    - Une ville n'a qu'une route entre deux emplacements (les routes multiples sont fusionnées au
+    chargement)
+    - `penalites` : pénalité de travaux de chaque emplacement (indice dense)
+
+    Exemple :
+
+    >>> index = IndexRoutes(CARTE_VILLE)
+    >>> index.durees(np.array([1, 1]), np.array([2, 16]))
+    ... array([ 5., nan])
+    """
+
+    def __init__(self, ville: lt.Ville):
+        topologie = ville._topologie
+        noms = np.array(topologie.noms, dtype=np.int64)
+        self.n = len(noms)
+        self._ordre_noms = np.argsort(noms, kind="stable")
+        self._noms_tries = noms[self._ordre_noms]
+        depart = np.asarray(topologie.depart, dtype=np.int64)
+        arrivee = np.asarray(topologie.arrivee, dtype=np.int64)
+        cles = np.minimum(depart, arrivee) * self.n + np.maximum(depart, arrivee)
+        ordre = np.argsort(cles, kind="stable")
+        self._cles = cles[ordre]
+        self._durees = np.asarray(ville._duree, dtype=np.float64)[ordre]
+        self.penalites = np.zeros(self.n)
+        for i, penalite in ville._penalites.items():
+            self.penalites[i] = penalite
+
+    def indices(self, noms: np.ndarray) -> np.ndarray:
+        """Indices denses des emplacements `noms`, -1 pour un emplacement inconnu."""
+        noms = np.asarray(noms, dtype=np.int64)
+        if self.n == 0:
+            return np.full(noms.shape, -1, dtype=np.int64)
+        positions = np.searchsorted(self._noms_tries, noms)
+        positions = np.minimum(positions, self.n - 1)
+        connus = self._noms_tries[positions] == noms
+        return np.where(connus, self._ordre_noms[positions], -1)
+
+    def durees(self, depart: np.ndarray, arrivee: np.ndarray) -> np.ndarray:
+        """Durées des routes entre `depart[k]` et `arrivee[k]` (numéros), NaN si la route n'existe pas."""
+        i, j = self.indices(depart), self.indices(arrivee)
+        cles = np.minimum(i, j) * self.n + np.maximum(i, j)
+        resultat = np.full(cles.shape, np.nan)
+        if len(self._cles) == 0:
+            return resultat
+        positions = np.minimum(np.searchsorted(self._cles, cles), len(self._cles) - 1)
+        existe = (i >= 0) & (j >= 0) & (self._cles[positions] == cles)
+        resultat[existe] = self._durees[positions[existe]]
+        return resultat
+
+
+@dataclass
+class EvaluationTrajets:
+    """Durées recalculées d'un lot de trajets.
+
+    `durees`: durée totale de chaque trajet, NaN si le trajet emprunte une route inexistante
+    `valides`: vrai si tous les tronçons du trajet correspondent à une route de la ville
+    `durees_troncons`: durée de chaque tronçon (tous trajets confondus), NaN si la route n'existe pas
+    `debuts_troncons`: les tronçons du trajet `k` occupent les positions `debuts_troncons[k]` à
+    `debuts_troncons[k + 1]` de `durees_troncons`
+    """
+
+    durees: np.ndarray
+    valides: np.ndarray
+    durees_troncons: np.ndarray
+    debuts_troncons: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.durees)
+
+    def troncons(self, k: int) -> np.ndarray:
+        """Durées des tronçons du trajet `k`."""
+        return self.durees_troncons[self.debuts_troncons[k] : self.debuts_troncons[k + 1]]
+
+    @property
+    def invalides(self) -> np.ndarray:
+        """Positions des trajets empruntant au moins une route inexistante."""
+        return np.flatnonzero(~self.valides)
+
+
+def evalue_trajets_plats(
+    emplacements: np.ndarray,
+    debuts: np.ndarray,
+    ville: lt.Ville = None,
+    routes: IndexRoutes = None,
+) -> EvaluationTrajets:
+    """Recalcule la durée de trajets rangés dans des tableaux plats.
+
+    `emplacements`: numéros des emplacements successifs de tous les trajets, mis bout à bout
+    `debuts`: positions de début de chaque trajet dans `emplacements`, suivies de la longueur
+    totale (`len(debuts)` vaut le nombre de trajets plus un)
+
+    - `routes` : index déjà construit, pour évaluer plusieurs lots sur la même carte ; sinon il est
+    construit à partir de `ville`
+    - Un trajet d'un seul emplacement (ou vide) a une durée nulle
+    - Chaque emplacement en travaux traversé par un trajet ajoute sa pénalité à la durée totale
+    (`durees_troncons` ne contient que la durée des routes)
+
+    Exemple :
+
+    >>> evaluation = evalue_trajets_plats(
+    ...     np.array([1, 2, 5, 3, 1, 16]), np.array([0, 3, 6]), ville=CARTE_VILLE
+    ... )
+    >>> evaluation.durees, evaluation.valides
+    ... (array([ 8., nan]), array([ True, False]))
+    """
+    if routes is None:
+        if ville is None:
+            raise ValueError("Il faut spécifier la ville ou l'index de ses routes.")
+        routes = IndexRoutes(ville)
+    emplacements = np.asarray(emplacements, dtype=np.int64)
+    debuts = np.asarray(debuts, dtype=np.int64)
+    if (
+        debuts.ndim != 1
+        or len(debuts) == 0
+        or debuts[0] != 0
+        or debuts[-1] != len(emplacements)
+        or np.any(np.diff(debuts) < 0)
+    ):
+        raise ValueError("Les positions de début des trajets sont incohérentes.")
+
+    nombre = len(debuts) - 1
+    longueurs = np.diff(debuts)
+    nombres_troncons = np.maximum(longueurs - 1, 0)
+    # un couple d'emplacements consécutifs est un tronçon sauf s'il chevauche deux trajets
+    debut_trajet = np.zeros(len(emplacements), dtype=bool)
+    debut_trajet[debuts[:-1][longueurs > 0]] = True
+    troncon = ~debut_trajet[1:]
+    durees_troncons = routes.durees(emplacements[:-1][troncon], emplacements[1:][troncon])
+
+    trajet_du_troncon = np.repeat(np.arange(nombre), nombres_troncons)
+    # sans aucun tronçon, bincount renvoie des entiers même avec des poids flottants
+    invalides = np.bincount(
+        trajet_du_troncon, weights=np.isnan(durees_troncons), minlength=nombre
+    ).astype(np.float64)
+    durees = np.bincount(
+        trajet_du_troncon, weights=np.nan_to_num(durees_troncons), minlength=nombre
+    ).astype(np.float64)
+    if routes.penalites.any():
+        indices = routes.indices(emplacements)
+        penalites = np.where(indices >= 0, routes.penalites[indices], 0.0)
+        trajet_de_l_emplacement = np.repeat(np.arange(nombre), longueurs)
+        penalites *= (longueurs > 1)[trajet_de_l_emplacement]
+        durees += np.bincount(
+            trajet_de_l_emplacement, weights=penalites, minlength=nombre
+        ).astype(np.float64)
+    valides = invalides == 0
+    durees[~valides] = np.nan
+    debuts_troncons = np.zeros(nombre + 1, dtype=np.int64)
+    np.cumsum(nombres_troncons, out=debuts_troncons[1:])
+    return EvaluationTrajets(
+        durees=durees,
+        valides=valides,
+        durees_troncons=durees_troncons,
+        debuts_troncons=debuts_troncons,
+    )
+
+
+def evalue_trajets(
+    itineraires: list[lt.Itineraire],
+    ville: lt.Ville = None,
+    routes: IndexRoutes = None,
+) -> EvaluationTrajets:
+    """Recalcule la durée de plusieurs itinéraires sur la carte de la ville.
+
+    Exemple :
+
+    >>> evalue_trajets(
+    ...     [Itineraire(etapes=[Emplacement(nom=1), Emplacement(nom=2)])], ville=CARTE_VILLE
+    ... ).durees
+    ... array([5.])
+    """
+    longueurs = np.fromiter(
+        (len(itineraire.etapes) for itineraire in itineraires),
+        dtype=np.int64,
+        count=len(itineraires),
+    )
+    debuts = np.zeros(len(itineraires) + 1, dtype=np.int64)
+    np.cumsum(longueurs, out=debuts[1:])
+    emplacements = np.fromiter(
+        (etape.nom for itineraire in itineraires for etape in itineraire.etapes),
+        dtype=np.int64,
+        count=int(debuts[-1]),
+    )
+    return evalue_trajets_plats(emplacements, debuts, ville=ville, routes=routes)
@@ -0,0 +1,519 @@
+"""# libexport
+
+`libexport` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet d'exporter les routes de la ville, les durées des trajets les plus courts entre toutes
+les paires d'emplacements et les résultats d'un lot de trajets dans un format en colonnes, lisible
+directement par les outils d'analyse (pandas, polars, DuckDB, Spark...).
+- Formats disponibles, déduits de l'extension du fichier :
+    - `.parquet` (Parquet) et `.arrow` / `.feather` (Arrow IPC), si le paquet `pyarrow` est installé
+    - `.npz` (archive NumPy) et `.jsonl` (JSON lines), sans dépendance supplémentaire
+- Sans `pyarrow`, un export Parquet ou Arrow est écrit au format NPZ (extension remplacée).
+- Les lignes sont produites et écrites par lots : l'export de toutes les paires d'emplacements ne
+matérialise jamais la table complète en mémoire.
+
+Organisation d'une archive NPZ ::
+
+    depart/000000.npy, depart/000001.npy, ...    un tableau par colonne et par lot
+    arrivee/000000.npy, ...
+
+L'importation classique du module se fait comme suit ::
+
+    import libexport as lex
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import importlib.util
+import itertools
+import json
+import math
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+import numpy as np
+from source import libtaxi as lt
+from source import libcriticite as lc
+from source import libparcours as lp
+
+EXTENSIONS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".npz": "npz",
+    ".jsonl": "jsonl",
+}
+"""Format d'export associé à chaque extension de fichier."""
+
+TAILLE_LOT = 64
+"""Nombre d'emplacements de départ (export des durées) traités par lot."""
+
+TAILLE_LOT_LIGNES = 65536
+"""Nombre de lignes par lot pour l'export des routes et des trajets."""
+
+SEUIL_DELTA = 10000
+"""Nombre d'emplacements à partir duquel les durées sont calculées par delta-stepping (voir
+`libparcours.banc_essai`)."""
+
+Lot = dict[str, np.ndarray]
+"""Colonnes d'un lot de lignes : nom de colonne => tableau NumPy."""
+
+Schema = dict[str, type]
+"""Nom et type NumPy de chaque colonne, dans l'ordre."""
+
+SCHEMA_ROUTES: Schema = {"depart": np.int64, "arrivee": np.int64, "duree": np.float64}
+SCHEMA_DUREES: Schema = {"depart": np.int64, "arrivee": np.int64, "duree": np.float64}
+SCHEMA_TRAJETS: Schema = {
+    "depart": np.int64,
+    "arrivee": np.int64,
+    "duree": np.float64,
+    "longueur": np.int64,
+    "etapes": np.int64,
+}
+
+_LISTES = {"etapes": "longueur"}
+"""Colonnes de listes : dans un lot, les valeurs sont mises bout à bout et la colonne associée
+donne la longueur de la liste de chaque ligne."""
+
+
+def pyarrow_disponible() -> bool:
+    """Vrai si les formats Parquet et Arrow peuvent être écrits."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def format_export(chemin: str) -> tuple[str, str]:
+    """Détermine le format d'export d'après l'extension du fichier.
+
+    - Renvoie le chemin réellement écrit et le format
+    - Sans `pyarrow`, les formats Parquet et Arrow sont remplacés par NPZ
+    - Renvoie l'exception ValueError si l'extension n'est pas reconnue
+
+    Exemple :
+
+    >>> format_export("durees.parquet")
+    ... ('durees.parquet', 'parquet')
+    """
+    racine, extension = os.path.splitext(chemin)
+    format_ = EXTENSIONS.get(extension.lower())
+    if format_ is None:
+        raise ValueError(
+            f"Extension {extension!r} non reconnue, choisir parmi {', '.join(EXTENSIONS)}."
+        )
+    if format_ in ("parquet", "arrow") and not pyarrow_disponible():
+        return racine + ".npz", "npz"
+    return chemin, format_
+
+
+class _Ecrivain(ABC):
+    """Écriture d'un export lot par lot dans un fichier temporaire, renommé à la fermeture.
+
+    - Chaque format définit `_ecrit` et `_ferme`
+    """
+
+    def __init__(self, chemin: str, schema: Schema):
+        self.chemin = chemin
+        self.schema = schema
+        self.temporaire = chemin + ".tmp"
+        self.lots = 0
+        self.lignes = 0
+
+    def ecrit(self, lot: Lot) -> None:
+        self._ecrit(lot)
+        self.lots += 1
+        self.lignes += len(next(iter(lot.values()))) if lot else 0
+
+    @abstractmethod
+    def _ecrit(self, lot: Lot) -> None:
+        """Ajoute un lot au fichier temporaire."""
+
+    @abstractmethod
+    def _ferme(self) -> None:
+        """Termine et ferme le fichier temporaire."""
+
+    def ferme(self) -> None:
+        if self.lots == 0:
+            # un export vide garde ses colonnes et leurs types
+            self._ecrit({nom: np.empty(0, dtype=type_) for nom, type_ in self.schema.items()})
+        self._ferme()
+        os.replace(self.temporaire, self.chemin)
+
+    def abandonne(self) -> None:
+        try:
+            self._ferme()
+        finally:
+            if os.path.exists(self.temporaire):
+                os.remove(self.temporaire)
+
+
+class _EcrivainArrow(_Ecrivain):
+    """Parquet (un groupe de lignes par lot) ou Arrow IPC (un lot Arrow par lot)."""
+
+    def __init__(self, chemin: str, schema: Schema, parquet: bool):
+        super().__init__(chemin, schema)
+        import pyarrow as pa
+
+        self._pa = pa
+        self._schema_arrow = pa.schema(
+            [
+                (
+                    nom,
+                    pa.list_(pa.from_numpy_dtype(type_))
+                    if nom in _LISTES
+                    else pa.from_numpy_dtype(type_),
+                )
+                for nom, type_ in schema.items()
+            ]
+        )
+        if parquet:
+            import pyarrow.parquet as pq
+
+            self._fichier = None
+            self._sortie = pq.ParquetWriter(self.temporaire, self._schema_arrow)
+            self._ecrit_lot = lambda lot: self._sortie.write_table(
+                pa.Table.from_batches([lot])
+            )
+        else:
+            self._fichier = pa.OSFile(self.temporaire, "wb")
+            self._sortie = pa.ipc.new_file(self._fichier, self._schema_arrow)
+            self._ecrit_lot = self._sortie.write_batch
+
+    def _ecrit(self, lot: Lot) -> None:
+        pa = self._pa
+        colonnes = []
+        for nom in self.schema:
+            if nom in _LISTES:
+                positions = np.zeros(len(lot[_LISTES[nom]]) + 1, dtype=np.int32)
+                np.cumsum(lot[_LISTES[nom]], out=positions[1:])
+                colonnes.append(pa.ListArray.from_arrays(positions, lot[nom]))
+            else:
+                colonnes.append(pa.array(lot[nom]))
+        self._ecrit_lot(pa.record_batch(colonnes, schema=self._schema_arrow))
+
+    def _ferme(self) -> None:
+        self._sortie.close()
+        if self._fichier is not None:
+            self._fichier.close()
+
+
+class _EcrivainNpz(_Ecrivain):
+    """Archive NPZ : chaque lot ajoute un tableau par colonne, sans relire les précédents."""
+
+    def __init__(self, chemin: str, schema: Schema):
+        super().__init__(chemin, schema)
+        self._archive = zipfile.ZipFile(self.temporaire, "w", allowZip64=True)
+
+    def _ecrit(self, lot: Lot) -> None:
+        for nom in self.schema:
+            with self._archive.open(
+                f"{nom}/{self.lots:06d}.npy", "w", force_zip64=True
+            ) as fichier:
+                np.lib.format.write_array(
+                    fichier, np.ascontiguousarray(lot[nom]), allow_pickle=False
+                )
+
+    def _ferme(self) -> None:
+        self._archive.close()
+
+
+def _valeur_json(valeur):
+    """Valeur JSON d'une case : les durées infinies (emplacements non connectés) valent null."""
+    valeur = valeur.item()
+    if isinstance(valeur, float) and not math.isfinite(valeur):
+        return None
+    return valeur
+
+
+class _EcrivainJsonl(_Ecrivain):
+    """JSON lines : un objet par ligne, les colonnes de listes sont des listes JSON."""
+
+    def __init__(self, chemin: str, schema: Schema):
+        super().__init__(chemin, schema)
+        self._fichier = open(self.temporaire, "w", encoding="utf-8")
+
+    def _ecrit(self, lot: Lot) -> None:
+        listes = {}
+        for nom, longueur in _LISTES.items():
+            if nom in self.schema:
+                listes[nom] = np.split(lot[nom], np.cumsum(lot[longueur])[:-1])
+        simples = [nom for nom in self.schema if nom not in listes]
+        lignes = []
+        for k in range(len(lot[simples[0]])):
+            ligne = {nom: _valeur_json(lot[nom][k]) for nom in simples}
+            for nom, valeurs in listes.items():
+                ligne[nom] = valeurs[k].tolist()
+            lignes.append(json.dumps(ligne) + "\n")
+        self._fichier.writelines(lignes)
+
+    def _ferme(self) -> None:
+        self._fichier.close()
+
+
+@dataclass
+class ResultatExport:
+    """Bilan d'un export.
+
+    `chemin`: fichier réellement écrit (l'extension change si le format a été remplacé)
+    `format`: format du fichier ("parquet", "arrow", "npz" ou "jsonl")
+    `lignes`: nombre de lignes exportées
+    `lots`: nombre de lots écrits
+    """
+
+    chemin: str
+    format: str
+    lignes: int
+    lots: int
+
+
+def exporte(lots: Iterable[Lot], schema: Schema, chemin: str) -> ResultatExport:
+    """Écrit des lots de lignes au fur et à mesure de leur production.
+
+    - Le format est déduit de l'extension de `chemin` (voir `format_export`)
+    - Le fichier est écrit à côté puis renommé : un lecteur ne voit jamais d'export partiel
+    - Seul le lot en cours est en mémoire
+
+    Exemple :
+
+    >>> exporte(lots_routes(CARTE_VILLE), SCHEMA_ROUTES, "routes.jsonl")
+    ... ResultatExport(chemin='routes.jsonl', format='jsonl', lignes=29, lots=1)
+    """
+    chemin, format_ = format_export(chemin)
+    if format_ in ("parquet", "arrow"):
+        ecrivain = _EcrivainArrow(chemin, schema, parquet=format_ == "parquet")
+    elif format_ == "npz":
+        ecrivain = _EcrivainNpz(chemin, schema)
+    else:
+        ecrivain = _EcrivainJsonl(chemin, schema)
+    try:
+        for lot in lots:
+            ecrivain.ecrit(lot)
+    except BaseException:
+        ecrivain.abandonne()
+        raise
+    ecrivain.ferme()
+    return ResultatExport(
+        chemin=chemin, format=format_, lignes=ecrivain.lignes, lots=ecrivain.lots
+    )
+
+
+def lots_routes(ville: lt.Ville, taille: int = TAILLE_LOT_LIGNES) -> Iterator[Lot]:
+    """Routes de la ville (`ville.arretes`), par lots de `taille` routes."""
+    topologie = ville._topologie
+    noms = np.asarray(topologie.noms, dtype=np.int64)
+    depart = noms[np.asarray(topologie.depart, dtype=np.int64)]
+    arrivee = noms[np.asarray(topologie.arrivee, dtype=np.int64)]
+    duree = np.asarray(ville._duree, dtype=np.float64)
+    for debut in range(0, len(duree), taille):
+        fin = debut + taille
+        yield {
+            "depart": depart[debut:fin],
+            "arrivee": arrivee[debut:fin],
+            "duree": duree[debut:fin],
+        }
+
+
+def lots_durees(
+    ville: lt.Ville,
+    emplacements: list[lt.Emplacement] = None,
+    taille: int = TAILLE_LOT,
+) -> Iterator[Lot]:
+    """Durées des trajets les plus courts entre toutes les paires d'emplacements, par lots.
+
+    - `emplacements` : restreint les départs et les arrivées à ces emplacements (par défaut, tous)
+    - Un lot contient les durées depuis `taille` emplacements de départ (un parcours chacun)
+    - À partir de `SEUIL_DELTA` emplacements, les parcours utilisent le delta-stepping vectorisé
+    de `libparcours` plutôt que le Dijkstra à tas
+    - Les paires non connectées et les paires d'un emplacement avec lui-même ne sont pas exportées
+    - Les durées comptent les pénalités de travaux, comme `duree_trajet`
+    """
+    topologie = ville._topologie
+    noms = np.asarray(topologie.noms, dtype=np.int64)
+    if emplacements is None:
+        indices = np.arange(len(noms))
+    else:
+        for emplacement in emplacements:
+            if emplacement not in ville:
+                raise lt.EmplacementInconnu(
+                    f"Attention, {emplacement} n'est pas un emplacement valide !"
+                )
+        indices = np.unique(
+            np.fromiter(
+                (topologie.index[e.nom] for e in emplacements),
+                dtype=np.int64,
+                count=len(emplacements),
+            )
+        )
+    if len(noms) >= SEUIL_DELTA:
+        graphe = lp.graphe_csr(ville)
+        parcours = lambda i: lp.distances_delta(graphe, i)
+    else:
+        adjacence = lc._adjacence(ville)
+        parcours = lambda i: (
+            np.asarray(lc._distances(adjacence, i)) + ville._penalites.get(i, 0.0)
+        )
+    for debut in range(0, len(indices), taille):
+        departs, arrivees, durees = [], [], []
+        for i in indices[debut : debut + taille]:
+            distances = parcours(int(i))[indices]
+            atteints = np.isfinite(distances) & (indices != i)
+            departs.append(np.full(int(atteints.sum()), noms[i]))
+            arrivees.append(noms[indices[atteints]])
+            durees.append(distances[atteints])
+        yield {
+            "depart": np.concatenate(departs),
+            "arrivee": np.concatenate(arrivees),
+            "duree": np.concatenate(durees),
+        }
+
+
+def lots_trajets(
+    ville: lt.Ville,
+    paires: Iterable[tuple[lt.Emplacement, lt.Emplacement]],
+    taille: int = TAILLE_LOT_LIGNES,
+) -> Iterator[Lot]:
+    """Trajets les plus courts d'un lot de paires (départ, arrivée), par lots de `taille` paires.
+
+    - `paires` peut être un générateur : les paires sont consommées au fil de l'export
+    - Dans un lot, un seul Dijkstra est lancé par emplacement de départ distinct
+    - Un trajet impossible a une durée infinie et aucune étape
+    - Renvoie les exceptions EmplacementInconnu ou MemeEmplacement pour une paire invalide
+    """
+    G = lt._convertit_en_nx(ville)
+    paires = iter(paires)
+    while lot := list(itertools.islice(paires, taille)):
+        cibles: dict[lt.Emplacement, set[lt.Emplacement]] = {}
+        for depart, arrivee in lot:
+            lt._determine_probleme(depart, arrivee, ville)
+            cibles.setdefault(depart, set()).add(arrivee)
+        parcours = {
+            depart: lt._dijkstra(G, depart, cibles=arrivees)
+            for depart, arrivees in cibles.items()
+        }
+        durees = np.empty(len(lot))
+        longueurs = np.zeros(len(lot), dtype=np.int64)
+        etapes = []
+        for k, (depart, arrivee) in enumerate(lot):
+            atteints, predecesseurs = parcours[depart]
+            if arrivee not in atteints:
+                durees[k] = math.inf
+                continue
+            durees[k] = atteints[arrivee]
+            chemin = lt._remonte_chemin(predecesseurs, depart, arrivee)
+            longueurs[k] = len(chemin)
+            etapes.extend(e.nom for e in chemin)
+        yield {
+            "depart": np.fromiter((d.nom for d, _ in lot), dtype=np.int64, count=len(lot)),
+            "arrivee": np.fromiter((a.nom for _, a in lot), dtype=np.int64, count=len(lot)),
+            "duree": durees,
+            "longueur": longueurs,
+            "etapes": np.array(etapes, dtype=np.int64),
+        }
+
+
+def exporte_routes(ville: lt.Ville, chemin: str) -> ResultatExport:
+    """Exporte les routes de la ville : colonnes `depart`, `arrivee`, `duree`.
+
+    Exemple :
+
+    >>> exporte_routes(CARTE_VILLE, "routes.parquet").lignes
+    ... 29
+    """
+    return exporte(lots_routes(ville), SCHEMA_ROUTES, chemin)
+
+
+def exporte_durees(
+    ville: lt.Ville,
+    chemin: str,
+    emplacements: list[lt.Emplacement] = None,
+    taille: int = TAILLE_LOT,
+) -> ResultatExport:
+    """Exporte les durées entre toutes les paires d'emplacements : colonnes `depart`, `arrivee`, `duree`.
+
+    - Voir `lots_durees` pour les paramètres
+
+    Exemple :
+
+    >>> exporte_durees(CARTE_VILLE, "durees.npz").lignes
+    ... 240
+    """
+    return exporte(lots_durees(ville, emplacements, taille), SCHEMA_DUREES, chemin)
+
+
+def exporte_trajets(
+    ville: lt.Ville,
+    paires: Iterable[tuple[lt.Emplacement, lt.Emplacement]],
+    chemin: str,
+    taille: int = TAILLE_LOT_LIGNES,
+) -> ResultatExport:
+    """Exporte les trajets les plus courts d'un lot de paires.
+
+    - Colonnes `depart`, `arrivee`, `duree`, `longueur` (nombre d'étapes) et `etapes` (liste des
+    emplacements du trajet ; dans une archive NPZ, les étapes de tous les trajets sont mises bout à bout)
+
+    Exemple :
+
+    >>> exporte_trajets(
+    ...     CARTE_VILLE, [(Emplacement(nom=1), Emplacement(nom=16))], "trajets.jsonl"
+    ... ).lignes
+    ... 1
+    """
+    return exporte(lots_trajets(ville, paires, taille), SCHEMA_TRAJETS, chemin)
+
+
+def lit_export(chemin: str) -> Lot:
+    """Relit un export en entier (pour les tests et les petits fichiers).
+
+    - Les colonnes de listes sont renvoyées bout à bout, comme dans les lots
+
+    Exemple :
+
+    >>> lit_export("routes.npz")["duree"]
+    ... array([5., 5., ...])
+    """
+    _, format_ = os.path.splitext(chemin)
+    format_ = EXTENSIONS.get(format_.lower())
+    if format_ == "npz":
+        with np.load(chemin, allow_pickle=False) as archive:
+            cles = archive.files
+            colonnes = dict.fromkeys(cle.split("/")[0] for cle in cles)
+            return {
+                nom: np.concatenate([archive[c] for c in cles if c.split("/")[0] == nom])
+                for nom in colonnes
+            }
+    if format_ == "jsonl":
+        with open(chemin, encoding="utf-8") as fichier:
+            lignes = [json.loads(ligne) for ligne in fichier]
+        if not lignes:
+            return {}
+        resultat = {}
+        for nom in lignes[0]:
+            if nom in _LISTES:
+                resultat[nom] = np.array(
+                    [e for ligne in lignes for e in ligne[nom]], dtype=np.int64
+                )
+            else:
+                resultat[nom] = np.array(
+                    [math.inf if ligne[nom] is None else ligne[nom] for ligne in lignes]
+                )
+        return resultat
+    if format_ in ("parquet", "arrow"):
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(chemin) if format_ == "parquet" else feather.read_table(chemin)
+        return {
+            nom: (
+                table.column(nom).combine_chunks().flatten()
+                if nom in _LISTES
+                else table.column(nom)
+            ).to_numpy()
+            for nom in table.column_names
+        }
+    raise ValueError(f"Format de fichier non reconnu : {chemin}")
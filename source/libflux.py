@@ -0,0 +1,289 @@
+"""# libflux
+
+`libflux` est un module Python à utiliser en conjonction avec les modules `libtaxi` et `libinstantane`.
+
+- Il permet d'intégrer un flux continu d'événements de trafic (bouchons, fluidifications, travaux)
+lus au format JSON lines, depuis un fichier ou l'entrée standard.
+- Les événements reçus pendant une fenêtre de temps sont regroupés : plusieurs événements sur une
+même route sont fusionnés, puis le lot est appliqué en une seule copie de la ville et publié comme
+une nouvelle version.
+- Le débit d'intégration et la latence entre la réception d'un événement et sa visibilité par les
+lecteurs sont mesurés.
+
+Format d'un événement (une ligne) ::
+
+    {"type": "bouchon", "depart": 1, "arrivee": 3, "duree": 2.0}
+    {"type": "fluidification", "depart": 1, "arrivee": 3, "duree": 1.0}
+    {"type": "travaux", "emplacements": [3, 5, 7], "duree": 1.0}
+
+L'importation classique du module se fait comme suit ::
+
+    import libflux as lfx
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import queue
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from source import libtaxi as lt
+from source import libinstantane as lin
+
+TYPES = ("bouchon", "fluidification", "travaux")
+
+
+class EvenementInvalide(Exception):
+    pass
+
+
+@dataclass
+class Evenement:
+    """Représente un événement de trafic.
+
+    `type`: "bouchon", "fluidification" ou "travaux"
+    `emplacements`: extrémités de la route (bouchon, fluidification) ou emplacements en travaux
+    `duree`: durée (positive) de l'événement
+    `recu`: instant de réception, pour mesurer la latence de publication
+    """
+
+    type: str
+    emplacements: tuple[lt.Emplacement, ...]
+    duree: float
+    recu: float = field(default_factory=time.perf_counter)
+
+
+def lit_evenement(ligne: str) -> Evenement:
+    """Construit un événement à partir d'une ligne JSON.
+
+    - Renvoie l'exception EvenementInvalide si la ligne est mal formée
+
+    Exemple :
+
+    >>> lit_evenement('{"type": "bouchon", "depart": 1, "arrivee": 3, "duree": 2.0}')
+    ... Evenement(type='bouchon', emplacements=(Emplacement(nom=1), Emplacement(nom=3)), duree=2.0, ...)
+    """
+    try:
+        donnees = json.loads(ligne)
+        type_ = donnees["type"]
+        duree = float(donnees["duree"])
+        if type_ == "travaux":
+            emplacements = tuple(lt.Emplacement(nom=int(e)) for e in donnees["emplacements"])
+        else:
+            emplacements = (
+                lt.Emplacement(nom=int(donnees["depart"])),
+                lt.Emplacement(nom=int(donnees["arrivee"])),
+            )
+    except (ValueError, KeyError, TypeError) as e:
+        raise EvenementInvalide(f"Événement mal formé : {ligne.strip()} ({e})")
+    if type_ not in TYPES:
+        raise EvenementInvalide(f"Type d'événement inconnu : {type_}")
+    if duree <= 0:
+        raise EvenementInvalide("La durée d'un événement doit être strictement positive.")
+    if not emplacements:
+        raise EvenementInvalide("L'événement ne concerne aucun emplacement.")
+    return Evenement(type=type_, emplacements=emplacements, duree=duree)
+
+
+@dataclass
+class StatistiquesFlux:
+    """Mesures de l'intégration d'un flux d'événements.
+
+    `recus`: nombre d'événements lus
+    `rejetes`: nombre d'événements mal formés ou incompatibles avec la ville
+    `lots`: nombre de lots appliqués (une nouvelle version de la ville par lot)
+    `duree`: durée totale de l'intégration en secondes
+    `latences`: délais (secondes) entre la réception et la publication de chaque événement appliqué
+    """
+
+    recus: int = 0
+    rejetes: int = 0
+    lots: int = 0
+    duree: float = 0.0
+    latences: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def debit(self) -> float:
+        """Nombre d'événements intégrés par seconde."""
+        return self.recus / self.duree if self.duree > 0 else 0.0
+
+    def latence(self, quantile: float) -> float:
+        """Quantile (entre 0 et 1) des latences de publication, en secondes."""
+        if not self.latences:
+            return 0.0
+        ordonnees = sorted(self.latences)
+        return ordonnees[min(len(ordonnees) - 1, int(quantile * len(ordonnees)))]
+
+
+@dataclass
+class _Lot:
+    """Événements en attente de publication, fusionnés par route et par emplacement.
+
+    - Les pénalités de plusieurs événements de travaux sur un même emplacement s'additionnent,
+    comme des appels successifs à `genere_travaux`
+    """
+
+    bouchons: dict[tuple[int, int], list] = field(default_factory=dict)
+    travaux: dict[lt.Emplacement, float] = field(default_factory=dict)
+    evenements: list[Evenement] = field(default_factory=list)
+
+    def ajoute(self, evenement: Evenement) -> None:
+        if evenement.type == "travaux":
+            for emplacement in evenement.emplacements:
+                self.travaux[emplacement] = (
+                    self.travaux.get(emplacement, 0) + evenement.duree
+                )
+        else:
+            depart, arrivee = evenement.emplacements
+            duree = evenement.duree if evenement.type == "bouchon" else -evenement.duree
+            cle = (min(depart.nom, arrivee.nom), max(depart.nom, arrivee.nom))
+            route = self.bouchons.setdefault(cle, [depart, arrivee, 0.0, []])
+            route[2] += duree
+            route[3].append(evenement)
+        self.evenements.append(evenement)
+
+
+class FluxTrafic:
+    """Intègre un flux d'événements de trafic dans un `DepotVille` par micro-lots.
+
+    `depot`: dépôt dans lequel les nouvelles versions de la ville sont publiées
+    `fenetre`: durée maximale (secondes) pendant laquelle un événement attend sa publication
+    `taille_lot`: nombre maximal d'événements par lot
+
+    - La lecture du flux se fait dans un thread dédié, la publication dans le thread appelant
+    - Un événement sur une route ou un emplacement inconnu est rejeté dès sa réception, de même
+    qu'un événement de travaux citant deux fois le même emplacement (comme `genere_travaux`)
+    - Une fluidification qui rendrait la durée d'une route négative est rejetée à la publication
+
+    Exemple :
+
+    >>> depot = DepotVille(CARTE_VILLE)
+    >>> with open("evenements.jsonl") as fichier:
+    ...     statistiques = FluxTrafic(depot, fenetre=0.05).traite(fichier)
+    """
+
+    _FIN = object()
+
+    def __init__(
+        self, depot: lin.DepotVille, fenetre: float = 0.05, taille_lot: int = 1000
+    ):
+        if fenetre < 0 or taille_lot < 1:
+            raise ValueError("La fenêtre et la taille des lots doivent être positives.")
+        self.depot = depot
+        self.fenetre = fenetre
+        self.taille_lot = taille_lot
+
+    def _valide(self, evenement: Evenement) -> None:
+        """Vérifie que l'événement concerne des emplacements et une route de la ville."""
+        ville = self.depot.ville
+        if len(set(evenement.emplacements)) != len(evenement.emplacements):
+            raise lt.MemeEmplacement(
+                "Attention, vous ne pouvez pas sélectionner 2 mêmes emplacements !"
+            )
+        for emplacement in evenement.emplacements:
+            if emplacement not in ville:
+                raise lt.EmplacementInconnu(
+                    f"Attention, {emplacement} n'est pas un emplacement valide !"
+                )
+        if evenement.type != "travaux":
+            depart, arrivee = evenement.emplacements
+            lt._determine_probleme(depart, arrivee, ville)
+            index = ville._topologie.index
+            if ville._topologie.route(index[depart.nom], index[arrivee.nom]) is None:
+                raise lt.ArreteInexistante(
+                    f"La route spécifiée entre les emplacements {depart} et {arrivee} n'existe pas !"
+                )
+
+    def _lecture(self, lignes: Iterable[str], file: queue.Queue) -> None:
+        """Lit le flux et transmet les événements (ou les erreurs) au thread de publication."""
+        try:
+            for ligne in lignes:
+                if not ligne.strip():
+                    continue
+                try:
+                    file.put(lit_evenement(ligne))
+                except EvenementInvalide as e:
+                    file.put(e)
+        finally:
+            file.put(self._FIN)
+
+    def _publie(self, lot: _Lot, statistiques: StatistiquesFlux) -> None:
+        """Applique un lot en une seule nouvelle version de la ville."""
+        rejetes: list[Evenement] = []
+
+        def transformation(ville: lt.Ville) -> lt.Ville:
+            rejetes.clear()
+            bouchons = {}
+            topologie = ville._topologie
+            for depart, arrivee, duree, evenements in lot.bouchons.values():
+                i = topologie.route(
+                    topologie.index[depart.nom], topologie.index[arrivee.nom]
+                )
+                if ville._duree[i] + duree <= 0:
+                    rejetes.extend(evenements)
+                elif duree:
+                    bouchons[(depart, arrivee)] = duree
+            return lt.genere_modifications(ville, bouchons=bouchons, travaux=lot.travaux)
+
+        self.depot.modifie(transformation)
+        publication = time.perf_counter()
+        statistiques.lots += 1
+        statistiques.rejetes += len(rejetes)
+        exclus = {id(e) for e in rejetes}
+        statistiques.latences.extend(
+            publication - e.recu for e in lot.evenements if id(e) not in exclus
+        )
+
+    def traite(self, lignes: Iterable[str]) -> StatistiquesFlux:
+        """Intègre toutes les lignes du flux et renvoie les statistiques d'intégration."""
+        statistiques = StatistiquesFlux()
+        file: queue.Queue = queue.Queue(maxsize=10 * self.taille_lot)
+        lecteur = threading.Thread(target=self._lecture, args=(lignes, file), daemon=True)
+        debut = time.perf_counter()
+        lecteur.start()
+
+        lot, echeance = _Lot(), None
+        while True:
+            attente = None if echeance is None else max(0.0, echeance - time.perf_counter())
+            try:
+                element = file.get(timeout=attente)
+            except queue.Empty:
+                self._publie(lot, statistiques)
+                lot, echeance = _Lot(), None
+                continue
+            if element is self._FIN:
+                break
+            statistiques.recus += 1
+            if isinstance(element, EvenementInvalide):
+                statistiques.rejetes += 1
+                continue
+            try:
+                self._valide(element)
+            except (
+                lt.EmplacementInconnu,
+                lt.MemeEmplacement,
+                lt.ArreteInexistante,
+            ):
+                statistiques.rejetes += 1
+                continue
+            lot.ajoute(element)
+            if echeance is None:
+                echeance = element.recu + self.fenetre
+            if len(lot.evenements) >= self.taille_lot:
+                self._publie(lot, statistiques)
+                lot, echeance = _Lot(), None
+
+        if lot.evenements:
+            self._publie(lot, statistiques)
+        lecteur.join()
+        statistiques.duree = time.perf_counter() - debut
+        return statistiques
@@ -18,44 +18,64 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import numpy as np
 from rich.table import Table
 from rich.markdown import Markdown
 from source import libtaxi as lt
+from source import libtournee as ltr
+from source import libaffectation as la
+from source import libcriticite as lc
+from source import libflux as lfx
+from source import liboracle as lo
+from source import libevaluation as lev
 
-def format_trajet(itineraire: lt.Itineraire) -> Markdown:
-    """Transforme un `itineraire` brut en rendu `Markdown`."""
-    duree_totale = 0
+def format_trajet(itineraire: lt.Itineraire, ville: lt.Ville = None) -> Markdown:
+    """Transforme un `itineraire` brut en rendu `Markdown`.
+
+    - Les durées sont lues dans `ville`, par défaut la carte `CARTE_VILLE`
+    - Un tronçon qui ne correspond à aucune route de la ville est signalé
+    - Les emplacements en travaux sont signalés avec leur pénalité
+    """
+    if ville is None:
+        ville = lt.CARTE_VILLE
+    evaluation = lev.evalue_trajets([itineraire], ville)
+    durees = evaluation.troncons(0)
     texte = f"""
 # Itinéraire le plus court pour l'emplacement {itineraire.etapes[0]} - {itineraire.etapes[-1]} :\n"""
     texte += "> **Le taxi passe par les emplacements suivants** : \n"
     for i, etape in enumerate(itineraire.etapes):
         texte += f"- Emplacement {etape.nom}"
+        if etape in ville and ville.penalite(etape):
+            texte += f" [travaux : +{ville.penalite(etape)} minutes]"
         if i < len(itineraire.etapes) - 1:
-            for arrete in lt.CARTE_VILLE.arretes:
-                if (
-                    arrete[0].nom == etape.nom
-                    and arrete[1].nom == itineraire.etapes[i + 1].nom
-                ) or (
-                    arrete[0].nom == itineraire.etapes[i + 1].nom
-                    and arrete[1].nom == etape.nom
-                ):
-                    duree_totale += arrete[2]
-                    texte += f" (durée : {arrete[2]} minutes)"
-                    break
+            if np.isnan(durees[i]):
+                texte += " (route inexistante !)"
+            else:
+                texte += f" (durée : {float(durees[i])} minutes)"
         texte += "\n"
     texte += "*** \n"
-    texte += f"`Durée totale du trajet` : {duree_totale} minutes"
+    if evaluation.valides[0]:
+        texte += f"`Durée totale du trajet` : {float(evaluation.durees[0])} minutes"
+    else:
+        texte += "`Durée totale du trajet` : indéterminée, l'itinéraire emprunte une route inexistante"
     return Markdown(texte)
 
 
 def format_routes(ville: lt.Ville) -> Table:
-    """Transforme les routes disponibles entre les emplacements en tableau `Markdown`."""
+    """Transforme les routes disponibles entre les emplacements en tableau `Markdown`.
+
+    - Les emplacements en travaux sont listés sous le tableau avec leur pénalité de passage
+    """
     tablo = Table(title="Carte de la ville")
     tablo.add_column("Emplacement de départ", style="magenta")
     tablo.add_column("Emplacement d'arrivée", style="cyan")
     tablo.add_column("Durée")
     for g1, g2, duree in ville.arretes:
         tablo.add_row(str(g1.nom), str(g2.nom), str(duree) + " min")
+    if ville.travaux:
+        tablo.caption = "Emplacements en travaux : " + ", ".join(
+            f"{e.nom} (+{penalite} min)" for e, penalite in ville.travaux.items()
+        )
     return tablo
 
 
@@ -66,3 +86,103 @@ def format_emplacement(ville: lt.Ville) -> Table:
     for emplacement in ville.emplacements:
         tablo.add_row(str(emplacement.nom))
     return tablo
+
+
+def format_tournee(tournee: ltr.Tournee) -> Markdown:
+    """Transforme une `tournee` ordonnée en rendu `Markdown`."""
+    texte = f"""
+# Tournée la plus rapide au départ de l'emplacement {tournee.ordre[0]} :\n"""
+    texte += "> **Le taxi dessert les emplacements dans l'ordre suivant** : \n"
+    for itineraire in tournee.trajets:
+        etapes = " → ".join(str(etape.nom) for etape in itineraire.etapes)
+        texte += f"- Emplacement {itineraire.etapes[-1].nom} (via {etapes})\n"
+    texte += "*** \n"
+    texte += f"`Durée totale de la tournée` : {tournee.duree} minutes"
+    return Markdown(texte)
+
+
+def format_affectations(affectations: list[la.Affectation]) -> Table:
+    """Transforme des `affectations` de taxis en tableau `Markdown`."""
+    tablo = Table(title="Taxis les plus proches")
+    tablo.add_column("Taxi", style="magenta")
+    tablo.add_column("Emplacement du client", style="cyan")
+    tablo.add_column("Trajet d'approche")
+    tablo.add_column("Durée")
+    for affectation in affectations:
+        if affectation.itineraire is None:
+            trajet = "déjà sur place"
+        else:
+            trajet = " → ".join(str(e.nom) for e in affectation.itineraire.etapes)
+        tablo.add_row(
+            affectation.taxi,
+            str(affectation.client.nom),
+            trajet,
+            str(affectation.duree) + " min",
+        )
+    return tablo
+
+
+def format_isochrones(
+    depart: lt.Emplacement, zones: dict[float, dict[lt.Emplacement, float]]
+) -> Table:
+    """Transforme des zones isochrones en tableau `Markdown`."""
+    tablo = Table(title=f"Emplacements accessibles depuis l'emplacement {depart}")
+    tablo.add_column("Durée maximale", style="magenta")
+    tablo.add_column("Emplacements accessibles", style="cyan")
+    tablo.add_column("Nombre")
+    for budget, atteints in zones.items():
+        tablo.add_row(
+            str(budget) + " min",
+            ", ".join(f"{e.nom} ({d} min)" for e, d in atteints.items()),
+            str(len(atteints)),
+        )
+    return tablo
+
+
+def format_criticite(analyse: lc.AnalyseCriticite, nombre: int) -> Table:
+    """Transforme les `nombre` routes les plus critiques en tableau `Markdown`."""
+    tablo = Table(title="Routes les plus critiques de la ville")
+    tablo.add_column("Emplacement de départ", style="magenta")
+    tablo.add_column("Emplacement d'arrivée", style="cyan")
+    tablo.add_column("Intermédiarité")
+    tablo.add_column("Impact de la fermeture")
+    tablo.add_column("Trajets impossibles")
+    for route in analyse.routes[:nombre]:
+        tablo.add_row(
+            str(route.depart.nom),
+            str(route.arrivee.nom),
+            f"{route.intermediarite:.2f}",
+            f"+{route.impact} min",
+            str(route.paires_deconnectees),
+        )
+    return tablo
+
+
+def format_flux(statistiques: lfx.StatistiquesFlux) -> Table:
+    """Transforme les statistiques d'intégration d'un flux d'événements en tableau `Markdown`."""
+    tablo = Table(title="Intégration du flux d'événements")
+    tablo.add_column("Mesure", style="magenta")
+    tablo.add_column("Valeur", style="cyan")
+    tablo.add_row("Événements reçus", str(statistiques.recus))
+    tablo.add_row("Événements rejetés", str(statistiques.rejetes))
+    tablo.add_row("Lots publiés", str(statistiques.lots))
+    tablo.add_row("Débit", f"{statistiques.debit:.0f} événements/s")
+    tablo.add_row("Latence médiane", f"{statistiques.latence(0.5) * 1000:.2f} ms")
+    tablo.add_row("Latence p99", f"{statistiques.latence(0.99) * 1000:.2f} ms")
+    return tablo
+
+
+def format_oracle(oracle: lo.OracleDurees, duree_construction: float = None) -> Table:
+    """Transforme le bilan mémoire d'un oracle de durées en tableau `Markdown`."""
+    memoire = oracle.memoire()
+    tablo = Table(title="Oracle des durées de trajet")
+    tablo.add_column("Mesure", style="magenta")
+    tablo.add_column("Valeur", style="cyan")
+    tablo.add_row("Emplacements", str(memoire["emplacements"]))
+    tablo.add_row("Étiquettes", str(memoire["etiquettes"]))
+    tablo.add_row("Étiquettes par emplacement", f"{memoire['etiquettes_moyennes']:.2f}")
+    tablo.add_row("Étiquettes (maximum)", str(memoire["etiquettes_max"]))
+    tablo.add_row("Mémoire", f"{memoire['octets']} octets")
+    if duree_construction is not None:
+        tablo.add_row("Construction", f"{duree_construction * 1000:.2f} ms")
+    return tablo
@@ -0,0 +1,261 @@
+"""# libinstantane
+
+`libinstantane` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de servir des calculs d'itinéraires depuis plusieurs threads pendant que la carte de la
+ville est modifiée (bouchons, travaux...).
+- Un `Instantane` est une version figée de la ville accompagnée de son graphe déjà construit.
+- Un `DepotVille` publie atomiquement un nouvel instantané à chaque modification (principe
+"read-copy-update") : les lecteurs ne sont jamais bloqués et une requête en cours se termine sur
+l'instantané avec lequel elle a commencé.
+- En mode préchauffage, le graphe et les index configurés (oracle, table de routage...) sont
+construits par un thread en arrière-plan : les requêtes arrivées avant la fin de la construction
+utilisent une recherche simple au lieu d'attendre.
+
+L'importation classique du module se fait comme suit ::
+
+    import libinstantane as lin
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+import networkx as nx
+from source import libtaxi as lt
+
+
+Constructeurs = dict[str, Callable[[lt.Ville], object]]
+"""Nom d'un index => fonction qui le construit à partir de la ville (ex. `construit_oracle`)."""
+
+
+class StructuresRoutage:
+    """Graphe compilé et index d'un instantané, construits immédiatement ou en arrière-plan.
+
+    `graphe`: graphe networkx figé de la ville, None tant qu'il n'est pas construit
+    `index`: index déjà construits, par nom
+    `durees`: durée de construction (secondes) du graphe et de chaque index
+    `erreur`: exception levée pendant la construction, le cas échéant
+
+    - Le graphe est disponible dès qu'il est construit, sans attendre les index
+    - Une construction abandonnée (instantané remplacé entre-temps) s'arrête entre deux structures
+    """
+
+    __slots__ = ("graphe", "index", "durees", "erreur", "_pret", "_abandon")
+
+    def __init__(self):
+        self.graphe: nx.Graph | None = None
+        self.index: dict[str, object] = {}
+        self.durees: dict[str, float] = {}
+        self.erreur: Exception | None = None
+        self._pret = threading.Event()
+        self._abandon = False
+
+    @property
+    def pret(self) -> bool:
+        """Vrai lorsque toutes les structures sont construites (ou la construction terminée)."""
+        return self._pret.is_set()
+
+    @property
+    def duree(self) -> float:
+        """Durée totale de construction, en secondes."""
+        return sum(self.durees.values())
+
+    def attend(self, delai: float = None) -> bool:
+        """Attend la fin de la construction, au plus `delai` secondes. Renvoie `pret`."""
+        return self._pret.wait(delai)
+
+    def abandonne(self) -> None:
+        self._abandon = True
+
+    def construit(self, ville: lt.Ville, constructeurs: Constructeurs) -> None:
+        """Construit le graphe puis chacun des index de `constructeurs`."""
+        try:
+            debut = time.perf_counter()
+            self.graphe = nx.freeze(lt._convertit_en_nx(ville))
+            self.durees["graphe"] = time.perf_counter() - debut
+            for nom, constructeur in constructeurs.items():
+                if self._abandon:
+                    return
+                debut = time.perf_counter()
+                self.index[nom] = constructeur(ville)
+                self.durees[nom] = time.perf_counter() - debut
+        except Exception as e:
+            self.erreur = e
+        finally:
+            self._pret.set()
+
+
+@dataclass(frozen=True, slots=True)
+class Instantane:
+    """Version figée et compilée de la carte de la ville.
+
+    `version`: numéro de version, croissant à chaque publication
+    `ville`: copie figée de la ville (toute modification lève l'exception VilleFigee)
+    `structures`: graphe et index de la ville, construits une seule fois
+
+    Exemple :
+    >>> instantane = compile_ville(CARTE_VILLE)
+    >>> instantane.version
+    ... 0
+    """
+
+    version: int
+    ville: lt.Ville
+    structures: StructuresRoutage
+
+    @property
+    def graphe(self) -> nx.Graph | None:
+        """Graphe networkx figé de la ville, None tant que le préchauffage ne l'a pas construit."""
+        return self.structures.graphe
+
+    @property
+    def pret(self) -> bool:
+        return self.structures.pret
+
+    def index(self, nom: str) -> object | None:
+        """Index `nom` de la ville, None s'il n'est pas (encore) construit."""
+        return self.structures.index.get(nom)
+
+    def determine_trajet(
+        self,
+        depart: lt.Emplacement,
+        arrivee: lt.Emplacement,
+        cache: lt.CacheTrajets = None,
+    ) -> lt.Itineraire:
+        """Détermine le trajet le plus court sur cette version de la ville.
+
+        - Si le graphe n'est pas encore construit, la recherche se fait sans l'attendre
+        """
+        return lt.determine_trajet(
+            depart, arrivee, self.ville, graphe=self.graphe, cache=cache
+        )
+
+
+def compile_ville(
+    ville: lt.Ville,
+    version: int = 0,
+    constructeurs: Constructeurs = None,
+    arriere_plan: bool = False,
+) -> Instantane:
+    """Crée un instantané figé de la ville : copie de la carte et construction du graphe.
+
+    - La ville d'origine n'est pas figée et peut continuer d'être modifiée
+    - `constructeurs` : index à construire en plus du graphe
+    - `arriere_plan` : si vrai, le graphe et les index sont construits par un thread en
+    arrière-plan et l'instantané est renvoyé immédiatement
+
+    Exemple :
+
+    >>> compile_ville(CARTE_VILLE, version=3).ville.figee
+    ... True
+    >>> instantane = compile_ville(
+    ...     CARTE_VILLE, constructeurs={"oracle": construit_oracle}, arriere_plan=True
+    ... )
+    >>> instantane.structures.attend()
+    ... True
+    """
+    copie = ville.__deepcopy__().fige()
+    structures = StructuresRoutage()
+    if arriere_plan:
+        threading.Thread(
+            target=structures.construit,
+            args=(copie, dict(constructeurs or {})),
+            name=f"prechauffage-{version}",
+            daemon=True,
+        ).start()
+    else:
+        structures.construit(copie, constructeurs or {})
+        if structures.erreur is not None:
+            raise structures.erreur
+    return Instantane(version=version, ville=copie, structures=structures)
+
+
+class DepotVille:
+    """Détient l'instantané courant de la ville et publie atomiquement les nouvelles versions.
+
+    - La lecture de `instantane` ne prend aucun verrou : c'est une simple lecture de référence
+    - Les écritures sont sérialisées par un verrou : chaque modification part de la dernière version
+    - Les anciens instantanés restent valides tant qu'un lecteur les utilise
+    - `cache` : cache de trajets optionnel partagé par toutes les versions (chaque instantané a sa
+    propre version de ville, les résultats d'une ancienne version ne sont donc jamais réutilisés)
+    - `constructeurs` : index construits pour chaque nouvelle version, en plus du graphe
+    - `prechauffage` : si vrai, le graphe et les index sont construits en arrière-plan ; la
+    construction d'une version remplacée avant d'être prête est abandonnée
+
+    Exemple :
+
+    >>> depot = DepotVille(CARTE_VILLE)
+    >>> depot.modifie(
+    ...     lambda ville: genere_bouchons(Emplacement(nom=1), Emplacement(nom=3), 4.0, ville)
+    ... ).version
+    ... 1
+    """
+
+    def __init__(
+        self,
+        ville: lt.Ville,
+        cache: lt.CacheTrajets = None,
+        constructeurs: Constructeurs = None,
+        prechauffage: bool = False,
+    ):
+        self.cache = cache
+        self.constructeurs = dict(constructeurs or {})
+        self.prechauffage = prechauffage
+        self._ecriture = threading.Lock()
+        self._instantane = self._compile(ville, version=0)
+
+    def _compile(self, ville: lt.Ville, version: int) -> Instantane:
+        return compile_ville(
+            ville,
+            version=version,
+            constructeurs=self.constructeurs,
+            arriere_plan=self.prechauffage,
+        )
+
+    @property
+    def instantane(self) -> Instantane:
+        return self._instantane
+
+    @property
+    def ville(self) -> lt.Ville:
+        return self._instantane.ville
+
+    @property
+    def pret(self) -> bool:
+        """Vrai lorsque le graphe et les index de la version courante sont construits."""
+        return self._instantane.pret
+
+    def publie(self, ville: lt.Ville) -> Instantane:
+        """Remplace la ville courante par `ville` et renvoie le nouvel instantané."""
+        return self.modifie(lambda _: ville)
+
+    def modifie(self, transformation: Callable[[lt.Ville], lt.Ville]) -> Instantane:
+        """Applique `transformation` à la dernière version de la ville et publie le résultat.
+
+        - La compilation se fait hors de la vue des lecteurs, la publication est une affectation
+        - Si `transformation` lève une exception, l'instantané courant est conservé
+        """
+        with self._ecriture:
+            courant = self._instantane
+            nouveau = self._compile(
+                transformation(courant.ville), version=courant.version + 1
+            )
+            self._instantane = nouveau
+            courant.structures.abandonne()
+        return nouveau
+
+    def determine_trajet(
+        self, depart: lt.Emplacement, arrivee: lt.Emplacement
+    ) -> lt.Itineraire:
+        """Détermine le trajet le plus court sur l'instantané courant."""
+        return self._instantane.determine_trajet(depart, arrivee, cache=self.cache)
@@ -0,0 +1,103 @@
+"""# libisochrone
+
+`libisochrone` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de déterminer les emplacements accessibles en moins d'une durée donnée depuis un point
+de départ (dépôt de la compagnie, aéroport...), par exemple pour une tarification par zone.
+- Le parcours de Dijkstra s'arrête dès que la durée maximale est dépassée : son coût dépend de la
+taille de la zone atteinte et non de celle de la ville.
+- Plusieurs durées peuvent être calculées en un seul parcours.
+
+L'importation classique du module se fait comme suit ::
+
+    import libisochrone as li
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import networkx as nx
+from source import libtaxi as lt
+
+
+def _verifie(depart: lt.Emplacement, budgets: list[float], ville: lt.Ville) -> None:
+    """Vérifie que le départ existe et que les durées maximales sont positives."""
+    if depart not in ville:
+        raise lt.EmplacementInconnu(
+            f"Attention, {depart} n'est pas un emplacement valide !"
+        )
+    if not budgets:
+        raise ValueError("Il faut spécifier au moins une durée maximale.")
+    if any(budget < 0 for budget in budgets):
+        raise lt.DureeNegative(
+            "Attention, la durée maximale d'une isochrone doit forcément être positive !"
+        )
+
+
+def isochrones(
+    depart: lt.Emplacement,
+    budgets: list[float],
+    ville: lt.Ville,
+    graphe: nx.Graph = None,
+) -> dict[float, dict[lt.Emplacement, float]]:
+    """Détermine, pour chaque durée maximale, les emplacements accessibles depuis `depart`.
+
+    - Un seul parcours de Dijkstra borné par la plus grande des durées
+    - Les zones sont cumulatives : un emplacement accessible en 5 minutes l'est aussi en 10 minutes
+    - `graphe` : graphe networkx déjà construit de la ville, pour enchaîner les requêtes sans le reconstruire
+
+    Exemple :
+
+    >>> isochrones(Emplacement(nom=1), [4.0, 6.0], ville=CARTE_VILLE)
+    ... {4.0: {Emplacement(nom=1): 0, Emplacement(nom=4): 4.0},
+    ...  6.0: {Emplacement(nom=1): 0, Emplacement(nom=4): 4.0, Emplacement(nom=2): 5.0}}
+    """
+    _verifie(depart, budgets, ville)
+    G = graphe if graphe is not None else lt._convertit_en_nx(ville)
+    ordonnes = sorted(set(budgets))
+    zones: dict[float, dict[lt.Emplacement, float]] = {b: {} for b in ordonnes}
+    atteints = lt._parcours_dijkstra(G, depart, {}, limite=ordonnes[-1])
+    # Les emplacements arrivent par durée croissante : chaque zone est un préfixe du parcours
+    for emplacement, duree in atteints:
+        for budget in ordonnes:
+            if duree <= budget:
+                zones[budget][emplacement] = duree
+    return {budget: zones[budget] for budget in budgets}
+
+
+def isochrone(
+    depart: lt.Emplacement, budget: float, ville: lt.Ville, graphe: nx.Graph = None
+) -> dict[lt.Emplacement, float]:
+    """Détermine les emplacements accessibles depuis `depart` en moins de `budget` minutes.
+
+    Exemple :
+
+    >>> isochrone(Emplacement(nom=1), 4.0, ville=CARTE_VILLE)
+    ... {Emplacement(nom=1): 0, Emplacement(nom=4): 4.0}
+    """
+    return isochrones(depart, [budget], ville, graphe)[budget]
+
+
+def zones_isochrones(
+    zones: dict[float, dict[lt.Emplacement, float]]
+) -> dict[lt.Emplacement, float]:
+    """Associe à chaque emplacement atteint la plus petite durée maximale qui le contient.
+
+    - Format attendu par l'argument `isochrone` de `carte_graphe`
+
+    Exemple :
+
+    >>> zones_isochrones(isochrones(Emplacement(nom=1), [4.0, 6.0], ville=CARTE_VILLE))
+    ... {Emplacement(nom=1): 4.0, Emplacement(nom=4): 4.0, Emplacement(nom=2): 6.0}
+    """
+    resultat: dict[lt.Emplacement, float] = {}
+    for budget in sorted(zones, reverse=True):
+        for emplacement in zones[budget]:
+            resultat[emplacement] = budget
+    return resultat
@@ -0,0 +1,294 @@
+"""# libjournal
+
+`libjournal` est un module Python à utiliser en conjonction avec les modules `libtaxi` et `libflux`.
+
+- Il permet de conserver les modifications de la carte de la ville (bouchons, fluidifications,
+travaux) d'une exécution à l'autre de l'application.
+- Chaque modification est ajoutée à la fin d'un journal au format JSON lines (même format que les
+événements de `libflux`, complété d'un numéro d'ordre).
+- Régulièrement, l'état de la ville est compacté dans un instantané binaire et le journal est vidé :
+au chargement, l'instantané est projeté en mémoire (mmap) et seule la fin du journal est rejouée.
+
+Organisation du dossier de journalisation ::
+
+    journal.jsonl    modifications postérieures au dernier instantané
+    ville.bin        dernier instantané compacté
+
+L'importation classique du module se fait comme suit ::
+
+    import libjournal as ljr
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import mmap
+import struct
+import zlib
+from array import array
+from source import libtaxi as lt
+from source import libflux as lfx
+
+FICHIER_JOURNAL = "journal.jsonl"
+FICHIER_INSTANTANE = "ville.bin"
+COMPACTION = 50
+"""Nombre de modifications journalisées au-delà duquel un nouvel instantané est écrit."""
+
+_MAGIQUE = b"TAXI"
+_FORMAT = 2
+_ENTETE = struct.Struct("<4sHIQII")
+"""Signature, version du format, somme de contrôle, numéro de modification, emplacements, routes."""
+
+
+class JournalCorrompu(Exception):
+    pass
+
+
+def applique(evenement: lfx.Evenement, ville: lt.Ville) -> lt.Ville:
+    """Applique un événement à la ville avec les mêmes règles que les commandes `bouchons` et `travaux`.
+
+    Exemple :
+
+    >>> applique(lit_evenement('{"type": "travaux", "emplacements": [3], "duree": 1.0}'), village)
+    ... Ville(emplacements=[...], arretes=[...])
+    """
+    if evenement.type == "travaux":
+        return lt.genere_travaux(list(evenement.emplacements), evenement.duree, ville)
+    depart, arrivee = evenement.emplacements
+    duree = evenement.duree if evenement.type == "bouchon" else -evenement.duree
+    return lt.genere_bouchons(depart, arrivee, duree, ville)
+
+
+def _ligne(numero: int, evenement: lfx.Evenement) -> str:
+    donnees = {"numero": numero, "type": evenement.type, "duree": evenement.duree}
+    if evenement.type == "travaux":
+        donnees["emplacements"] = [e.nom for e in evenement.emplacements]
+    else:
+        donnees["depart"], donnees["arrivee"] = (e.nom for e in evenement.emplacements)
+    return json.dumps(donnees) + "\n"
+
+
+def _octets(tableau: array) -> bytes:
+    """Représentation petit-boutiste d'un tableau typé, indépendante de la machine."""
+    if sys.byteorder == "big":
+        tableau = array(tableau.typecode, tableau)
+        tableau.byteswap()
+    return tableau.tobytes()
+
+
+def _tableau(code: str, octets) -> array:
+    tableau = array(code)
+    tableau.frombytes(octets)
+    if sys.byteorder == "big":
+        tableau.byteswap()
+    return tableau
+
+
+def ecrit_instantane(chemin: str, ville: lt.Ville, numero: int) -> None:
+    """Écrit l'état de la ville dans un instantané binaire, de manière atomique.
+
+    - `numero` : numéro de la dernière modification prise en compte dans l'instantané
+    - Le fichier est d'abord écrit à côté puis renommé : un lecteur ne voit jamais d'instantané partiel
+    """
+    topologie = ville._topologie
+    penalites = array(
+        "d", (ville._penalites.get(i, 0.0) for i in range(len(topologie.noms)))
+    )
+    corps = b"".join(
+        _octets(tableau)
+        for tableau in (
+            topologie.noms,
+            topologie.depart,
+            topologie.arrivee,
+            ville._duree,
+            penalites,
+        )
+    )
+    entete = _ENTETE.pack(
+        _MAGIQUE,
+        _FORMAT,
+        zlib.crc32(corps),
+        numero,
+        len(topologie.noms),
+        len(topologie.depart),
+    )
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as fichier:
+        fichier.write(entete + corps)
+        fichier.flush()
+        os.fsync(fichier.fileno())
+    os.replace(temporaire, chemin)
+
+
+def lit_instantane(chemin: str) -> tuple[int, lt.Ville]:
+    """Projette un instantané en mémoire et reconstruit la ville.
+
+    - Renvoie le numéro de la dernière modification prise en compte et la ville
+    - Renvoie l'exception JournalCorrompu si le fichier est tronqué ou altéré
+    - Les instantanés du format précédent (sans pénalités de travaux) restent lisibles
+
+    Exemple :
+
+    >>> numero, ville = lit_instantane("journal/ville.bin")
+    """
+    with open(chemin, "rb") as fichier:
+        try:
+            projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            raise JournalCorrompu(f"L'instantané {chemin} est vide !")
+    with projection, memoryview(projection) as vue:
+        if len(vue) < _ENTETE.size:
+            raise JournalCorrompu(f"L'instantané {chemin} est tronqué !")
+        magique, format_, somme, numero, n, m = _ENTETE.unpack_from(vue)
+        if magique != _MAGIQUE or format_ not in (1, _FORMAT):
+            raise JournalCorrompu(f"{chemin} n'est pas un instantané de ville valide !")
+        bornes = [0, 8 * n, 8 * n + 4 * m, 8 * n + 8 * m, 8 * n + 16 * m]
+        codes = "qiid"
+        if format_ == _FORMAT:
+            bornes.append(bornes[-1] + 8 * n)
+            codes += "d"
+        with vue[_ENTETE.size :] as corps:
+            if len(corps) != bornes[-1] or zlib.crc32(corps) != somme:
+                raise JournalCorrompu(f"L'instantané {chemin} est altéré !")
+            noms, depart, arrivee, duree, *penalites = (
+                _tableau(code, corps[debut:fin])
+                for code, debut, fin in zip(codes, bornes, bornes[1:])
+            )
+
+    ville = lt.Ville.__new__(lt.Ville)
+    ville._topologie = lt._Topologie(noms, depart, arrivee)
+    ville._duree = duree
+    ville._penalites = {
+        i: penalite
+        for i, penalite in enumerate(penalites[0] if penalites else [])
+        if penalite
+    }
+    ville._version = next(lt._VERSIONS)
+    ville._figee = False
+    return numero, ville
+
+
+class Journal:
+    """Journal persistant des modifications de la carte de la ville.
+
+    `dossier`: dossier contenant le journal et l'instantané (créé si nécessaire)
+    `compaction`: nombre de modifications journalisées avant l'écriture d'un nouvel instantané
+
+    - `charge` reconstruit l'état courant : dernier instantané (ou ville initiale) puis fin du journal
+    - `ajoute` journalise une modification déjà appliquée avec succès
+    - Un seul processus doit écrire dans un dossier de journalisation à la fois
+
+    Exemple :
+
+    >>> journal = Journal("journal")
+    >>> ville = journal.charge(CARTE_VILLE)
+    >>> evenement = lit_evenement('{"type": "bouchon", "depart": 1, "arrivee": 2, "duree": 3.0}')
+    >>> ville = applique(evenement, ville)
+    >>> journal.ajoute(evenement, ville)
+    """
+
+    def __init__(self, dossier: str, compaction: int = COMPACTION):
+        if compaction < 1:
+            raise ValueError("Le seuil de compaction doit être strictement positif.")
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.compaction = compaction
+        self.numero = 0
+        self.numero_instantane = 0
+
+    @property
+    def chemin_journal(self) -> str:
+        return os.path.join(self.dossier, FICHIER_JOURNAL)
+
+    @property
+    def chemin_instantane(self) -> str:
+        return os.path.join(self.dossier, FICHIER_INSTANTANE)
+
+    def _lit_journal(self) -> list[tuple[int, lfx.Evenement]]:
+        """Lit les modifications journalisées, dans l'ordre.
+
+        - Une dernière ligne incomplète (écriture interrompue) est ignorée et retirée du fichier
+        """
+        if not os.path.exists(self.chemin_journal):
+            return []
+        with open(self.chemin_journal, "rb") as fichier:
+            contenu = fichier.read()
+        complet = contenu[: contenu.rfind(b"\n") + 1]
+        if len(complet) != len(contenu):
+            with open(self.chemin_journal, "r+b") as fichier:
+                fichier.truncate(len(complet))
+
+        entrees = []
+        for ligne in complet.decode("utf-8").splitlines():
+            if not ligne.strip():
+                continue
+            try:
+                numero = int(json.loads(ligne)["numero"])
+                entrees.append((numero, lfx.lit_evenement(ligne)))
+            except (ValueError, KeyError, TypeError, lfx.EvenementInvalide) as e:
+                raise JournalCorrompu(f"Ligne de journal invalide : {ligne} ({e})")
+        return entrees
+
+    def charge(self, ville: lt.Ville) -> lt.Ville:
+        """Renvoie l'état courant de la ville à partir de la ville initiale `ville`.
+
+        - Seules les modifications postérieures au dernier instantané sont rejouées
+        """
+        if os.path.exists(self.chemin_instantane):
+            initiale = ville
+            self.numero_instantane, ville = lit_instantane(self.chemin_instantane)
+            topologie, base = ville._topologie, initiale._topologie
+            if (
+                topologie.noms == base.noms
+                and topologie.depart == base.depart
+                and topologie.arrivee == base.arrivee
+            ):
+                # même carte : la topologie initiale (et ses coordonnées) est partagée
+                ville._topologie = base
+        else:
+            self.numero_instantane = 0
+        self.numero = self.numero_instantane
+        for numero, evenement in self._lit_journal():
+            if numero <= self.numero_instantane:
+                continue  # déjà compactée (compaction interrompue avant le vidage du journal)
+            try:
+                ville = applique(evenement, ville)
+            except (
+                lt.EmplacementInconnu,
+                lt.MemeEmplacement,
+                lt.ArreteInexistante,
+                lt.DureeNegative,
+            ) as e:
+                raise JournalCorrompu(f"Modification {numero} impossible à rejouer : {e}")
+            self.numero = numero
+        return ville
+
+    def ajoute(self, evenement: lfx.Evenement, ville: lt.Ville) -> None:
+        """Journalise `evenement`, dont l'application a produit `ville`.
+
+        - Un nouvel instantané est écrit dès que `compaction` modifications sont en attente
+        """
+        if evenement.duree == 0:
+            return  # aucune modification de la carte
+        numero = self.numero + 1
+        with open(self.chemin_journal, "a", encoding="utf-8") as fichier:
+            fichier.write(_ligne(numero, evenement))
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        self.numero = numero
+        if self.numero - self.numero_instantane >= self.compaction:
+            self.compacte(ville)
+
+    def compacte(self, ville: lt.Ville) -> None:
+        """Écrit l'état courant `ville` dans un instantané puis vide le journal."""
+        ecrit_instantane(self.chemin_instantane, ville, self.numero)
+        self.numero_instantane = self.numero
+        # une interruption ici est sans conséquence : les lignes déjà compactées sont ignorées
+        open(self.chemin_journal, "w").close()
@@ -0,0 +1,236 @@
+"""# liboracle
+
+`liboracle` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de connaître très rapidement la durée du trajet le plus court entre deux emplacements,
+sans calculer le chemin (tarification, estimation des temps d'attente...).
+- L'oracle repose sur un étiquetage par "hubs" (2-hop labeling) : chaque emplacement reçoit une liste
+d'emplacements relais accompagnés de leur distance, telle que tout trajet optimal passe par un relais
+commun aux deux extrémités. Une requête se résume à la fusion de deux listes triées.
+- Les étiquettes sont construites par des parcours de Dijkstra élagués (pruned landmark labeling)
+et rangées dans des tableaux typés plats, sérialisables et projetables en mémoire (mmap).
+- L'oracle correspond à un état de la ville : il doit être reconstruit après des bouchons ou travaux.
+- Les pénalités de travaux sont réparties par moitié sur les routes de chaque emplacement (durées
+symétriques), puis la moitié de la pénalité de chaque emplacement est ajoutée à ses étiquettes :
+la fusion de deux étiquettes compte une fois la pénalité de chaque emplacement traversé.
+
+L'importation classique du module se fait comme suit ::
+
+    import liboracle as lo
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import heapq
+import mmap
+import struct
+import zlib
+from array import array
+from source import libtaxi as lt
+from source import libcriticite as lc
+from source import libjournal as ljr
+
+_MAGIQUE = b"TXHL"
+_FORMAT = 1
+_ENTETE = struct.Struct("<4sHIQQ")
+"""Signature, version du format, somme de contrôle, nombre d'emplacements, nombre d'étiquettes."""
+
+
+class OracleCorrompu(Exception):
+    pass
+
+
+class OracleDurees:
+    """Étiquetage par hubs de la ville, sous forme de tableaux plats.
+
+    `noms`: numéros des emplacements (indice dense => numéro)
+    `debuts`: les étiquettes de l'emplacement d'indice `i` occupent les positions
+    `debuts[i]` à `debuts[i + 1]` des tableaux `hubs` et `durees`
+    `hubs`: rang des emplacements relais, trié de manière croissante pour chaque emplacement
+    `durees`: durée du trajet le plus court entre l'emplacement et chacun de ses relais
+
+    Exemple :
+
+    >>> oracle = construit_oracle(CARTE_VILLE)
+    >>> oracle.duree(Emplacement(nom=1), Emplacement(nom=12))
+    ... 17.0
+    """
+
+    __slots__ = ("noms", "index", "debuts", "hubs", "durees")
+
+    def __init__(self, noms: array, debuts: array, hubs: array, durees: array):
+        self.noms = noms
+        self.index = {nom: i for i, nom in enumerate(noms)}
+        self.debuts = debuts
+        self.hubs = hubs
+        self.durees = durees
+
+    def __len__(self) -> int:
+        return len(self.noms)
+
+    def _duree(self, i: int, j: int) -> float:
+        """Fusion des étiquettes des indices denses `i` et `j` (infini si aucun relais commun)."""
+        hubs, durees = self.hubs, self.durees
+        a, fin_a = self.debuts[i], self.debuts[i + 1]
+        b, fin_b = self.debuts[j], self.debuts[j + 1]
+        meilleure = float("inf")
+        while a < fin_a and b < fin_b:
+            hub_a, hub_b = hubs[a], hubs[b]
+            if hub_a == hub_b:
+                total = durees[a] + durees[b]
+                if total < meilleure:
+                    meilleure = total
+                a += 1
+                b += 1
+            elif hub_a < hub_b:
+                a += 1
+            else:
+                b += 1
+        return meilleure
+
+    def duree(self, depart: lt.Emplacement, arrivee: lt.Emplacement) -> float:
+        """Durée du trajet le plus court entre deux emplacements.
+
+        - Renvoie 0 si les deux emplacements sont identiques
+        - Renvoie l'exception EmplacementInconnu si un emplacement n'existe pas
+        - Renvoie l'exception PasDeChemin si aucun trajet ne relie les emplacements
+        """
+        for emplacement in (depart, arrivee):
+            if emplacement.nom not in self.index:
+                raise lt.EmplacementInconnu(
+                    f"Attention, {emplacement} n'est pas un emplacement valide !"
+                )
+        if depart.nom == arrivee.nom:
+            return 0.0
+        resultat = self._duree(self.index[depart.nom], self.index[arrivee.nom])
+        if resultat == float("inf"):
+            raise lt.PasDeChemin(
+                f"Il n'existe pas de chemin entre l'emplacement {depart} et l'emplacement {arrivee} !"
+            )
+        return resultat
+
+    def memoire(self) -> dict[str, float]:
+        """Taille de l'index : nombre d'étiquettes (total, moyenne, maximum) et octets occupés."""
+        n = len(self.noms)
+        tailles = [self.debuts[i + 1] - self.debuts[i] for i in range(n)]
+        return {
+            "emplacements": n,
+            "etiquettes": len(self.hubs),
+            "etiquettes_moyennes": len(self.hubs) / n if n else 0.0,
+            "etiquettes_max": max(tailles, default=0),
+            "octets": sum(
+                t.itemsize * len(t)
+                for t in (self.noms, self.debuts, self.hubs, self.durees)
+            ),
+        }
+
+    def sauvegarde(self, chemin: str) -> None:
+        """Écrit l'oracle dans un fichier binaire, de manière atomique."""
+        corps = b"".join(
+            ljr._octets(t) for t in (self.noms, self.debuts, self.hubs, self.durees)
+        )
+        entete = _ENTETE.pack(
+            _MAGIQUE, _FORMAT, zlib.crc32(corps), len(self.noms), len(self.hubs)
+        )
+        temporaire = chemin + ".tmp"
+        with open(temporaire, "wb") as fichier:
+            fichier.write(entete + corps)
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(temporaire, chemin)
+
+
+def charge_oracle(chemin: str) -> OracleDurees:
+    """Projette en mémoire un oracle sauvegardé par `OracleDurees.sauvegarde`.
+
+    - Renvoie l'exception OracleCorrompu si le fichier est tronqué ou altéré
+    """
+    with open(chemin, "rb") as fichier:
+        try:
+            projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            raise OracleCorrompu(f"L'oracle {chemin} est vide !")
+    with projection, memoryview(projection) as vue:
+        if len(vue) < _ENTETE.size:
+            raise OracleCorrompu(f"L'oracle {chemin} est tronqué !")
+        magique, format_, somme, n, m = _ENTETE.unpack_from(vue)
+        if magique != _MAGIQUE or format_ != _FORMAT:
+            raise OracleCorrompu(f"{chemin} n'est pas un oracle de durées valide !")
+        with vue[_ENTETE.size :] as corps:
+            if len(corps) != 8 * n + 8 * (n + 1) + 12 * m or zlib.crc32(corps) != somme:
+                raise OracleCorrompu(f"L'oracle {chemin} est altéré !")
+            bornes = [0, 8 * n, 16 * n + 8, 16 * n + 8 + 4 * m, 16 * n + 8 + 12 * m]
+            noms, debuts, hubs, durees = (
+                ljr._tableau(code, corps[debut:fin])
+                for code, debut, fin in zip("qqid", bornes, bornes[1:])
+            )
+    return OracleDurees(noms, debuts, hubs, durees)
+
+
+def construit_oracle(ville: lt.Ville) -> OracleDurees:
+    """Construit l'étiquetage par hubs de la ville (pruned landmark labeling).
+
+    - Les emplacements sont traités par degré décroissant : les carrefours les plus connectés
+    deviennent les relais du plus grand nombre d'emplacements
+    - Depuis chaque emplacement, le parcours de Dijkstra est élagué dès que les étiquettes déjà
+    construites donnent une durée au moins aussi courte : les étiquettes restent petites
+
+    Exemple :
+
+    >>> construit_oracle(CARTE_VILLE).memoire()["etiquettes_moyennes"]
+    ... 4.125
+    """
+    adjacence = lc._adjacence(ville)
+    penalites = ville._penalites
+    if penalites:
+        # durées symétriques : la pénalité de chaque extrémité est comptée pour moitié
+        adjacence = [
+            [
+                (v, k, poids + (penalites.get(u, 0.0) - penalites.get(v, 0.0)) / 2)
+                for v, k, poids in voisins
+            ]
+            for u, voisins in enumerate(adjacence)
+        ]
+    n = len(adjacence)
+    infini = float("inf")
+    ordre = sorted(
+        range(n), key=lambda i: (-len(adjacence[i]), ville._topologie.noms[i])
+    )
+    etiquettes: list[list[tuple[int, float]]] = [[] for _ in range(n)]
+    relais = [infini] * n  # étiquette du sommet racine, indexée par rang de relais
+
+    for rang, racine in enumerate(ordre):
+        for hub, duree in etiquettes[racine]:
+            relais[hub] = duree
+        distances = {racine: 0.0}
+        tas = [(0.0, racine)]
+        while tas:
+            d, u = heapq.heappop(tas)
+            if d > distances[u]:
+                continue
+            if any(relais[hub] + duree <= d for hub, duree in etiquettes[u]):
+                continue  # déjà couvert par un relais de rang inférieur
+            etiquettes[u].append((rang, d))
+            for v, _, poids in adjacence[u]:
+                nouvelle = d + poids
+                if nouvelle < distances.get(v, infini):
+                    distances[v] = nouvelle
+                    heapq.heappush(tas, (nouvelle, v))
+        for hub, _ in etiquettes[racine]:
+            relais[hub] = infini
+
+    debuts, hubs, durees = array("q", [0]), array("i"), array("d")
+    for i, etiquette in enumerate(etiquettes):  # rangs ajoutés dans l'ordre : déjà triés
+        demi_penalite = penalites.get(i, 0.0) / 2
+        for hub, duree in etiquette:
+            hubs.append(hub)
+            durees.append(duree + demi_penalite)
+        debuts.append(len(hubs))
+    return OracleDurees(array("q", ville._topologie.noms), debuts, hubs, durees)
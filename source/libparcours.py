@@ -0,0 +1,415 @@
+"""# libparcours
+
+`libparcours` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de calculer les durées depuis un emplacement vers tous les autres (isochrones,
+affectation des taxis, lignes de la table de toutes les paires) sur de grandes villes peu denses,
+sans file de priorité : algorithme "delta-stepping".
+- Les emplacements sont rangés dans des seaux de largeur `delta` selon leur durée provisoire. Les
+routes courtes (durée < `delta`) de tous les emplacements du seau courant sont relâchées ensemble,
+en une opération NumPy vectorisée, jusqu'à ce que le seau ne change plus ; les routes longues sont
+ensuite relâchées une seule fois.
+- La ville est rangée en tableaux compressés (CSR) : les routes partant de l'emplacement `i`
+occupent les positions `debuts[i]` à `debuts[i + 1]`.
+- Le relâchement des grandes frontières peut être réparti entre plusieurs fils d'exécution (NumPy
+libère le GIL).
+- `banc_essai` compare le delta-stepping au Dijkstra à tas binaire, selon la taille de la ville et
+la largeur des seaux.
+
+L'importation classique du module se fait comme suit ::
+
+    import libparcours as lp
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from source import libtaxi as lt
+from source import libcriticite as lc
+
+MORCEAU_FILS = 2048
+"""Nombre minimal d'emplacements de la frontière confiés à chaque fil d'exécution : en deçà, le
+coût de la répartition dépasse le gain."""
+
+
+@dataclass
+class _Routes:
+    """Routes orientées rangées par emplacement de départ (CSR)."""
+
+    debuts: np.ndarray
+    voisins: np.ndarray
+    poids: np.ndarray
+
+
+def _range(origines: np.ndarray, voisins: np.ndarray, poids: np.ndarray, n: int) -> _Routes:
+    ordre = np.argsort(origines, kind="stable")
+    return _Routes(
+        debuts=np.searchsorted(origines[ordre], np.arange(n + 1)),
+        voisins=voisins[ordre],
+        poids=poids[ordre],
+    )
+
+
+class GrapheCSR:
+    """Ville rangée en tableaux compressés pour les parcours vectorisés.
+
+    - Chaque route à double sens donne deux routes orientées
+    - Le poids d'une route orientée est sa durée plus la pénalité de travaux de l'emplacement
+    d'arrivée (la pénalité du départ est ajoutée à la fin du parcours)
+    - Les routes courtes et longues sont séparées une seule fois par largeur de seau
+
+    Exemple :
+
+    >>> graphe = GrapheCSR(CARTE_VILLE)
+    >>> len(graphe), len(graphe.routes.voisins)
+    ... (16, 58)
+    """
+
+    def __init__(self, ville: lt.Ville):
+        topologie = ville._topologie
+        self.n = len(topologie.noms)
+        self.noms = np.asarray(topologie.noms, dtype=np.int64)
+        self.penalites = np.zeros(self.n)
+        for i, penalite in ville._penalites.items():
+            self.penalites[i] = penalite
+        depart = np.asarray(topologie.depart, dtype=np.int64)
+        arrivee = np.asarray(topologie.arrivee, dtype=np.int64)
+        duree = np.asarray(ville._duree, dtype=np.float64)
+        origines = np.concatenate([depart, arrivee])
+        voisins = np.concatenate([arrivee, depart])
+        poids = np.concatenate([duree, duree]) + self.penalites[voisins]
+        self.routes = _range(origines, voisins, poids, self.n)
+        self.origines = np.repeat(np.arange(self.n), np.diff(self.routes.debuts))
+        self._scissions: dict[float, tuple[_Routes, _Routes]] = {}
+
+    def __len__(self) -> int:
+        return self.n
+
+    def delta_defaut(self) -> float:
+        """Largeur de seau par défaut : deux fois le poids moyen d'une route.
+
+        - Des seaux plus larges relâchent plus de routes inutilement mais font moins de tours de
+        boucle Python : sur les quadrillages de `banc_essai`, l'optimum est entre 2 et 4 fois le
+        poids moyen
+        """
+        if len(self.routes.poids) == 0:
+            return 1.0
+        return 2.0 * float(self.routes.poids.mean())
+
+    def scission(self, delta: float) -> tuple[_Routes, _Routes]:
+        """Routes courtes (poids < `delta`) et longues, rangées séparément."""
+        if delta not in self._scissions:
+            courtes = self.routes.poids < delta
+            self._scissions[delta] = tuple(
+                _range(
+                    self.origines[masque],
+                    self.routes.voisins[masque],
+                    self.routes.poids[masque],
+                    self.n,
+                )
+                for masque in (courtes, ~courtes)
+            )
+        return self._scissions[delta]
+
+
+def graphe_csr(ville: lt.Ville) -> GrapheCSR:
+    """Graphe compressé de la ville, construit une seule fois par version de la ville."""
+    memoire = getattr(ville, "_memoire_csr", None)
+    if memoire is not None and memoire[0] == ville.version:
+        return memoire[1]
+    graphe = GrapheCSR(ville)
+    ville._memoire_csr = (ville.version, graphe)
+    return graphe
+
+
+def _candidats(
+    routes: _Routes, frontiere: np.ndarray, distances: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Emplacements atteints depuis `frontiere` et durées proposées, seulement si elles améliorent."""
+    debuts = routes.debuts[frontiere]
+    nombres = routes.debuts[frontiere + 1] - debuts
+    total = int(nombres.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    decalages = np.repeat(debuts - (np.cumsum(nombres) - nombres), nombres)
+    positions = decalages + np.arange(total)
+    cibles = routes.voisins[positions]
+    valeurs = np.repeat(distances[frontiere], nombres) + routes.poids[positions]
+    ameliore = valeurs < distances[cibles]
+    return cibles[ameliore], valeurs[ameliore]
+
+
+def _relache(
+    routes: _Routes,
+    frontiere: np.ndarray,
+    distances: np.ndarray,
+    executeur: ThreadPoolExecutor | None,
+    fils: int,
+) -> np.ndarray:
+    """Relâche les routes de `frontiere` et renvoie les emplacements dont la durée a diminué.
+
+    - Avec plusieurs fils, chacun prépare les propositions d'une part de la frontière ; leur
+    application (minimum par emplacement) reste séquentielle
+    """
+    if executeur is None or len(frontiere) < 2 * MORCEAU_FILS:
+        morceaux = [_candidats(routes, frontiere, distances)]
+    else:
+        morceaux = list(
+            executeur.map(
+                lambda part: _candidats(routes, part, distances),
+                np.array_split(frontiere, min(fils, len(frontiere) // MORCEAU_FILS)),
+            )
+        )
+    ameliores = []
+    for cibles, valeurs in morceaux:
+        if len(cibles):
+            np.minimum.at(distances, cibles, valeurs)
+            ameliores.append(cibles)
+    if not ameliores:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(ameliores))
+
+
+def _delta_stepping(
+    graphe: GrapheCSR,
+    source: int,
+    delta: float,
+    limite: float,
+    fils: int,
+) -> np.ndarray:
+    """Durées depuis `source` sans la pénalité de la source (inf au-delà de `limite`)."""
+    if delta <= 0:
+        raise ValueError("La largeur des seaux doit être strictement positive.")
+    courtes, longues = graphe.scission(delta)
+    distances = np.full(graphe.n, np.inf)
+    distances[source] = 0.0
+    definitifs = np.zeros(graphe.n, dtype=bool)
+    en_attente = np.array([source], dtype=np.int64)
+    executeur = ThreadPoolExecutor(max_workers=fils) if fils > 1 else None
+    try:
+        while True:
+            en_attente = en_attente[~definitifs[en_attente]]
+            if not len(en_attente):
+                break
+            seau = np.floor(distances[en_attente].min() / delta)
+            if seau * delta > limite:
+                break
+            # appartenance par indice de seau : une borne (seau + 1) * delta arrondie pourrait
+            # exclure le minimum lui-même
+            dans_seau = np.floor(distances[en_attente] / delta) <= seau
+            frontiere, restes = en_attente[dans_seau], [en_attente[~dans_seau]]
+            traites = []
+            # routes courtes : le seau est vidé puis rempli de nouveau jusqu'à stabilité
+            while len(frontiere):
+                traites.append(frontiere)
+                ameliores = _relache(courtes, frontiere, distances, executeur, fils)
+                dans_seau = np.floor(distances[ameliores] / delta) <= seau
+                frontiere = ameliores[dans_seau]
+                restes.append(ameliores[~dans_seau])
+            traites = np.unique(np.concatenate(traites))
+            definitifs[traites] = True
+            # routes longues : elles mènent toujours à un seau suivant
+            restes.append(_relache(longues, traites, distances, executeur, fils))
+            en_attente = np.unique(np.concatenate(restes))
+    finally:
+        if executeur is not None:
+            executeur.shutdown()
+    distances[distances > limite] = np.inf
+    return distances
+
+
+def distances_delta(
+    graphe: GrapheCSR,
+    source: int,
+    delta: float = None,
+    limite: float = None,
+    fils: int = 1,
+) -> np.ndarray:
+    """Durées des trajets les plus courts depuis l'indice dense `source` vers tous les emplacements.
+
+    - `delta` : largeur des seaux (par défaut, voir `GrapheCSR.delta_defaut`) ; un petit `delta` se
+    rapproche de Dijkstra, un grand `delta` de Bellman-Ford
+    - `limite` : les emplacements au-delà de cette durée ne sont pas explorés (durée infinie)
+    - `fils` : nombre de fils d'exécution se partageant le relâchement des routes
+    - Les durées comptent les pénalités de travaux comme `duree_trajet` (0 pour `source`),
+    inf pour un emplacement non relié
+
+    Exemple :
+
+    >>> distances_delta(GrapheCSR(CARTE_VILLE), 0)[:4]
+    ... array([0., 5., 5., 4.])
+    """
+    delta = graphe.delta_defaut() if delta is None else delta
+    # la pénalité de la source s'ajoute à toutes les durées : la limite interne en tient compte
+    penalite = graphe.penalites[source]
+    limite_interne = np.inf if limite is None else limite - penalite
+    distances = _delta_stepping(graphe, source, delta, limite_interne, fils)
+    distances[np.isfinite(distances)] += penalite
+    distances[source] = 0.0
+    return distances
+
+
+def arbre_delta(
+    graphe: GrapheCSR,
+    source: int,
+    delta: float = None,
+    limite: float = None,
+    fils: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Durées depuis `source` et arbre des trajets les plus courts.
+
+    - Renvoie les durées (voir `distances_delta`) et le prédécesseur de chaque emplacement sur son
+    trajet le plus court (-1 pour `source` et les emplacements non atteints)
+    - Les prédécesseurs sont retrouvés en une passe vectorisée sur toutes les routes : une route est
+    sur un trajet le plus court si elle relie exactement les durées de ses deux extrémités
+    """
+    delta = graphe.delta_defaut() if delta is None else delta
+    limite_interne = np.inf if limite is None else limite - graphe.penalites[source]
+    internes = _delta_stepping(graphe, source, delta, limite_interne, fils)
+    predecesseurs = np.full(graphe.n, -1, dtype=np.int64)
+    origines, voisins = graphe.origines, graphe.routes.voisins
+    serrees = np.isfinite(internes[voisins]) & (
+        internes[origines] + graphe.routes.poids == internes[voisins]
+    )
+    serrees &= voisins != source
+    predecesseurs[voisins[serrees]] = origines[serrees]
+    distances = internes
+    distances[np.isfinite(distances)] += graphe.penalites[source]
+    distances[source] = 0.0
+    return distances, predecesseurs
+
+
+def chemin(predecesseurs: np.ndarray, source: int, cible: int) -> list[int]:
+    """Indices denses des emplacements de `source` à `cible` dans l'arbre des prédécesseurs."""
+    etapes = [cible]
+    while etapes[-1] != source:
+        precedent = int(predecesseurs[etapes[-1]])
+        if precedent < 0:
+            raise lt.PasDeChemin(f"L'emplacement d'indice {cible} n'est pas atteint.")
+        etapes.append(precedent)
+    etapes.reverse()
+    return etapes
+
+
+def ville_quadrillage(cote: int, graine: int = 0, coordonnees: bool = False) -> lt.Ville:
+    """Grande ville peu dense pour les bancs d'essai : quadrillage de `cote` x `cote` emplacements.
+
+    - Routes entre voisins horizontaux et verticaux, quelques diagonales, durées de 1 à 10 minutes
+    - `coordonnees` : si vrai, chaque emplacement reçoit sa position dans le quadrillage, décalée
+    horizontalement au hasard (recherche A*, index spatial)
+    """
+    generateur = random.Random(graine)
+    emplacements = [lt.Emplacement(nom=i) for i in range(cote * cote)]
+    arretes = []
+    for i in range(cote * cote):
+        x, y = i % cote, i // cote
+        voisins = []
+        if x + 1 < cote:
+            voisins.append(i + 1)
+        if y + 1 < cote:
+            voisins.append(i + cote)
+        if x + 1 < cote and y + 1 < cote and generateur.random() < 0.1:
+            voisins.append(i + cote + 1)
+        for j in voisins:
+            arretes.append(
+                (
+                    emplacements[i],
+                    emplacements[j],
+                    round(generateur.uniform(1.0, 10.0), 1),
+                )
+            )
+    positions = None
+    if coordonnees:
+        positions = {
+            e: (e.nom % cote + generateur.uniform(-0.3, 0.3), float(e.nom // cote))
+            for e in emplacements
+        }
+    return lt.Ville(emplacements=emplacements, arretes=arretes, coordonnees=positions)
+
+
+@dataclass
+class MesureParcours:
+    """Mesure de la durée moyenne d'un parcours depuis un emplacement.
+
+    `emplacements`, `routes`: taille de la ville
+    `methode`: "tas" (Dijkstra à tas binaire) ou "delta" (delta-stepping)
+    `delta`: largeur des seaux (None pour le tas)
+    `fils`: nombre de fils d'exécution du relâchement
+    `secondes`: durée moyenne d'un parcours complet
+    `accord`: vrai si les durées sont celles du Dijkstra à tas
+    """
+
+    emplacements: int
+    routes: int
+    methode: str
+    delta: float | None
+    fils: int
+    secondes: float
+    accord: bool
+
+
+def banc_essai(
+    cotes: list[int],
+    largeurs: list[float] = None,
+    fils: list[int] = None,
+    sources: int = 3,
+    graine: int = 0,
+) -> list[MesureParcours]:
+    """Compare le delta-stepping au Dijkstra à tas sur des quadrillages de différentes tailles.
+
+    - `cotes` : côtés des quadrillages (voir `ville_quadrillage`)
+    - `largeurs` : largeurs des seaux, en multiples de `GrapheCSR.delta_defaut`
+    (par défaut 0.25, 0.5, 1, 2)
+    - `fils` : nombres de fils d'exécution essayés (par défaut 1)
+    - `sources` : nombre d'emplacements de départ tirés au hasard, la durée mesurée est la moyenne
+
+    Exemple :
+
+    >>> banc_essai([100], largeurs=[1.0])
+    ... [MesureParcours(emplacements=10000, ..., methode='tas', ...),
+    ...  MesureParcours(emplacements=10000, ..., methode='delta', delta=11.0, ...)]
+    """
+    largeurs = [0.25, 0.5, 1.0, 2.0] if largeurs is None else largeurs
+    fils = [1] if fils is None else fils
+    generateur = random.Random(graine)
+    mesures = []
+    for cote in cotes:
+        ville = ville_quadrillage(cote, graine)
+        n, m = len(ville.emplacements), len(ville.arretes)
+        departs = [generateur.randrange(n) for _ in range(sources)]
+
+        adjacence = lc._adjacence(ville)
+        debut = time.perf_counter()
+        references = [np.asarray(lc._distances(adjacence, s)) for s in departs]
+        mesures.append(
+            MesureParcours(
+                n, m, "tas", None, 1, (time.perf_counter() - debut) / sources, True
+            )
+        )
+
+        graphe = graphe_csr(ville)
+        for largeur in largeurs:
+            delta = largeur * graphe.delta_defaut()
+            graphe.scission(delta)  # préparation hors mesure, comme le graphe du tas
+            for nombre in fils:
+                debut = time.perf_counter()
+                resultats = [distances_delta(graphe, s, delta, fils=nombre) for s in departs]
+                secondes = (time.perf_counter() - debut) / sources
+                accord = all(
+                    np.allclose(r, attendu) for r, attendu in zip(resultats, references)
+                )
+                mesures.append(
+                    MesureParcours(n, m, "delta", delta, nombre, secondes, accord)
+                )
+    return mesures
@@ -0,0 +1,362 @@
+"""# libregion
+
+`libregion` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de calculer des trajets sur une ville trop grande pour tenir dans un seul processus :
+la ville est découpée en régions, chacune confiée à un processus dédié (l'équivalent local d'un
+serveur distinct) qui ne connaît que ses emplacements et ses routes internes.
+- Les emplacements reliés à une autre région par une route sont les emplacements frontières.
+Le processus coordinateur ne conserve que le graphe de recouvrement : durées entre frontières d'une
+même région (calculées par les régions) et routes entre régions.
+- Un trajet est assemblé à partir des tronçons internes calculés par les régions, reliés entre eux
+par le graphe de recouvrement. La durée obtenue est celle de `determine_trajet` sur la ville entière.
+
+L'importation classique du module se fait comme suit ::
+
+    import libregion as lr
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import heapq
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import count
+from source import libtaxi as lt
+
+Troncons = dict[int, tuple[float, list[int]]]
+"""Numéro de l'emplacement atteint => (durée, numéros des emplacements du tronçon)."""
+
+_FIN = "fin"
+"""Liaison du graphe de recouvrement vers l'arrivée, par le tronçon final."""
+
+
+@dataclass
+class Partition:
+    """Découpage de la ville en régions.
+
+    `regions`: emplacements de chaque région
+    `appartenance`: numéro d'emplacement => indice de sa région
+    `frontieres`: pour chaque région, ses emplacements reliés à une autre région
+    `routes_frontieres`: routes reliant deux régions différentes (départ, arrivée, durée)
+    """
+
+    regions: list[list[lt.Emplacement]]
+    appartenance: dict[int, int]
+    frontieres: list[list[lt.Emplacement]]
+    routes_frontieres: list[tuple[lt.Emplacement, lt.Emplacement, float]]
+
+    def __contains__(self, emplacement: lt.Emplacement) -> bool:
+        return emplacement.nom in self.appartenance
+
+
+def partitionne(ville: lt.Ville, regions: int) -> Partition:
+    """Découpe la ville en `regions` régions de tailles équilibrées.
+
+    - Les emplacements sont rangés par parcours en largeur (en partant d'un emplacement en périphérie)
+    puis découpés en tranches consécutives : les régions obtenues sont compactes et les frontières
+    restent petites
+
+    Exemple :
+
+    >>> partition = partitionne(CARTE_VILLE, regions=2)
+    >>> len(partition.regions)
+    ... 2
+    """
+    if regions < 1:
+        raise ValueError("Le nombre de régions doit être strictement positif.")
+    topologie = ville._topologie
+    n = len(topologie.noms)
+    voisins: list[list[int]] = [[] for _ in range(n)]
+    for u, v in zip(topologie.depart, topologie.arrivee):
+        voisins[u].append(v)
+        voisins[v].append(u)
+
+    def largeur(depart: int, vus: list[bool]) -> list[int]:
+        ordre, file = [depart], deque([depart])
+        vus[depart] = True
+        while file:
+            for v in voisins[file.popleft()]:
+                if not vus[v]:
+                    vus[v] = True
+                    ordre.append(v)
+                    file.append(v)
+        return ordre
+
+    ordre: list[int] = []
+    vus = [False] * n
+    for i in range(n):
+        if not vus[i]:
+            # l'emplacement le plus éloigné de `i` sert de point de départ périphérique
+            peripherie = largeur(i, [False] * n)[-1]
+            ordre.extend(largeur(peripherie, vus))
+
+    taille = -(-n // regions) if n else 1
+    objets = topologie.objets
+    decoupage = [
+        [objets[i] for i in ordre[debut : debut + taille]] for debut in range(0, n, taille)
+    ]
+    appartenance = {e.nom: r for r, region in enumerate(decoupage) for e in region}
+    frontieres: list[set[lt.Emplacement]] = [set() for _ in decoupage]
+    routes_frontieres = []
+    for depart, arrivee, duree in ville.arretes:
+        r_depart, r_arrivee = appartenance[depart.nom], appartenance[arrivee.nom]
+        if r_depart != r_arrivee:
+            frontieres[r_depart].add(depart)
+            frontieres[r_arrivee].add(arrivee)
+            routes_frontieres.append((depart, arrivee, duree))
+    return Partition(
+        regions=decoupage,
+        appartenance=appartenance,
+        frontieres=[sorted(f, key=lambda e: e.nom) for f in frontieres],
+        routes_frontieres=routes_frontieres,
+    )
+
+
+def ville_region(ville: lt.Ville, partition: Partition, region: int) -> lt.Ville:
+    """Sous-ville d'une région : ses emplacements et ses routes internes uniquement."""
+    emplacements = partition.regions[region]
+    appartenance = partition.appartenance
+    return lt.Ville(
+        emplacements=emplacements,
+        arretes=[
+            (depart, arrivee, duree)
+            for depart, arrivee, duree in ville.arretes
+            if appartenance[depart.nom] == region == appartenance[arrivee.nom]
+        ],
+        coordonnees={
+            emplacement: position
+            for emplacement, position in ville.coordonnees.items()
+            if appartenance[emplacement.nom] == region
+        },
+        travaux={
+            emplacement: penalite
+            for emplacement, penalite in ville.travaux.items()
+            if appartenance[emplacement.nom] == region
+        },
+    )
+
+
+class _Region:
+    """Calculs internes à une région, exécutés dans le processus de la région."""
+
+    def __init__(self, ville: lt.Ville):
+        self.ville = ville
+        self.graphe = lt._convertit_en_nx(ville)
+
+    def troncons(self, source: int, cibles: list[int]) -> Troncons:
+        """Trajets internes à la région de `source` vers chacune des `cibles` atteignables.
+
+        - Les durées ne comptent pas la pénalité de travaux de `source` : mis bout à bout, les
+        tronçons comptent une seule fois chaque emplacement traversé
+        """
+        depart = lt.Emplacement(nom=source)
+        arrivees = {lt.Emplacement(nom=cible) for cible in cibles}
+        durees, predecesseurs = lt._dijkstra(self.graphe, depart, cibles=arrivees)
+        penalite = self.ville.penalite(depart)
+        return {
+            arrivee.nom: (
+                durees[arrivee] - penalite if arrivee != depart else durees[arrivee],
+                [e.nom for e in lt._remonte_chemin(predecesseurs, depart, arrivee)],
+            )
+            for arrivee in arrivees
+            if arrivee in durees
+        }
+
+    def durees_frontieres(self, frontiere: list[int]) -> dict[tuple[int, int], float]:
+        """Durées internes à la région entre toutes ses frontières (arêtes du recouvrement)."""
+        resultat = {}
+        for source in frontiere:
+            for cible, (duree, _) in self.troncons(source, frontiere).items():
+                if cible != source:
+                    resultat[(source, cible)] = duree
+        return resultat
+
+
+_REGION: _Region | None = None
+"""Région confiée au processus courant."""
+
+
+def _initialise(ville: lt.Ville) -> None:
+    global _REGION
+    _REGION = _Region(ville)
+
+
+def _execute(methode: str, *arguments):
+    return getattr(_REGION, methode)(*arguments)
+
+
+class RoutageRegional:
+    """Calcul de trajets sur une ville découpée en régions servies par des processus distincts.
+
+    `ville`: ville à découper, qui n'est plus conservée par le coordinateur après la construction
+    `regions`: nombre de régions (un processus par région)
+    `processus`: si faux, les régions sont servies dans le processus courant (mêmes calculs)
+
+    - Les durées obtenues sont identiques à celles de `determine_trajet` sur la ville entière ;
+    en cas d'égalité entre plusieurs trajets optimaux, l'itinéraire choisi peut différer
+    - S'utilise comme gestionnaire de contexte pour arrêter les processus des régions
+
+    Exemple :
+
+    >>> with RoutageRegional(CARTE_VILLE, regions=4) as routage:
+    ...     routage.determine_trajet(Emplacement(nom=1), Emplacement(nom=12))
+    ... Itineraire(etapes=[Emplacement(nom=1), ..., Emplacement(nom=12)])
+    """
+
+    def __init__(self, ville: lt.Ville, regions: int = 4, processus: bool = True):
+        self.partition = partitionne(ville, regions)
+        villes = [
+            ville_region(ville, self.partition, r)
+            for r in range(len(self.partition.regions))
+        ]
+        if processus:
+            self._executeurs = [
+                ProcessPoolExecutor(
+                    max_workers=1, initializer=_initialise, initargs=(ville_r,)
+                )
+                for ville_r in villes
+            ]
+            self._regions = None
+        else:
+            self._executeurs = None
+            self._regions = [_Region(ville_r) for ville_r in villes]
+
+        # pénalités de travaux, comptées en entrant dans un emplacement par le recouvrement
+        self.penalites = {e.nom: penalite for e, penalite in ville.travaux.items()}
+
+        # graphe de recouvrement : frontière => [(frontière voisine, durée, région ou None)]
+        self.recouvrement: dict[int, list[tuple[int, float, int | None]]] = {}
+        for depart, arrivee, duree in self.partition.routes_frontieres:
+            self.recouvrement.setdefault(depart.nom, []).append(
+                (arrivee.nom, duree + self.penalites.get(arrivee.nom, 0.0), None)
+            )
+            self.recouvrement.setdefault(arrivee.nom, []).append(
+                (depart.nom, duree + self.penalites.get(depart.nom, 0.0), None)
+            )
+        calculs = [
+            self._soumet(r, "durees_frontieres", [e.nom for e in frontiere])
+            for r, frontiere in enumerate(self.partition.frontieres)
+        ]
+        for r, calcul in enumerate(calculs):
+            for (source, cible), duree in calcul.result().items():
+                self.recouvrement[source].append((cible, duree, r))
+
+    def _soumet(self, region: int, methode: str, *arguments) -> Future:
+        """Confie un calcul au processus de la région (ou l'exécute immédiatement)."""
+        if self._executeurs is not None:
+            return self._executeurs[region].submit(_execute, methode, *arguments)
+        resultat: Future = Future()
+        resultat.set_result(getattr(self._regions[region], methode)(*arguments))
+        return resultat
+
+    def fermer(self) -> None:
+        """Arrête les processus des régions."""
+        for executeur in self._executeurs or []:
+            executeur.shutdown()
+
+    def __enter__(self) -> "RoutageRegional":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.fermer()
+
+    def determine_trajet(
+        self, depart: lt.Emplacement, arrivee: lt.Emplacement
+    ) -> lt.Itineraire:
+        """Détermine le trajet le plus court entre deux emplacements de la ville.
+
+        - Mêmes vérifications et exceptions que `determine_trajet`
+        - Les premiers et derniers tronçons sont calculés en parallèle par les deux régions concernées
+        """
+        # la partition connaît les emplacements de la ville : elle suffit aux vérifications
+        lt._determine_probleme(depart, arrivee, self.partition)
+        appartenance, frontieres = self.partition.appartenance, self.partition.frontieres
+        r_depart, r_arrivee = appartenance[depart.nom], appartenance[arrivee.nom]
+        cibles = [e.nom for e in frontieres[r_depart]]
+        if r_depart == r_arrivee:
+            cibles.append(arrivee.nom)
+        calcul_depart = self._soumet(r_depart, "troncons", depart.nom, cibles)
+        calcul_arrivee = self._soumet(
+            r_arrivee, "troncons", arrivee.nom, [e.nom for e in frontieres[r_arrivee]]
+        )
+        premiers, derniers = calcul_depart.result(), calcul_arrivee.result()
+
+        resultat = self._recouvrement(depart.nom, arrivee.nom, premiers, derniers)
+        if resultat is None:
+            raise lt.PasDeChemin(
+                f"Les emplacements {depart} et {arrivee} ne sont pas connectés !"
+            )
+
+        # assemblage : tronçons internes demandés en parallèle aux régions concernées
+        etapes, liaisons = resultat
+        calculs = [
+            self._soumet(liaison, "troncons", source, [cible])
+            if isinstance(liaison, int)
+            else None
+            for source, cible, liaison in zip(etapes, etapes[1:], liaisons)
+        ]
+        chemin = list(premiers[etapes[0]][1])
+        for source, cible, liaison, calcul in zip(etapes, etapes[1:], liaisons, calculs):
+            if liaison is None:
+                chemin.append(cible)  # route entre deux régions
+            elif liaison == _FIN:
+                chemin.extend(reversed(derniers[source][1][:-1]))
+            else:
+                chemin.extend(calcul.result()[cible][1][1:])
+        return lt.Itineraire(etapes=[lt.Emplacement(nom=nom) for nom in chemin])
+
+    def _recouvrement(
+        self, depart: int, arrivee: int, premiers: Troncons, derniers: Troncons
+    ) -> tuple[list[int], list] | None:
+        """Dijkstra sur le graphe de recouvrement, entre les tronçons de départ et d'arrivée.
+
+        Renvoie les emplacements successifs du premier emplacement atteint depuis le départ jusqu'à
+        l'arrivée, et la nature de chaque liaison : région du tronçon interne, None pour une route
+        entre régions, `_FIN` pour le tronçon final calculé par la région d'arrivée.
+        """
+        compteur = count()  # départage des égalités sans comparer les liaisons
+        durees: dict[int, float] = {}
+        predecesseurs: dict[int, tuple[int, int | str | None]] = {}
+        tas = [(duree, next(compteur), nom, None, None) for nom, (duree, _) in premiers.items()]
+        heapq.heapify(tas)
+        while tas:
+            d, _, noeud, precedent, liaison = heapq.heappop(tas)
+            if noeud in durees:
+                continue
+            durees[noeud] = d
+            if precedent is not None:
+                predecesseurs[noeud] = (precedent, liaison)
+            if noeud == arrivee:
+                break
+            if noeud in derniers:
+                # tronçon final calculé depuis l'arrivée : il compte la frontière (déjà comptée)
+                # mais pas l'arrivée
+                duree = (
+                    derniers[noeud][0]
+                    - self.penalites.get(noeud, 0.0)
+                    + self.penalites.get(arrivee, 0.0)
+                )
+                heapq.heappush(tas, (d + duree, next(compteur), arrivee, noeud, _FIN))
+            for voisin, duree, region in self.recouvrement.get(noeud, []):
+                if voisin not in durees:
+                    heapq.heappush(tas, (d + duree, next(compteur), voisin, noeud, region))
+        if arrivee not in durees:
+            return None
+
+        etapes, liaisons = [arrivee], []
+        while etapes[-1] in predecesseurs:
+            precedent, liaison = predecesseurs[etapes[-1]]
+            etapes.append(precedent)
+            liaisons.append(liaison)
+        etapes.reverse()
+        liaisons.reverse()
+        return etapes, liaisons
@@ -0,0 +1,346 @@
+"""# libroutage
+
+`libroutage` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de précalculer les trajets les plus courts entre tous les couples d'emplacements de la
+ville sans conserver V² listes d'emplacements : seule la matrice des "prochains emplacements" est
+stockée, dans un tableau typé d'entiers courts (2 octets par case jusqu'à 32 767 emplacements,
+4 octets au-delà).
+- Les itinéraires ne sont reconstruits qu'à la demande, en suivant la matrice de proche en proche.
+- La table peut être sauvegardée puis projetée en mémoire (mmap) : seules les lignes consultées sont
+chargées par le système.
+
+L'importation classique du module se fait comme suit ::
+
+    import libroutage as lrt
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import heapq
+import mmap
+import struct
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from source import libtaxi as lt
+from source import libcriticite as lc
+from source import libjournal as ljr
+
+_MAGIQUE = b"TXRT"
+_FORMAT = 2
+_ENTETE = struct.Struct("<4sHcxIQQ4x")
+"""Signature, version du format, type des cases, somme de contrôle, emplacements, routes.
+
+La taille de l'en-tête (32 octets) garde la matrice alignée dans le fichier projeté.
+"""
+_AUCUN = -1
+"""Case de la matrice sans prochain emplacement (arrivée atteinte ou inaccessible)."""
+
+
+class TableCorrompue(Exception):
+    pass
+
+
+def type_cases(emplacements: int) -> str:
+    """Type des cases de la matrice : entiers sur 2 octets si possible, sinon sur 4 octets."""
+    return "h" if emplacements <= 2**15 - 1 else "i"
+
+
+class TableRoutage:
+    """Table des prochains emplacements sur les trajets les plus courts entre tous les emplacements.
+
+    `noms`: numéros des emplacements (indice dense => numéro)
+    `suivants`: matrice aplatie, `suivants[i * n + j]` est l'indice du prochain emplacement sur le
+    trajet le plus court de `i` vers `j` (-1 si `i == j` ou si `j` est inaccessible)
+    `depart`, `arrivee`, `duree`: routes de la ville, pour calculer la durée d'un trajet
+    `penalites`: pénalité de travaux de chaque emplacement (indice dense), aucune si non spécifié
+
+    Exemple :
+
+    >>> table = construit_table(CARTE_VILLE)
+    >>> table.chemin(Emplacement(nom=1), Emplacement(nom=12))
+    ... Itineraire(etapes=[Emplacement(nom=1), Emplacement(nom=2), ..., Emplacement(nom=12)])
+    """
+
+    def __init__(
+        self,
+        noms: array,
+        suivants,
+        depart: array,
+        arrivee: array,
+        duree: array,
+        penalites: array = None,
+    ):
+        self.noms = noms
+        self.index = {nom: i for i, nom in enumerate(noms)}
+        self.suivants = suivants
+        self._routes: dict[tuple[int, int], float] = {}
+        for u, v, poids in zip(depart, arrivee, duree):
+            for cle in ((u, v), (v, u)):
+                if poids < self._routes.get(cle, float("inf")):
+                    self._routes[cle] = poids
+        self._depart, self._arrivee, self._duree = depart, arrivee, duree
+        self._penalites = (
+            penalites if penalites is not None else array("d", [0.0]) * len(noms)
+        )
+        self._projection: mmap.mmap | None = None
+
+    def __len__(self) -> int:
+        return len(self.noms)
+
+    def __contains__(self, emplacement: lt.Emplacement) -> bool:
+        return emplacement.nom in self.index
+
+    def _indices(self, depart: int, arrivee: int):
+        """Indices denses des emplacements du trajet le plus court (sans les construire)."""
+        n, suivants = len(self.noms), self.suivants
+        i, j = self.index[depart], self.index[arrivee]
+        yield i
+        while i != j:
+            i = suivants[i * n + j]
+            yield i
+
+    def _verifie(self, depart: lt.Emplacement, arrivee: lt.Emplacement) -> None:
+        # la table connaît les emplacements de la ville : elle suffit aux vérifications
+        lt._determine_probleme(depart, arrivee, self)
+        n = len(self.noms)
+        if self.suivants[self.index[depart.nom] * n + self.index[arrivee.nom]] == _AUCUN:
+            raise lt.PasDeChemin(
+                f"Les emplacements {depart} et {arrivee} ne sont pas connectés !"
+            )
+
+    def chemin(self, depart: lt.Emplacement, arrivee: lt.Emplacement) -> lt.Itineraire:
+        """Reconstruit l'itinéraire le plus court entre deux emplacements.
+
+        - Mêmes vérifications et exceptions que `determine_trajet`
+        """
+        self._verifie(depart, arrivee)
+        noms = self.noms
+        return lt.Itineraire(
+            etapes=[
+                lt.Emplacement(nom=noms[i])
+                for i in self._indices(depart.nom, arrivee.nom)
+            ]
+        )
+
+    def duree(self, depart: lt.Emplacement, arrivee: lt.Emplacement) -> float:
+        """Durée du trajet le plus court, calculée en suivant la matrice (sans construire le chemin)."""
+        self._verifie(depart, arrivee)
+        penalites = self._penalites
+        etapes = self._indices(depart.nom, arrivee.nom)
+        precedent = next(etapes)
+        total, travaux = 0.0, penalites[precedent]
+        for i in etapes:
+            total += self._routes[(precedent, i)]
+            travaux += penalites[i]
+            precedent = i
+        return total + travaux
+
+    def memoire(self) -> dict[str, int]:
+        """Octets occupés par la matrice et par les routes."""
+        return {
+            "emplacements": len(self.noms),
+            "octets_par_case": self.suivants.itemsize,
+            "matrice": self.suivants.itemsize * len(self.suivants),
+            "routes": sum(
+                t.itemsize * len(t)
+                for t in (self._depart, self._arrivee, self._duree, self._penalites)
+            ),
+        }
+
+    def sauvegarde(self, chemin: str) -> None:
+        """Écrit la table dans un fichier binaire, de manière atomique."""
+        suivants = self.suivants
+        if not isinstance(suivants, array):
+            suivants = array(suivants.format, suivants)
+        morceaux = [
+            ljr._octets(t)
+            for t in (
+                self.noms,
+                self._depart,
+                self._arrivee,
+                self._duree,
+                self._penalites,
+            )
+        ]
+        # la matrice est placée en dernier, à une position multiple de 8
+        morceaux.append(b"\0" * (-sum(map(len, morceaux)) % 8))
+        morceaux.append(ljr._octets(suivants))
+        corps = b"".join(morceaux)
+        entete = _ENTETE.pack(
+            _MAGIQUE,
+            _FORMAT,
+            suivants.typecode.encode(),
+            zlib.crc32(corps),
+            len(self.noms),
+            len(self._depart),
+        )
+        temporaire = chemin + ".tmp"
+        with open(temporaire, "wb") as fichier:
+            fichier.write(entete + corps)
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(temporaire, chemin)
+
+    def fermer(self) -> None:
+        """Libère la projection en mémoire d'une table chargée par `charge_table`."""
+        if self._projection is not None:
+            self.suivants.release()
+            self._projection.close()
+            self._projection = None
+
+    def __enter__(self) -> "TableRoutage":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.fermer()
+
+
+def charge_table(
+    chemin: str, projection: bool = True, verifie: bool = True
+) -> TableRoutage:
+    """Charge une table sauvegardée par `TableRoutage.sauvegarde`.
+
+    - `projection` : si vrai, la matrice reste dans le fichier projeté en mémoire (mmap) et n'est
+    lue qu'à la demande, sinon elle est copiée en mémoire
+    - `verifie` : si vrai, la somme de contrôle du fichier est vérifiée, ce qui oblige à lire toute
+    la matrice ; à désactiver pour les très grandes tables projetées
+    - Renvoie l'exception TableCorrompue si le fichier est tronqué ou altéré
+    - Les tables du format précédent (sans pénalités de travaux) restent lisibles
+
+    Exemple :
+
+    >>> with charge_table("table.bin") as table:
+    ...     table.duree(Emplacement(nom=1), Emplacement(nom=12))
+    ... 17.0
+    """
+    with open(chemin, "rb") as fichier:
+        try:
+            fichier_projete = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            raise TableCorrompue(f"La table {chemin} est vide !")
+    try:
+        with memoryview(fichier_projete) as vue:
+            if len(vue) < _ENTETE.size:
+                raise TableCorrompue(f"La table {chemin} est tronquée !")
+            magique, format_, code, somme, n, m = _ENTETE.unpack_from(vue)
+            code = code.decode()
+            if (
+                magique != _MAGIQUE
+                or format_ not in (1, _FORMAT)
+                or code not in ("h", "i")
+            ):
+                raise TableCorrompue(f"{chemin} n'est pas une table de routage valide !")
+            taille = array(code).itemsize
+            bornes = [0, 8 * n, 8 * n + 4 * m, 8 * n + 8 * m, 8 * n + 16 * m]
+            codes = "qiid"
+            if format_ == _FORMAT:
+                bornes.append(bornes[-1] + 8 * n)
+                codes += "d"
+            matrice = bornes[-1] + (-bornes[-1] % 8)
+            with vue[_ENTETE.size :] as corps:
+                if len(corps) != matrice + taille * n * n or (
+                    verifie and zlib.crc32(corps) != somme
+                ):
+                    raise TableCorrompue(f"La table {chemin} est altérée !")
+                noms, depart, arrivee, duree, *penalites = (
+                    ljr._tableau(code_route, corps[debut:fin])
+                    for code_route, debut, fin in zip(codes, bornes, bornes[1:])
+                )
+                penalites = penalites[0] if penalites else None
+                if not projection or sys.byteorder == "big":
+                    suivants = ljr._tableau(code, corps[matrice:])
+    except BaseException:
+        fichier_projete.close()
+        raise
+
+    if not projection or sys.byteorder == "big":
+        fichier_projete.close()
+        return TableRoutage(noms, suivants, depart, arrivee, duree, penalites)
+    debut = _ENTETE.size + matrice
+    suivants = memoryview(fichier_projete)[debut:].cast(code)
+    table = TableRoutage(noms, suivants, depart, arrivee, duree, penalites)
+    table._projection = fichier_projete
+    return table
+
+
+_ADJACENCE: lc.Adjacence = []
+"""Adjacence de la ville, transmise une seule fois à chaque processus."""
+
+
+def _initialise(adjacence: lc.Adjacence) -> None:
+    global _ADJACENCE
+    _ADJACENCE = adjacence
+
+
+def _colonnes(cibles: list[int]) -> list[tuple[int, list[int]]]:
+    """Prochains emplacements vers chacune des `cibles` (exécuté dans un processus du pool).
+
+    - Routes à double sens : le prédécesseur de `i` dans l'arbre des plus courts chemins issu de la
+    cible est le prochain emplacement de `i` vers la cible
+    """
+    adjacence = _ADJACENCE
+    infini = float("inf")
+    resultat = []
+    for cible in cibles:
+        distances = [infini] * len(adjacence)
+        predecesseurs = [_AUCUN] * len(adjacence)
+        distances[cible] = 0.0
+        tas = [(0.0, cible)]
+        while tas:
+            d, u = heapq.heappop(tas)
+            if d > distances[u]:
+                continue
+            for v, _, poids in adjacence[u]:
+                if d + poids < distances[v]:
+                    distances[v] = d + poids
+                    predecesseurs[v] = u
+                    heapq.heappush(tas, (d + poids, v))
+        resultat.append((cible, predecesseurs))
+    return resultat
+
+
+def construit_table(ville: lt.Ville, processus: int = 1) -> TableRoutage:
+    """Calcule la table des prochains emplacements de la ville (un Dijkstra par emplacement).
+
+    - `processus` : nombre de processus se partageant les emplacements d'arrivée,
+    avec `processus=1` (par défaut) le calcul se fait dans le processus courant
+
+    Exemple :
+
+    >>> construit_table(CARTE_VILLE).memoire()["matrice"]
+    ... 512
+    """
+    adjacence = lc._adjacence(ville)
+    n = len(adjacence)
+    lots = [list(range(i, n, processus)) for i in range(min(processus, n))]
+    if processus == 1 or len(lots) <= 1:
+        _initialise(adjacence)
+        resultats = [_colonnes(lot) for lot in lots]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=len(lots), initializer=_initialise, initargs=(adjacence,)
+        ) as pool:
+            resultats = list(pool.map(_colonnes, lots))
+
+    suivants = array(type_cases(n), [_AUCUN]) * (n * n)
+    for colonnes in resultats:
+        for cible, predecesseurs in colonnes:
+            suivants[cible::n] = array(suivants.typecode, predecesseurs)
+    topologie = ville._topologie
+    return TableRoutage(
+        array("q", topologie.noms),
+        suivants,
+        array("i", topologie.depart),
+        array("i", topologie.arrivee),
+        array("d", ville._duree),
+        array("d", (ville._penalites.get(i, 0.0) for i in range(n))),
+    )
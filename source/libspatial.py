@@ -0,0 +1,164 @@
+"""# libspatial
+
+`libspatial` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet de rattacher des positions GPS (taxis, clients) à l'emplacement de la ville le plus
+proche, pour un grand nombre de positions en un seul appel vectorisé.
+- Les emplacements disposant de coordonnées (`Ville(..., coordonnees=...)`) sont rangés dans une
+grille régulière : chaque case contient en moyenne un emplacement, et la recherche s'étend case par
+case autour de chaque position jusqu'à ce qu'aucun emplacement plus proche ne puisse exister.
+
+L'importation classique du module se fait comme suit ::
+
+    import libspatial as ls
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from source import libtaxi as lt
+
+
+class IndexSpatial:
+    """Grille des emplacements de la ville ayant des coordonnées.
+
+    - Les emplacements sont triés par case, `debuts[c]` à `debuts[c + 1]` sont les positions
+    des emplacements de la case `c` (rangement compressé, sans liste par case)
+    - Les emplacements sans coordonnées sont ignorés
+
+    Exemple :
+
+    >>> index = IndexSpatial(ville)
+    >>> index.plus_proches(np.array([[0.1, 0.2], [3.9, 4.1]]))
+    ... (array([1, 7]), array([0.2236068 , 0.14142136]))
+    """
+
+    def __init__(self, ville: lt.Ville):
+        coordonnees = ville.coordonnees
+        if not coordonnees:
+            raise ValueError("Aucun emplacement de la ville n'a de coordonnées.")
+        noms = np.fromiter((e.nom for e in coordonnees), dtype=np.int64)
+        positions = np.array(list(coordonnees.values()), dtype=np.float64)
+
+        self.origine = positions.min(axis=0)
+        largeur, hauteur = positions.max(axis=0) - self.origine
+        n = len(noms)
+        if largeur > 0 and hauteur > 0:
+            self.pas = float(np.sqrt(largeur * hauteur / n))
+            # ville très allongée : pas plus de cases que d'emplacements sur un côté
+            self.pas = max(self.pas, max(largeur, hauteur) / n)
+        elif largeur > 0 or hauteur > 0:
+            self.pas = float(max(largeur, hauteur) / n)
+        else:
+            self.pas = 1.0
+        self.colonnes = int(largeur // self.pas) + 1
+        self.lignes = int(hauteur // self.pas) + 1
+
+        cases = self._cases(positions)
+        ordre = np.argsort(cases[:, 0] * self.lignes + cases[:, 1], kind="stable")
+        self.noms = noms[ordre]
+        self.positions = positions[ordre]
+        self.debuts = np.searchsorted(
+            (cases[:, 0] * self.lignes + cases[:, 1])[ordre],
+            np.arange(self.colonnes * self.lignes + 1),
+        )
+
+    def __len__(self) -> int:
+        return len(self.noms)
+
+    def _cases(self, points: np.ndarray) -> np.ndarray:
+        """Case (colonne, ligne) de chaque point, ramenée dans la grille."""
+        cases = np.floor((points - self.origine) / self.pas).astype(np.int64)
+        cases[:, 0] = np.clip(cases[:, 0], 0, self.colonnes - 1)
+        cases[:, 1] = np.clip(cases[:, 1], 0, self.lignes - 1)
+        return cases
+
+    def _anneau(self, rayon: int) -> np.ndarray:
+        """Décalages (colonne, ligne) des cases situées exactement à `rayon` cases de distance."""
+        if rayon == 0:
+            return np.zeros((1, 2), dtype=np.int64)
+        cotes = np.arange(-rayon, rayon + 1)
+        return np.unique(
+            np.concatenate(
+                [
+                    np.column_stack([cotes, np.full_like(cotes, -rayon)]),
+                    np.column_stack([cotes, np.full_like(cotes, rayon)]),
+                    np.column_stack([np.full_like(cotes, -rayon), cotes]),
+                    np.column_stack([np.full_like(cotes, rayon), cotes]),
+                ]
+            ),
+            axis=0,
+        )
+
+    def _borne(self, points: np.ndarray, cases: np.ndarray, rayon: int) -> np.ndarray:
+        """Distance minimale entre chaque point et les emplacements pas encore examinés.
+
+        - Les cases examinées forment un carré de `2 * rayon + 1` cases centré sur la case du point ;
+        un côté du carré confondu avec le bord de la grille ne cache aucun emplacement
+        """
+        borne = np.full(len(points), np.inf)
+        for axe, taille in ((0, self.colonnes), (1, self.lignes)):
+            bas, haut = cases[:, axe] - rayon, cases[:, axe] + rayon + 1
+            origine = self.origine[axe]
+            ecart_bas = points[:, axe] - (origine + bas * self.pas)
+            ecart_haut = (origine + haut * self.pas) - points[:, axe]
+            borne = np.minimum(borne, np.where(bas > 0, ecart_bas, np.inf))
+            borne = np.minimum(borne, np.where(haut < taille, ecart_haut, np.inf))
+        return borne
+
+    def plus_proches(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Emplacement le plus proche de chaque point (tableau de forme `(k, 2)`).
+
+        - Renvoie les numéros des emplacements et les distances euclidiennes correspondantes
+        - Tous les points sont traités ensemble, couronne de cases par couronne de cases
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        k = len(points)
+        meilleurs = np.full(k, -1, dtype=np.int64)
+        distances = np.full(k, np.inf)
+        cases = self._cases(points)
+        actifs = np.arange(k)
+        rayon = 0
+        while len(actifs):
+            decalages = self._anneau(rayon)
+            voisines = cases[actifs, None, :] + decalages[None, :, :]
+            dedans = (
+                (voisines[..., 0] >= 0)
+                & (voisines[..., 0] < self.colonnes)
+                & (voisines[..., 1] >= 0)
+                & (voisines[..., 1] < self.lignes)
+            )
+            requetes = np.broadcast_to(actifs[:, None], dedans.shape)[dedans]
+            numeros = voisines[dedans][:, 0] * self.lignes + voisines[dedans][:, 1]
+            debuts = self.debuts[numeros]
+            nombres = self.debuts[numeros + 1] - debuts
+            total = int(nombres.sum())
+            if total:
+                requetes = np.repeat(requetes, nombres)
+                rangs = np.arange(total) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+                candidats = np.repeat(debuts, nombres) + rangs
+                ecarts = self.positions[candidats] - points[requetes]
+                d = np.hypot(ecarts[:, 0], ecarts[:, 1])
+                np.minimum.at(distances, requetes, d)
+                # en cas d'égalité, l'un des candidats les plus proches est retenu
+                choisis = d == distances[requetes]
+                meilleurs[requetes[choisis]] = candidats[choisis]
+            rayon += 1
+            termine = distances[actifs] <= self._borne(
+                points[actifs], cases[actifs], rayon - 1
+            )
+            termine |= rayon >= max(self.colonnes, self.lignes)
+            actifs = actifs[~termine]
+        return self.noms[meilleurs], distances
+
+    def plus_proche(self, x: float, y: float) -> lt.Emplacement:
+        """Emplacement le plus proche d'un seul point."""
+        noms, _ = self.plus_proches(np.array([[x, y]]))
+        return lt.Emplacement(nom=int(noms[0]))
@@ -16,19 +16,33 @@ Développé par :
 """
 
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from itertools import count
+import heapq
+import math
+import operator
+import threading
 import networkx as nx
-import copy
 import matplotlib.pyplot as plt
 
 
-@dataclass(frozen=True)
+_EMPLACEMENTS: dict[int, "Emplacement"] = {}
+"""Table d'internement : un seul objet `Emplacement` par numéro d'emplacement."""
+
+
+@dataclass(frozen=True, slots=True, init=False)
 class Emplacement:
     """Représente un emplacement de la ville.
 
     `nom`: entier correspondant à un numéro d'emplacement
 
-    - On vérifie après l'instanciation que le numéro d'emplacement n'est pas incohérent (< 0)
+    - On vérifie à l'instanciation que le numéro d'emplacement est un entier (`operator.index` :
+    les entiers NumPy sont convertis, les flottants refusés) et qu'il n'est pas incohérent (< 0)
+    - Les emplacements sont internés : `Emplacement(nom=1) is Emplacement(nom=1)`, y compris entre
+    plusieurs fils d'exécution ; une instance internée n'est jamais modifiée
+    - `__slots__` : pas de `__dict__` par instance
 
     Exemple :
     >>> emplacement = Emplacement(nom=1)
@@ -38,9 +52,25 @@ class Emplacement:
 
     nom: int
 
-    def __post_init__(self):
-        if self.nom < 0:
+    def __new__(cls, nom: int):
+        nom = operator.index(nom)
+        instance = _EMPLACEMENTS.get(nom)
+        if instance is not None:
+            return instance
+        if nom < 0:
             raise ValueError("L'emplacement doit être un entier positif.")
+        # super() n'est pas utilisable dans une dataclass à slots (la classe est recréée)
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "nom", nom)
+        # setdefault est atomique : deux fils qui créent le même emplacement obtiennent le même objet
+        return _EMPLACEMENTS.setdefault(nom, instance)
+
+    def __init__(self, nom: int):
+        # tout est fait dans __new__ : l'instance renvoyée peut déjà être partagée
+        pass
+
+    def __reduce__(self):
+        return (Emplacement, (self.nom,))
 
     def __str__(self):
         return str(self.nom)
@@ -73,17 +103,104 @@ class Itineraire:
             raise ValueError("L'itinéraire ne comporte pas assez de points.")
 
 
-@dataclass
+class _ListeLecture(list):
+    """Liste en lecture seule renvoyée par les propriétés de `Ville`.
+
+    - Elle se compare, se découpe et se concatène comme une liste ordinaire
+    - Toute modification en place renvoie l'exception TypeError : pour modifier la ville, il faut
+    affecter une nouvelle liste à l'attribut (`ville.arretes = [...]`)
+    """
+
+    __slots__ = ()
+
+    def _refuse(self, *args, **kwargs):
+        raise TypeError(
+            "Attention, cette liste est en lecture seule : affectez une nouvelle liste à la ville !"
+        )
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _refuse
+    append = extend = insert = pop = remove = clear = sort = reverse = _refuse
+
+    def __reduce__(self):
+        # copie et sérialisation : une liste ordinaire, détachée de la ville
+        return (list, (list(self),))
+
+
+_VERSIONS = count()
+"""Compteur des versions de villes : chaque ville (ou copie modifiée) reçoit un numéro unique."""
+
+
+class _Topologie:
+    """Structure (emplacements et routes) d'une ville, partagée entre ses versions successives.
+
+    - `noms` : numéros des emplacements, dans l'ordre de la liste `emplacements`
+    - `index` : numéro d'emplacement => indice dense (position dans `noms`)
+    - `depart`, `arrivee` : indices denses des extrémités de chaque route
+    - `coordonnees` : optionnel, abscisse et ordonnée de chaque emplacement à la suite
+    (`coordonnees[2 * i]`, `coordonnees[2 * i + 1]`), NaN pour un emplacement sans coordonnées
+    - Ces tableaux ne sont jamais modifiés après la construction
+    """
+
+    __slots__ = ("noms", "index", "depart", "arrivee", "coordonnees", "_objets", "_routes")
+
+    def __init__(
+        self, noms: array, depart: array, arrivee: array, coordonnees: array = None
+    ):
+        self.noms = noms
+        self.index: dict[int, int] = {}
+        for i, nom in enumerate(noms):
+            self.index.setdefault(nom, i)
+        self.depart = depart
+        self.arrivee = arrivee
+        self.coordonnees = coordonnees
+        self._objets = None
+        self._routes = None
+
+    @property
+    def objets(self) -> list[Emplacement]:
+        """Emplacements internés correspondant à `noms`."""
+        if self._objets is None:
+            self._objets = [Emplacement(nom=nom) for nom in self.noms]
+        return self._objets
+
+    def route(self, i: int, j: int) -> int | None:
+        """Indice de la route entre les indices denses `i` et `j` (dans un sens ou dans l'autre)."""
+        if self._routes is None:
+            routes: dict[tuple[int, int], int] = {}
+            for k, (u, v) in enumerate(zip(self.depart, self.arrivee)):
+                routes.setdefault((u, v), k)
+                routes.setdefault((v, u), k)
+            self._routes = routes
+        return self._routes.get((i, j))
+
+
 class Ville:
     """Représentation de la carte de la ville.
 
     `emplacements`: liste d'entiers correspondant à des emplacements présents dans la ville
     `arretes`: liste contenant un tuple de deux emplacements et une durée associée
+    `coordonnees`: optionnel, position (x, y) de tout ou partie des emplacements dans un repère plan
+    `travaux`: optionnel, pénalité (en minutes) des emplacements en travaux
 
     - On vérifie après l'instanciation que la carte de la ville est cohérente, c'est à dire =>
         - Les durées de trajet sont strictement positives
         - Un emplacement non-spécifié dans la liste emplacements n'existe pas dans la ville
 
+    - Routes multiples : plusieurs routes entre deux mêmes emplacements sont fusionnées au
+    chargement en une seule, la plus rapide (à la position de la première). Tous les calculs de
+    trajets, bouchons et durées voient ainsi la même route.
+
+    - Chaque état de la ville possède un numéro de `version` unique, utilisé par `CacheTrajets`
+
+    - Stockage compact : les numéros d'emplacements sont rangés dans un tableau d'entiers et
+    associés à des indices denses, les routes sont stockées dans trois tableaux typés parallèles
+    (indices de départ, indices d'arrivée, durées). Les listes `emplacements` et `arretes` sont
+    reconstruites à la demande.
+
+    - Travaux : chaque passage par un emplacement en travaux (départ et arrivée compris) coûte sa
+    pénalité une seule fois. Les pénalités sont stockées par emplacement, à part des routes : les
+    parcours les ajoutent en entrant dans chaque emplacement, sans modifier la durée des routes.
+
     Exemple :
 
     >>> village = Ville(
@@ -100,32 +217,182 @@ class Ville:
     ... Emplacement(nom=4), 2.0), (Emplacement(nom=3), Emplacement(nom=4), 1.0)])
     """
 
-    emplacements: list[Emplacement]
-    arretes: list[tuple[Emplacement, Emplacement, float]]
-
-    def __post_init__(self):
-        if any(poids <= 0 for _, _, poids in self.arretes):
+    def __init__(
+        self,
+        emplacements: list[Emplacement],
+        arretes: list[tuple[Emplacement, Emplacement, float]],
+        coordonnees: dict[Emplacement, tuple[float, float]] = None,
+        travaux: dict[Emplacement, float] = None,
+    ):
+        self._charge(emplacements, arretes, coordonnees, travaux)
+        self._figee = False
+
+    def _charge(
+        self,
+        emplacements: list[Emplacement],
+        arretes: list[tuple[Emplacement, Emplacement, float]],
+        coordonnees: dict[Emplacement, tuple[float, float]] = None,
+        travaux: dict[Emplacement, float] = None,
+    ):
+        """Vérifie la cohérence de la carte et la range dans les tableaux typés."""
+        topologie = _Topologie(
+            array("q", (emplacement.nom for emplacement in emplacements)),
+            array("i"),
+            array("i"),
+        )
+        index = topologie.index
+
+        if coordonnees:
+            positions = array("d", [math.nan]) * (2 * len(topologie.noms))
+            for emplacement, (x, y) in coordonnees.items():
+                if emplacement.nom not in index:
+                    raise ValueError(
+                        f"L'emplacement {emplacement} n'existe pas dans la ville !"
+                    )
+                i = index[emplacement.nom]
+                positions[2 * i], positions[2 * i + 1] = x, y
+            topologie.coordonnees = positions
+
+        if any(poids <= 0 for _, _, poids in arretes):
             raise ValueError("Les durées des trajets sont forcément positives!")
 
-        for depart, arrivee, _ in self.arretes:
-            if depart not in self.emplacements:
-                raise ValueError(f"L'emplacement {depart} n'existe pas dans la ville !")
-            if arrivee not in self.emplacements:
+        depart, arrivee, duree = topologie.depart, topologie.arrivee, array("d")
+        routes: dict[tuple[int, int], int] = {}
+        for u, v, poids in arretes:
+            if u.nom not in index:
+                raise ValueError(f"L'emplacement {u} n'existe pas dans la ville !")
+            if v.nom not in index:
+                raise ValueError(f"L'emplacement {v} n'existe pas dans la ville !")
+            i, j = index[u.nom], index[v.nom]
+            k = routes.setdefault((min(i, j), max(i, j)), len(duree))
+            if k < len(duree):
+                duree[k] = min(duree[k], poids)
+                continue
+            depart.append(i)
+            arrivee.append(j)
+            duree.append(poids)
+
+        penalites: dict[int, float] = {}
+        for emplacement, penalite in (travaux or {}).items():
+            if emplacement.nom not in index:
                 raise ValueError(
-                    f"L'emplacement {arrivee} n'existe pas dans la ville !"
+                    f"L'emplacement {emplacement} n'existe pas dans la ville !"
                 )
+            if penalite <= 0:
+                raise ValueError("Les durées des travaux sont forcément positives!")
+            penalites[index[emplacement.nom]] = penalite
+
+        self._topologie = topologie
+        self._duree = duree
+        self._penalites = penalites
+        self._version = next(_VERSIONS)
+
+    @property
+    def emplacements(self) -> list[Emplacement]:
+        return _ListeLecture(self._topologie.objets)
+
+    @emplacements.setter
+    def emplacements(self, emplacements: list[Emplacement]):
+        self._verifie_modifiable()
+        coordonnees = {e: p for e, p in self.coordonnees.items() if e in emplacements}
+        travaux = {e: p for e, p in self.travaux.items() if e in emplacements}
+        self._charge(emplacements, self.arretes, coordonnees, travaux)
+
+    @property
+    def arretes(self) -> list[tuple[Emplacement, Emplacement, float]]:
+        objets = self._topologie.objets
+        return _ListeLecture(
+            (objets[u], objets[v], poids)
+            for u, v, poids in zip(
+                self._topologie.depart, self._topologie.arrivee, self._duree
+            )
+        )
 
-    def __deepcopy__(self):
+    @arretes.setter
+    def arretes(self, arretes: list[tuple[Emplacement, Emplacement, float]]):
+        self._verifie_modifiable()
+        self._charge(self.emplacements, arretes, self.coordonnees, self.travaux)
+
+    @property
+    def travaux(self) -> dict[Emplacement, float]:
+        """Pénalité des emplacements en travaux."""
+        objets = self._topologie.objets
+        return {objets[i]: penalite for i, penalite in sorted(self._penalites.items())}
+
+    def penalite(self, emplacement: Emplacement) -> float:
+        """Pénalité de passage par un emplacement (0 s'il n'est pas en travaux)."""
+        return self._penalites.get(self._topologie.index[emplacement.nom], 0.0)
+
+    @property
+    def coordonnees(self) -> dict[Emplacement, tuple[float, float]]:
+        """Position (x, y) des emplacements qui en ont une."""
+        positions = self._topologie.coordonnees
+        if positions is None:
+            return {}
+        return {
+            emplacement: (positions[2 * i], positions[2 * i + 1])
+            for i, emplacement in enumerate(self._topologie.objets)
+            if not math.isnan(positions[2 * i])
+        }
+
+    @property
+    def version(self) -> int:
+        """Numéro unique de cet état de la ville, renouvelé à chaque copie ou modification."""
+        return self._version
+
+    @property
+    def figee(self) -> bool:
+        return self._figee
+
+    def fige(self) -> "Ville":
+        """Interdit toute modification ultérieure de la ville (les copies restent modifiables)."""
+        self._figee = True
+        return self
+
+    def _verifie_modifiable(self):
+        if self.figee:
+            raise VilleFigee(
+                "Attention, cette carte de la ville ne peut plus être modifiée !"
+            )
+
+    def __contains__(self, emplacement: Emplacement) -> bool:
+        return emplacement.nom in self._topologie.index
+
+    def __eq__(self, autre) -> bool:
+        if not isinstance(autre, Ville):
+            return NotImplemented
+        return (self.emplacements, self.arretes, self.travaux) == (
+            autre.emplacements,
+            autre.arretes,
+            autre.travaux,
+        )
+
+    def __repr__(self) -> str:
+        travaux = f", travaux={self.travaux!r}" if self._penalites else ""
+        return f"Ville(emplacements={self.emplacements!r}, arretes={self.arretes!r}{travaux})"
+
+    def __setstate__(self, etat: dict):
+        # un numéro de version n'a de sens que dans le processus qui l'a attribué
+        self.__dict__.update(etat)
+        self._version = next(_VERSIONS)
+
+    def __deepcopy__(self, memo=None):
         cls = self.__class__
         nouvelle_ville = cls.__new__(cls)
-        nouvelle_ville.emplacements = copy.deepcopy(self.emplacements)
-        nouvelle_ville.arretes = copy.deepcopy(self.arretes)
+        # La structure n'est jamais modifiée sur place : seules les durées sont copiées
+        nouvelle_ville._topologie = self._topologie
+        nouvelle_ville._duree = array("d", self._duree)
+        nouvelle_ville._penalites = dict(self._penalites)
+        nouvelle_ville._version = next(_VERSIONS)
+        nouvelle_ville._figee = False
         return nouvelle_ville
 
 
 def _convertit_en_nx(ville: Ville) -> nx.Graph:
     """Crée un graphe networkx à partir de la carte de la ville.
 
+    - Les pénalités des emplacements en travaux éventuels sont rangées dans `graphe.graph["penalites"]`
+
     Exemple :
 
     >>> village = Ville(
@@ -140,18 +407,38 @@ def _convertit_en_nx(ville: Ville) -> nx.Graph:
     >>> convertisseur
     ... <networkx.classes.graph.Graph at 0x22a823e6290>
     """
+    topologie = ville._topologie
+    objets = topologie.objets
     resultat = nx.Graph()
-    resultat.add_nodes_from(ville.emplacements)
+    resultat.add_nodes_from(objets)
     resultat.add_edges_from(
-        (depart, arrivee, {"duree": poids}) for depart, arrivee, poids in ville.arretes
+        (objets[u], objets[v], {"duree": poids})
+        for u, v, poids in zip(topologie.depart, topologie.arrivee, ville._duree)
     )
+    if ville._penalites:
+        resultat.graph["penalites"] = {
+            objets[i]: penalite for i, penalite in ville._penalites.items()
+        }
     return resultat
 
 
+def _poids_parcours(graphe: nx.Graph):
+    """Poids des routes pour les recherches networkx : durée de la route plus la pénalité de
+    l'emplacement d'arrivée (`"duree"` tel quel si aucun emplacement n'est en travaux)."""
+    penalites = graphe.graph.get("penalites")
+    if not penalites:
+        return "duree"
+    return lambda u, v, attributs: attributs["duree"] + penalites.get(v, 0.0)
+
+
 class PasDeChemin(Exception):
     pass
 
 
+class VilleFigee(Exception):
+    pass
+
+
 class EmplacementInconnu(Exception):
     pass
 
@@ -198,11 +485,11 @@ def _determine_probleme(
     ... False
     """
 
-    if all(depart != emplacement for emplacement in ville.emplacements):
+    if depart not in ville:
         raise EmplacementInconnu(
             f"Attention, {depart} n'est pas un emplacement valide !"
         )
-    if all(arrivee != emplacement for emplacement in ville.emplacements):
+    if arrivee not in ville:
         raise EmplacementInconnu(
             f"Attention, {arrivee} n'est pas un emplacement valide !"
         )
@@ -214,13 +501,20 @@ def _determine_probleme(
 
 
 def carte_graphe(
-    ville: Ville, itineraire: Itineraire = None, travaux: list[Emplacement] = None
+    ville: Ville,
+    itineraire: Itineraire = None,
+    travaux: list[Emplacement] = None,
+    isochrone: dict[Emplacement, float] = None,
 ) -> nx.Graph:
     """Crée la représentation graphique d'une carte avec des points donnés.
 
     - La carte peut afficher un itinéraire => les emplacements empruntés seront affichés en rouge
     - La carte peut afficher des travaux => Les emplacements affectés seront affichés en jaune
+    - La carte peut afficher des isochrones (emplacement => durée maximale de la zone qui le contient)
+    => les emplacements sont colorés du plus proche (foncé) au plus éloigné (clair), gris si non atteints
     - Les emplacements non-affectés par des travaux et des itinéraires sont affichés en vert
+    - Les emplacements sont placés selon leurs coordonnées ; ceux qui n'en ont pas sont placés
+    automatiquement (`spring_layout`)
 
     Exemples :
 
@@ -239,10 +533,15 @@ def carte_graphe(
     >>> graph = carte_graphe(ville=village)
     >>> graph_chemin = carte_graphe(ville=village, itineraire=chemin)
     >>> graph_travaux = carte_graphe(ville=village, travaux=travaux)
+    >>> graph_isochrone = carte_graphe(ville=village, isochrone={Emplacement(nom=2): 5.0})
     """
 
     resultat = _convertit_en_nx(ville)
-    positions = nx.spring_layout(resultat)
+    positions = ville.coordonnees
+    if len(positions) < len(resultat):
+        positions = nx.spring_layout(
+            resultat, pos=positions or None, fixed=list(positions) or None
+        )
     edge_labels = {(a, b): p["duree"] for a, b, p in resultat.edges(data=True)}
     nx.draw_networkx_edges(resultat, positions, edge_color="gray")
     nx.draw_networkx_edge_labels(resultat, positions, edge_labels=edge_labels)
@@ -270,6 +569,22 @@ def carte_graphe(
             node_size=500,
         )
         plt.title("Carte de la ville avec travaux")
+    elif isochrone:
+        budgets = sorted(set(isochrone.values()))
+        palette = plt.cm.viridis
+        node_colors = [
+            palette(budgets.index(isochrone[e]) / max(len(budgets) - 1, 1))
+            if e in isochrone
+            else "lightgray"
+            for e in resultat.nodes()
+        ]
+        nx.draw_networkx_nodes(
+            resultat,
+            positions,
+            node_color=node_colors,
+            node_size=500,
+        )
+        plt.title("Carte de la ville avec isochrones")
     else:
         nx.draw_networkx_nodes(resultat, positions, node_color="green", node_size=500)
         plt.title("Carte de la ville")
@@ -279,13 +594,121 @@ def carte_graphe(
     return resultat
 
 
+class CacheTrajets:
+    """Cache LRU borné des itinéraires calculés par `determine_trajet`.
+
+    `capacite`: nombre maximal d'itinéraires conservés
+
+    - La clé contient la version de la ville : une ville modifiée (genere_bouchons, genere_travaux,
+    modification de `arretes`...) a une nouvelle version et n'utilise jamais les anciens résultats
+    - Les routes étant à double sens, un trajet A => B et le trajet B => A partagent la même entrée
+    - Les absences de chemin sont aussi mémorisées
+    - Compteurs exposés : `succes`, `echecs`, `evictions`
+    - Utilisable depuis plusieurs threads
+
+    Exemple :
+
+    >>> cache = CacheTrajets(capacite=2)
+    >>> determine_trajet(Emplacement(nom=2), Emplacement(nom=3), ville=village, cache=cache)
+    >>> determine_trajet(Emplacement(nom=3), Emplacement(nom=2), ville=village, cache=cache)
+    >>> cache.statistiques
+    ... {'succes': 1, 'echecs': 1, 'evictions': 0, 'taille': 1, 'capacite': 2}
+    """
+
+    _PAS_DE_CHEMIN = object()
+
+    def __init__(self, capacite: int = 1024):
+        if capacite < 1:
+            raise ValueError("La capacité du cache doit être strictement positive.")
+        self.capacite = capacite
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self._entrees: OrderedDict = OrderedDict()
+        self._verrou = threading.Lock()
+
+    @staticmethod
+    def _cle(ville: Ville, depart: Emplacement, arrivee: Emplacement):
+        """Clé commune aux deux sens de parcours et indicateur d'inversion."""
+        if depart.nom <= arrivee.nom:
+            return (ville.version, depart.nom, arrivee.nom), False
+        return (ville.version, arrivee.nom, depart.nom), True
+
+    def cherche(self, ville: Ville, depart: Emplacement, arrivee: Emplacement):
+        """Renvoie l'itinéraire mémorisé, `None` s'il est absent du cache.
+
+        - Renvoie l'exception PasDeChemin si l'absence de chemin a été mémorisée
+        """
+        cle, inverse = self._cle(ville, depart, arrivee)
+        with self._verrou:
+            etapes = self._entrees.get(cle)
+            if etapes is None:
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+        if etapes is self._PAS_DE_CHEMIN:
+            raise PasDeChemin(
+                f"Les emplacements {depart} et {arrivee} ne sont pas connectés !"
+            )
+        return Itineraire(etapes=list(reversed(etapes)) if inverse else list(etapes))
+
+    def ajoute(
+        self,
+        ville: Ville,
+        depart: Emplacement,
+        arrivee: Emplacement,
+        itineraire: Itineraire | None,
+    ) -> None:
+        """Mémorise un itinéraire (`None` pour une absence de chemin)."""
+        cle, inverse = self._cle(ville, depart, arrivee)
+        if itineraire is None:
+            etapes = self._PAS_DE_CHEMIN
+        else:
+            etapes = tuple(reversed(itineraire.etapes) if inverse else itineraire.etapes)
+        with self._verrou:
+            self._entrees[cle] = etapes
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.capacite:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def invalide(self, ville: Ville = None) -> None:
+        """Supprime les entrées d'une version de la ville, ou toutes les entrées."""
+        with self._verrou:
+            if ville is None:
+                self._entrees.clear()
+            else:
+                for cle in [c for c in self._entrees if c[0] == ville.version]:
+                    del self._entrees[cle]
+
+    def __len__(self) -> int:
+        return len(self._entrees)
+
+    @property
+    def statistiques(self) -> dict[str, int]:
+        return {
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "evictions": self.evictions,
+            "taille": len(self._entrees),
+            "capacite": self.capacite,
+        }
+
+
 def determine_trajet(
-    depart: Emplacement, arrivee: Emplacement, ville: Ville
+    depart: Emplacement,
+    arrivee: Emplacement,
+    ville: Ville,
+    graphe: nx.Graph = None,
+    cache: CacheTrajets = None,
 ) -> Itineraire:
     """Détermine le trajet le plus court possible d'un emplacement à un autre.
 
     - Vérifie d'abord que le trajet est cohérent avec la fonction _determine_probleme
-    - Convertit la ville en graph nx
+    - Si un `cache` est fourni, le résultat y est cherché puis mémorisé
+    - Convertit la ville en graph nx, sauf si le graphe déjà construit de la ville est fourni avec `graphe`
+    - Si tous les emplacements ont des coordonnées, la recherche se fait par A* guidée par `_heuristique`
     - Renvoie l'itinéraire le plus court entre les points spécifiés
     - Renvoie l'exception Pas de Chemin si les emplacements ne sont pas connectés
 
@@ -295,16 +718,256 @@ def determine_trajet(
     ... Itineraire(etapes=[Emplacement(nom=2), Emplacement(nom=4), Emplacement(nom=3)])
     """
     _determine_probleme(depart, arrivee, ville)
-    G = _convertit_en_nx(ville)
+    if cache is not None:
+        resultat = cache.cherche(ville, depart, arrivee)
+        if resultat is not None:
+            return resultat
+    G = graphe if graphe is not None else _convertit_en_nx(ville)
+    heuristique = _heuristique(ville)
     try:
-        resultat_nx = nx.shortest_path(
-            G, source=depart, target=arrivee, weight="duree", method="bellman-ford"
-        )
+        if heuristique is None:
+            resultat_nx = nx.shortest_path(
+                G,
+                source=depart,
+                target=arrivee,
+                weight=_poids_parcours(G),
+                method="bellman-ford",
+            )
+        else:
+            resultat_nx = nx.astar_path(
+                G, depart, arrivee, heuristic=heuristique, weight=_poids_parcours(G)
+            )
     except nx.exception.NetworkXNoPath:
+        if cache is not None:
+            cache.ajoute(ville, depart, arrivee, None)
         raise PasDeChemin(
             f"Les emplacements {depart} et {arrivee} ne sont pas connectés !"
         )
-    return Itineraire(etapes=resultat_nx)
+    resultat = Itineraire(etapes=resultat_nx)
+    if cache is not None:
+        cache.ajoute(ville, depart, arrivee, resultat)
+    return resultat
+
+
+def _vitesse_max(ville: Ville) -> float:
+    """Plus grande vitesse à vol d'oiseau (distance / durée) parmi les routes de la ville.
+
+    - Calculée une seule fois par version de la ville
+    - Renvoie 0 si les emplacements n'ont pas tous des coordonnées
+    """
+    memoire = getattr(ville, "_memoire_vitesse", None)
+    if memoire is not None and memoire[0] == ville.version:
+        return memoire[1]
+    topologie = ville._topologie
+    positions = topologie.coordonnees
+    vitesse = 0.0
+    if positions is not None and not any(math.isnan(p) for p in positions):
+        for u, v, duree in zip(topologie.depart, topologie.arrivee, ville._duree):
+            distance = math.hypot(
+                positions[2 * u] - positions[2 * v],
+                positions[2 * u + 1] - positions[2 * v + 1],
+            )
+            vitesse = max(vitesse, distance / duree)
+    ville._memoire_vitesse = (ville.version, vitesse)
+    return vitesse
+
+
+def _heuristique(ville: Ville):
+    """Minorant de la durée restante pour A* : distance à vol d'oiseau / vitesse maximale.
+
+    - Admissible : aucune route ne permet d'aller plus vite que `_vitesse_max` à vol d'oiseau,
+    et un trajet est toujours plus long que la ligne droite (inégalité triangulaire)
+    - Renvoie None si les emplacements n'ont pas tous des coordonnées
+    """
+    vitesse = _vitesse_max(ville)
+    if vitesse == 0:
+        return None
+    positions, index = ville._topologie.coordonnees, ville._topologie.index
+
+    def heuristique(u: Emplacement, v: Emplacement) -> float:
+        i, j = index[u.nom], index[v.nom]
+        return (
+            math.hypot(
+                positions[2 * i] - positions[2 * j],
+                positions[2 * i + 1] - positions[2 * j + 1],
+            )
+            / vitesse
+        )
+
+    return heuristique
+
+
+def _parcours_dijkstra(
+    graphe: nx.Graph,
+    source: Emplacement,
+    predecesseurs: dict[Emplacement, Emplacement],
+    limite: float = None,
+):
+    """Générateur du parcours de Dijkstra depuis `source` sur un graphe networkx pondéré par `duree`.
+
+    - Renvoie les emplacements par durée croissante sous la forme (emplacement, durée)
+    - La pénalité d'un emplacement en travaux est comptée en y entrant, celle de `source` dès la
+    première route : les durées sont celles des trajets complets (0 pour `source` elle-même)
+    - Remplit `predecesseurs` au fur et à mesure : l'appelant peut interrompre le parcours à tout moment
+    - Si `limite` est spécifiée, les emplacements au-delà de cette durée ne sont pas explorés
+
+    Exemple :
+
+    >>> list(_parcours_dijkstra(_convertit_en_nx(village), Emplacement(nom=2), {}))
+    ... [(Emplacement(nom=2), 0), (Emplacement(nom=4), 2.0), (Emplacement(nom=3), 3.0)]
+    """
+    penalites = graphe.graph.get("penalites") or {}
+    definitifs = set()
+    provisoires = {source: 0}
+    compteur = count()  # les emplacements ne sont pas ordonnables
+    tas = [(0, next(compteur), source, None)]
+    while tas:
+        d, _, noeud, precedent = heapq.heappop(tas)
+        if noeud in definitifs:
+            continue
+        definitifs.add(noeud)
+        if precedent is not None:
+            predecesseurs[noeud] = precedent
+        yield noeud, d
+        base = d + penalites.get(source, 0.0) if noeud == source else d
+        for voisin, attributs in graphe[noeud].items():
+            nouvelle = base + attributs["duree"]
+            if penalites:
+                nouvelle += penalites.get(voisin, 0.0)
+            if limite is not None and nouvelle > limite:
+                continue
+            if voisin not in definitifs and nouvelle < provisoires.get(
+                voisin, nouvelle + 1
+            ):
+                provisoires[voisin] = nouvelle
+                heapq.heappush(tas, (nouvelle, next(compteur), voisin, noeud))
+
+
+def _dijkstra(
+    graphe: nx.Graph,
+    source: Emplacement,
+    cibles: set[Emplacement] = None,
+    limite: float = None,
+) -> tuple[dict[Emplacement, float], dict[Emplacement, Emplacement]]:
+    """Parcours de Dijkstra complet depuis `source` sur un graphe networkx pondéré par `duree`.
+
+    - Si `cibles` est spécifié, le parcours s'arrête dès que toutes les cibles sont atteintes
+    - Si `limite` est spécifiée, les emplacements au-delà de cette durée ne sont pas explorés
+
+    Renvoie les durées définitives et les prédécesseurs des emplacements atteints.
+
+    Exemple :
+
+    >>> durees, predecesseurs = _dijkstra(_convertit_en_nx(village), Emplacement(nom=2))
+    >>> durees
+    ... {Emplacement(nom=2): 0, Emplacement(nom=4): 2.0, Emplacement(nom=3): 3.0}
+    """
+    restantes = set(cibles) if cibles is not None else None
+    durees: dict[Emplacement, float] = {}
+    predecesseurs: dict[Emplacement, Emplacement] = {}
+    for noeud, d in _parcours_dijkstra(graphe, source, predecesseurs, limite):
+        durees[noeud] = d
+        if restantes is not None:
+            restantes.discard(noeud)
+            if not restantes:
+                break
+    return durees, predecesseurs
+
+
+def _remonte_chemin(
+    predecesseurs: dict[Emplacement, Emplacement],
+    source: Emplacement,
+    cible: Emplacement,
+) -> list[Emplacement]:
+    """Reconstruit la liste des emplacements de `source` à `cible` à partir des prédécesseurs."""
+    chemin = [cible]
+    while chemin[-1] != source:
+        chemin.append(predecesseurs[chemin[-1]])
+    chemin.reverse()
+    return chemin
+
+
+@dataclass
+class MatriceDurees:
+    """Table des durées de trajet les plus courtes entre plusieurs emplacements.
+
+    `emplacements`: liste des emplacements indexant les lignes et les colonnes
+    `durees`: matrice des durées, `durees[i][j]` vaut `inf` si les emplacements ne sont pas connectés
+
+    - Les chemins ne sont reconstruits qu'à la demande avec la méthode `chemin`
+
+    Exemple :
+
+    >>> table = matrice_durees([Emplacement(nom=2), Emplacement(nom=3)], ville=village)
+    >>> table.durees
+    ... [[0, 3.0], [3.0, 0]]
+    >>> table.chemin(0, 1)
+    ... [Emplacement(nom=2), Emplacement(nom=4), Emplacement(nom=3)]
+    """
+
+    emplacements: list[Emplacement]
+    durees: list[list[float]]
+    _predecesseurs: list[dict[Emplacement, Emplacement]] = field(repr=False)
+
+    def chemin(self, i: int, j: int) -> list[Emplacement]:
+        depart, arrivee = self.emplacements[i], self.emplacements[j]
+        if self.durees[i][j] == float("inf"):
+            raise PasDeChemin(
+                f"Les emplacements {depart} et {arrivee} ne sont pas connectés !"
+            )
+        return _remonte_chemin(self._predecesseurs[i], depart, arrivee)
+
+
+def matrice_durees(emplacements: list[Emplacement], ville: Ville) -> MatriceDurees:
+    """Calcule en une seule fois la table des durées entre tous les `emplacements` spécifiés.
+
+    - Le graphe networkx n'est construit qu'une seule fois
+    - Un parcours de Dijkstra par emplacement, arrêté dès que tous les autres sont atteints
+
+    Exemple :
+
+    >>> matrice_durees([Emplacement(nom=2), Emplacement(nom=3)], ville=village).durees
+    ... [[0, 3.0], [3.0, 0]]
+    """
+    for emplacement in emplacements:
+        if emplacement not in ville:
+            raise EmplacementInconnu(
+                f"Attention, {emplacement} n'est pas un emplacement valide !"
+            )
+    G = _convertit_en_nx(ville)
+    cibles = set(emplacements)
+    durees, predecesseurs = [], []
+    for emplacement in emplacements:
+        atteints, precedents = _dijkstra(G, emplacement, cibles=cibles)
+        durees.append([atteints.get(e, float("inf")) for e in emplacements])
+        predecesseurs.append(precedents)
+    return MatriceDurees(
+        emplacements=list(emplacements), durees=durees, _predecesseurs=predecesseurs
+    )
+
+
+def duree_trajet(itineraire: Itineraire, ville: Ville) -> float:
+    """Calcule la durée totale d'un itinéraire dans la ville.
+
+    - Renvoie l'exception ArreteInexistante si deux étapes consécutives ne sont pas reliées
+    - Chaque passage par un emplacement en travaux ajoute sa pénalité
+
+    Exemple :
+
+    >>> duree_trajet(Itineraire(etapes=[Emplacement(nom=2), Emplacement(nom=4)]), ville=village)
+    ... 2.0
+    """
+    G = _convertit_en_nx(ville)
+    duree = 0
+    for depart, arrivee in zip(itineraire.etapes, itineraire.etapes[1:]):
+        if not G.has_edge(depart, arrivee):
+            raise ArreteInexistante(
+                f"La route spécifiée entre les emplacements {depart} et {arrivee} n'existe pas !"
+            )
+        duree += G[depart][arrivee]["duree"]
+    if len(itineraire.etapes) > 1:
+        duree += sum(ville.penalite(etape) for etape in itineraire.etapes)
+    return duree
 
 
 def genere_bouchons(
@@ -328,26 +991,18 @@ def genere_bouchons(
     (Emplacement(nom=3), Emplacement(nom=4), 1.0)])
     """
     _determine_probleme(depart, arrivee, ville)
-    try:
-        i = next(
-            i
-            for i, (u, v, d) in enumerate(ville.arretes)
-            if (u.nom == depart.nom and v.nom == arrivee.nom)
-            or (v.nom == depart.nom and u.nom == arrivee.nom)
-        )
-    except StopIteration as e:
+    index = ville._topologie.index
+    i = ville._topologie.route(index[depart.nom], index[arrivee.nom])
+    if i is None:
         raise ArreteInexistante(
             f"La route spécifiée entre les emplacements {depart} et {arrivee} n'existe pas !"
         )
-    else:
-        nouvelle_ville = ville.__deepcopy__()
-        u, v, d = nouvelle_ville.arretes[i]
-
-        if (d + duree) <= 0:
-            raise DureeNegative(
-                "Attention, la durée de la fluidification spécifiée ne respecte pas les durées de trajets !"
-            )
-        nouvelle_ville.arretes[i] = (u, v, d + duree)
+    if (ville._duree[i] + duree) <= 0:
+        raise DureeNegative(
+            "Attention, la durée de la fluidification spécifiée ne respecte pas les durées de trajets !"
+        )
+    nouvelle_ville = ville.__deepcopy__()
+    nouvelle_ville._duree[i] += duree
     return nouvelle_ville
 
 
@@ -356,8 +1011,10 @@ def genere_travaux(
 ) -> Ville:
     """Génère des travaux sur un ou plusieurs emplacement(s) spécifié(s) avec une durée variable.
 
-    - La fonction crée une copie de la ville qu'elle modifie
+    - La fonction renvoie une nouvelle version de la ville, la ville d'origine n'est pas modifiée
     - Il est possible de changer la durée sur un ou plusieurs emplacements
+    - `duree` s'ajoute à la pénalité de passage de chaque emplacement : la structure et les durées
+    des routes sont partagées avec la ville d'origine (aucune copie, mise à jour en O(k))
 
     Exemple :
 
@@ -367,8 +1024,8 @@ def genere_travaux(
     ...    ville=village
     ... )
     ... Ville(emplacements=[Emplacement(nom=2), Emplacement(nom=3), Emplacement(nom=4)],
-    arretes=[(Emplacement(nom=2), Emplacement(nom=3), 12.0), (Emplacement(nom=2), Emplacement(nom=4), 6.0),
-    (Emplacement(nom=3), Emplacement(nom=4), 5.0)])
+    arretes=[(Emplacement(nom=2), Emplacement(nom=3), 4.0), (Emplacement(nom=2), Emplacement(nom=4), 2.0),
+    (Emplacement(nom=3), Emplacement(nom=4), 1.0)], travaux={Emplacement(nom=2): 4.0, Emplacement(nom=3): 4.0})
     """
     if len(set(emplacements)) != len(emplacements):
         raise MemeEmplacement(
@@ -379,19 +1036,93 @@ def genere_travaux(
             "Attention, la durée de travaux sur un emplacement doit forcément être positive !"
         )
 
-    nouvelle_ville = ville.__deepcopy__()
-
     for emplacement in emplacements:
-        if emplacement not in nouvelle_ville.emplacements:
+        if emplacement not in ville:
+            raise EmplacementInconnu(
+                f"Attention, {emplacement} n'est pas un emplacement valide !"
+            )
+
+    return _ajoute_penalites(
+        ville, {ville._topologie.index[e.nom]: duree for e in emplacements}
+    )
+
+
+def _ajoute_penalites(ville: Ville, supplements: dict[int, float]) -> Ville:
+    """Nouvelle version de la ville dont les pénalités (indices denses) sont augmentées.
+
+    - La topologie et le tableau des durées sont partagés : ils ne sont jamais modifiés sur place,
+    les fonctions qui modifient les routes travaillent sur une copie (`__deepcopy__`)
+    """
+    nouvelle_ville = Ville.__new__(Ville)
+    nouvelle_ville._topologie = ville._topologie
+    nouvelle_ville._duree = ville._duree
+    nouvelle_ville._penalites = dict(ville._penalites)
+    for i, duree in supplements.items():
+        nouvelle_ville._penalites[i] = nouvelle_ville._penalites.get(i, 0.0) + duree
+    nouvelle_ville._version = next(_VERSIONS)
+    nouvelle_ville._figee = False
+    return nouvelle_ville
+
+
+def genere_modifications(
+    ville: Ville,
+    bouchons: dict[tuple[Emplacement, Emplacement], float] = None,
+    travaux: dict[Emplacement, float] = None,
+) -> Ville:
+    """Applique en une seule copie de la ville un lot de bouchons et de travaux.
+
+    `bouchons`: route (départ, arrivée) => durée ajoutée (négative pour une fluidification)
+    `travaux`: emplacement => durée ajoutée à sa pénalité de passage
+
+    - Même effet que des appels successifs à genere_bouchons et genere_travaux, sans copie intermédiaire
+    - Les vérifications sont faites avant toute modification
+
+    Exemple :
+
+    >>> genere_modifications(
+    ...     village,
+    ...     bouchons={(Emplacement(nom=2), Emplacement(nom=3)): 4.0},
+    ...     travaux={Emplacement(nom=4): 1.0},
+    ... )
+    ... Ville(emplacements=[Emplacement(nom=2), Emplacement(nom=3), Emplacement(nom=4)],
+    arretes=[(Emplacement(nom=2), Emplacement(nom=3), 8.0), (Emplacement(nom=2), Emplacement(nom=4), 2.0),
+    (Emplacement(nom=3), Emplacement(nom=4), 1.0)], travaux={Emplacement(nom=4): 1.0})
+    """
+    bouchons = bouchons or {}
+    travaux = travaux or {}
+    topologie = ville._topologie
+    index = topologie.index
+    deltas: dict[int, float] = {}
+    for (depart, arrivee), duree in bouchons.items():
+        _determine_probleme(depart, arrivee, ville)
+        i = topologie.route(index[depart.nom], index[arrivee.nom])
+        if i is None:
+            raise ArreteInexistante(
+                f"La route spécifiée entre les emplacements {depart} et {arrivee} n'existe pas !"
+            )
+        deltas[i] = deltas.get(i, 0) + duree
+    for emplacement, duree in travaux.items():
+        if emplacement not in ville:
             raise EmplacementInconnu(
                 f"Attention, {emplacement} n'est pas un emplacement valide !"
             )
+        if duree <= 0:
+            raise DureeNegative(
+                "Attention, la durée de travaux sur un emplacement doit forcément être positive !"
+            )
+    for i, delta in deltas.items():
+        if ville._duree[i] + delta <= 0:
+            raise DureeNegative(
+                "Attention, la durée de la fluidification spécifiée ne respecte pas les durées de trajets !"
+            )
 
-    for i, (u, v, d) in enumerate(nouvelle_ville.arretes):
-        if u in emplacements and v in emplacements:
-            nouvelle_ville.arretes[i] = (u, v, d + duree * 2)
-        elif u in emplacements or v in emplacements:
-            nouvelle_ville.arretes[i] = (u, v, d + duree)
+    nouvelle_ville = _ajoute_penalites(
+        ville, {index[e.nom]: duree for e, duree in travaux.items()}
+    )
+    if deltas:
+        nouvelle_ville._duree = array("d", ville._duree)
+        for i, delta in deltas.items():
+            nouvelle_ville._duree[i] += delta
     return nouvelle_ville
 
 
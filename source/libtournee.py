@@ -0,0 +1,236 @@
+"""# libtournee
+
+`libtournee` est un module Python à utiliser en conjonction avec le module `libtaxi`.
+
+- Il permet d'ordonner les arrêts d'une tournée (un départ et plusieurs clients à déposer) pour
+minimiser la durée totale du trajet.
+- La table des durées entre les arrêts est calculée une seule fois par demande.
+- Jusqu'à `SEUIL_EXACT` arrêts, l'ordre optimal est déterminé par l'algorithme de Held-Karp,
+au-delà on utilise une heuristique (insertion la plus proche puis amélioration 2-opt).
+
+L'importation classique du module se fait comme suit ::
+
+    import libtournee as ltr
+
+Développé par :
+    - Corentin Ducloux (https://github.com/CDucloux/)
+    - Aybuké Bicat (https://github.com/aybuke-b)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dataclasses import dataclass
+from source import libtaxi as lt
+
+SEUIL_EXACT = 12
+"""Nombre d'arrêts maximal pour lequel l'ordre de visite est calculé de manière exacte."""
+
+
+@dataclass
+class Tournee:
+    """Représente une tournée ordonnée.
+
+    `ordre`: emplacements dans l'ordre de visite, en commençant par le départ
+    `trajets`: itinéraires les plus courts entre deux emplacements consécutifs de `ordre`
+    `duree`: durée totale de la tournée
+
+    Exemple :
+    >>> tournee = ordonne_tournee(
+    ...     depart=Emplacement(nom=1), arrets=[Emplacement(nom=16), Emplacement(nom=5)], ville=CARTE_VILLE
+    ... )
+    >>> tournee.ordre
+    ... [Emplacement(nom=1), Emplacement(nom=5), Emplacement(nom=16)]
+    """
+
+    ordre: list[lt.Emplacement]
+    trajets: list[lt.Itineraire]
+    duree: float
+
+    @property
+    def chemin(self) -> list[lt.Emplacement]:
+        """Liste complète des emplacements traversés (un même lieu peut apparaître plusieurs fois)."""
+        chemin = [self.ordre[0]]
+        for itineraire in self.trajets:
+            chemin.extend(itineraire.etapes[1:])
+        return chemin
+
+
+def _cout(ordre: list[int], durees: list[list[float]], retour: bool) -> float:
+    """Durée totale d'un ordre de visite exprimé en indices de la table des durées."""
+    cout = sum(durees[a][b] for a, b in zip(ordre, ordre[1:]))
+    if retour:
+        cout += durees[ordre[-1]][ordre[0]]
+    return cout
+
+
+def _held_karp(durees: list[list[float]], retour: bool) -> list[int]:
+    """Ordre de visite optimal par programmation dynamique sur les sous-ensembles d'arrêts.
+
+    - L'indice 0 correspond au départ, les indices 1..n aux arrêts
+    - Complexité en O(2^n * n^2)
+    """
+    n = len(durees) - 1
+    infini = float("inf")
+    # couts[masque][j] : durée minimale partant de 0, visitant `masque` et finissant en j + 1
+    couts = [[infini] * n for _ in range(1 << n)]
+    parents = [[-1] * n for _ in range(1 << n)]
+    for j in range(n):
+        couts[1 << j][j] = durees[0][j + 1]
+    for masque in range(1, 1 << n):
+        for j in range(n):
+            cout = couts[masque][j]
+            if cout == infini or not masque & (1 << j):
+                continue
+            for k in range(n):
+                if masque & (1 << k):
+                    continue
+                suivant = masque | (1 << k)
+                nouveau = cout + durees[j + 1][k + 1]
+                if nouveau < couts[suivant][k]:
+                    couts[suivant][k] = nouveau
+                    parents[suivant][k] = j
+    complet = (1 << n) - 1
+    fin = min(
+        range(n),
+        key=lambda j: couts[complet][j] + (durees[j + 1][0] if retour else 0),
+    )
+    ordre, masque = [], complet
+    while fin != -1:
+        ordre.append(fin + 1)
+        masque, fin = masque ^ (1 << fin), parents[masque][fin]
+    ordre.append(0)
+    ordre.reverse()
+    return ordre
+
+
+def _insertion_proche(durees: list[list[float]], retour: bool) -> list[int]:
+    """Construit un ordre de visite en insérant à chaque fois l'arrêt le plus proche de la tournée.
+
+    - L'arrêt est inséré à la position qui augmente le moins la durée totale
+    """
+    restants = set(range(1, len(durees)))
+    ordre = [0]
+    proximite = {k: durees[0][k] for k in restants}
+    while restants:
+        k = min(restants, key=proximite.__getitem__)
+        restants.remove(k)
+        meilleure_position, meilleur_surcout = len(ordre), None
+        for position in range(1, len(ordre) + 1):
+            precedent = ordre[position - 1]
+            if position < len(ordre):
+                suivant = ordre[position]
+            elif retour:
+                suivant = 0
+            else:
+                suivant = None
+            surcout = durees[precedent][k]
+            if suivant is not None:
+                surcout += durees[k][suivant] - durees[precedent][suivant]
+            if meilleur_surcout is None or surcout < meilleur_surcout:
+                meilleure_position, meilleur_surcout = position, surcout
+        ordre.insert(meilleure_position, k)
+        for r in restants:
+            proximite[r] = min(proximite[r], durees[k][r])
+    return ordre
+
+
+def _deux_opt(ordre: list[int], durees: list[list[float]], retour: bool) -> list[int]:
+    """Améliore un ordre de visite en inversant des segments tant que la durée diminue.
+
+    - Le départ reste en première position
+    - La table des durées n'est pas symétrique (pénalités des arrêts en travaux retirées au départ
+    de chaque arrêt) : le segment inversé est parcouru dans l'autre sens, son coût est donc suivi
+    dans les deux sens
+    """
+    ordre = list(ordre)
+    n = len(ordre)
+    ameliore = True
+    while ameliore:
+        ameliore = False
+        for i in range(1, n - 1):
+            # coûts du segment ordre[i..j] parcouru dans l'ordre et à rebours
+            aller = retour_segment = 0.0
+            for j in range(i + 1, n):
+                aller += durees[ordre[j - 1]][ordre[j]]
+                retour_segment += durees[ordre[j]][ordre[j - 1]]
+                a, b, c = ordre[i - 1], ordre[i], ordre[j]
+                if j + 1 < n:
+                    e = ordre[j + 1]
+                elif retour:
+                    e = ordre[0]
+                else:
+                    e = None
+                gain = durees[a][c] - durees[a][b] + retour_segment - aller
+                if e is not None:
+                    gain += durees[b][e] - durees[c][e]
+                if gain < -1e-9:
+                    ordre[i : j + 1] = reversed(ordre[i : j + 1])
+                    aller, retour_segment = retour_segment, aller
+                    ameliore = True
+    return ordre
+
+
+def ordonne_tournee(
+    depart: lt.Emplacement,
+    arrets: list[lt.Emplacement],
+    ville: lt.Ville,
+    retour: bool = False,
+    seuil_exact: int = SEUIL_EXACT,
+) -> Tournee:
+    """Détermine l'ordre de visite le plus rapide d'un ensemble d'arrêts depuis un départ.
+
+    - `retour` : si vrai, le taxi revient au point de départ à la fin de la tournée
+    - Held-Karp (exact) si le nombre d'arrêts est inférieur ou égal à `seuil_exact`
+    - Insertion la plus proche puis 2-opt sinon
+    - Renvoie l'exception PasDeChemin si un arrêt n'est pas accessible depuis le départ
+
+    Exemple :
+
+    >>> ordonne_tournee(
+    ...     depart=Emplacement(nom=1),
+    ...     arrets=[Emplacement(nom=16), Emplacement(nom=5)],
+    ...     ville=CARTE_VILLE,
+    ... ).duree
+    ... 21.0
+    """
+    if not arrets:
+        raise ValueError("La tournée doit comporter au moins un arrêt.")
+    if len(set(arrets)) != len(arrets):
+        raise lt.MemeEmplacement(
+            "Attention, vous ne pouvez pas sélectionner 2 mêmes emplacements !"
+        )
+    for arret in arrets:
+        lt._determine_probleme(depart, arret, ville)
+
+    table = lt.matrice_durees([depart, *arrets], ville)
+    for arret, duree in zip(arrets, table.durees[0][1:]):
+        if duree == float("inf"):
+            raise lt.PasDeChemin(
+                f"Les emplacements {depart} et {arret} ne sont pas connectés !"
+            )
+
+    # un arrêt en travaux n'est traversé qu'une fois : sa pénalité, comptée à l'arrivée du trajet
+    # qui le dessert, est retirée du trajet suivant
+    durees = [
+        [d - ville.penalite(table.emplacements[i]) if i else d for d in ligne]
+        for i, ligne in enumerate(table.durees)
+    ]
+    for i in range(len(durees)):
+        durees[i][i] = 0
+    if len(arrets) <= seuil_exact:
+        ordre = _held_karp(durees, retour)
+    else:
+        ordre = _deux_opt(_insertion_proche(durees, retour), durees, retour)
+
+    visites = ordre + [0] if retour else ordre
+    return Tournee(
+        ordre=[table.emplacements[i] for i in visites],
+        trajets=[
+            lt.Itineraire(etapes=table.chemin(a, b))
+            for a, b in zip(visites, visites[1:])
+        ],
+        duree=_cout(ordre, durees, retour),
+    )
@@ -0,0 +1,76 @@
+"""Description.
+Outils partagés par les tests des moteurs de calcul de trajets (`liboracle`, `libregion`,
+`libroutage`) : villes aléatoires et comparaison à `determine_trajet`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+import random
+from collections.abc import Callable, Iterable
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Itineraire,
+    Ville,
+    PasDeChemin,
+    determine_trajet,
+    duree_trajet,
+)
+
+
+def ville_aleatoire(graine: int, n: int = 30, m: int = 45) -> Ville:
+    """Ville de `n` emplacements et `m` routes tirées au hasard (pas toujours connexe)."""
+    generateur = random.Random(graine)
+    emplacements = [Emplacement(nom=100 + i) for i in range(n)]
+    routes = {}
+    while len(routes) < m:
+        u, v = generateur.sample(range(n), 2)
+        routes[(min(u, v), max(u, v))] = float(generateur.randint(1, 20))
+    return Ville(
+        emplacements=emplacements,
+        arretes=[
+            (emplacements[u], emplacements[v], duree) for (u, v), duree in routes.items()
+        ],
+    )
+
+
+def paires_aleatoires(
+    ville: Ville, graine: int, nombre: int = 200
+) -> list[tuple[Emplacement, Emplacement]]:
+    """`nombre` couples d'emplacements distincts tirés au hasard."""
+    generateur = random.Random(graine)
+    return [tuple(generateur.sample(ville.emplacements, 2)) for _ in range(nombre)]
+
+
+def verifie_accord(
+    ville: Ville,
+    duree: Callable[[Emplacement, Emplacement], float] = None,
+    chemin: Callable[[Emplacement, Emplacement], Itineraire] = None,
+    paires: Iterable[tuple[Emplacement, Emplacement]] = None,
+):
+    """Compare un moteur à `determine_trajet` sur `paires` (par défaut, tous les couples).
+
+    - `duree` : durée annoncée par le moteur, `chemin` : itinéraire trouvé par le moteur
+    - Le moteur doit renvoyer l'exception PasDeChemin pour les emplacements non reliés
+    """
+    if paires is None:
+        paires = itertools.permutations(ville.emplacements, 2)
+    calculs = [calcul for calcul in (duree, chemin) if calcul is not None]
+    for depart, arrivee in paires:
+        try:
+            attendu = duree_trajet(determine_trajet(depart, arrivee, ville), ville)
+        except PasDeChemin:
+            for calcul in calculs:
+                with pytest.raises(PasDeChemin):
+                    calcul(depart, arrivee)
+            continue
+        if duree is not None:
+            assert duree(depart, arrivee) == pytest.approx(attendu)
+        if chemin is not None:
+            itineraire = chemin(depart, arrivee)
+            assert (itineraire.etapes[0], itineraire.etapes[-1]) == (depart, arrivee)
+            assert duree_trajet(itineraire, ville) == pytest.approx(attendu)
@@ -0,0 +1,110 @@
+"""Description.
+Tests unitaires du module `libaffectation`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+import pytest
+from source import libtaxi
+from source.libtaxi import (
+    Emplacement,
+    Itineraire,
+    Ville,
+    CARTE_VILLE,
+    determine_trajet,
+    duree_trajet,
+    EmplacementInconnu,
+    genere_travaux,
+)
+from source.libaffectation import taxis_proches, affecte_taxis, _methode_hongroise
+
+
+@pytest.fixture
+def flotte() -> dict[str, Emplacement]:
+    return {
+        "A": Emplacement(16),
+        "B": Emplacement(6),
+        "C": Emplacement(12),
+        "D": Emplacement(1),
+    }
+
+
+def test_taxis_proches_1(flotte):
+    resultat = taxis_proches(Emplacement(3), flotte, CARTE_VILLE, nombre=2)
+    assert [a.taxi for a in resultat] == ["B", "D"]
+    assert resultat[0].duree == 1.0
+    assert resultat[0].itineraire == Itineraire(etapes=[Emplacement(6), Emplacement(3)])
+
+
+def test_taxis_proches_2(flotte):
+    """Chaque durée renvoyée est celle du trajet optimal du taxi jusqu'au client."""
+    resultat = taxis_proches(Emplacement(9), flotte, CARTE_VILLE, nombre=10)
+    assert len(resultat) == len(flotte)
+    assert [a.duree for a in resultat] == sorted(a.duree for a in resultat)
+    for affectation in resultat:
+        optimal = determine_trajet(flotte[affectation.taxi], Emplacement(9), CARTE_VILLE)
+        assert affectation.duree == duree_trajet(optimal, CARTE_VILLE)
+        assert affectation.itineraire.etapes[0] == flotte[affectation.taxi]
+
+
+def test_taxis_proches_3():
+    e_1, e_2, e_3 = Emplacement(1), Emplacement(2), Emplacement(3)
+    ville = Ville(emplacements=[e_1, e_2, e_3], arretes=[(e_1, e_2, 2.0)])
+    resultat = taxis_proches(e_1, {"A": e_1, "B": e_3, "C": e_2}, ville, nombre=3)
+    assert [a.taxi for a in resultat] == ["A", "C"]
+    assert resultat[0].itineraire is None
+    with pytest.raises(EmplacementInconnu):
+        taxis_proches(Emplacement(18), {"A": e_1}, ville)
+
+
+def test_methode_hongroise():
+    couts = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+    affectation = _methode_hongroise(couts)
+    assert sum(couts[i][j] for i, j in enumerate(affectation)) == min(
+        sum(couts[i][j] for i, j in enumerate(p))
+        for p in itertools.permutations(range(3))
+    )
+
+
+def test_affecte_taxis_1(flotte):
+    clients = [Emplacement(3), Emplacement(15), Emplacement(8)]
+    resultat = affecte_taxis(clients, flotte, CARTE_VILLE)
+    assert [a.client for a in resultat] == clients
+    assert len({a.taxi for a in resultat}) == 3
+    assert sum(a.duree for a in resultat) == 1.0 + 3.0 + 5.0
+
+
+def test_affecte_taxis_2():
+    e_1, e_2, e_3 = Emplacement(1), Emplacement(2), Emplacement(3)
+    ville = Ville(emplacements=[e_1, e_2, e_3], arretes=[(e_1, e_2, 2.0)])
+    resultat = affecte_taxis([e_3, e_1, e_2], {"A": e_2}, ville)
+    assert resultat[0] is None
+    assert [a is None for a in resultat].count(False) == 1
+
+
+def test_affecte_taxis_3(flotte, monkeypatch):
+    """Un seul parcours par client, trajets d'approche du taxi vers le client."""
+    ville = genere_travaux([Emplacement(6), Emplacement(9)], 2.0, CARTE_VILLE)
+    clients = [Emplacement(3), Emplacement(15), Emplacement(8), Emplacement(9)]
+    parcours = []
+    dijkstra = libtaxi._dijkstra
+
+    def compte(G, source, **options):
+        parcours.append(source)
+        return dijkstra(G, source, **options)
+
+    monkeypatch.setattr(libtaxi, "_dijkstra", compte)
+    resultat = affecte_taxis(clients, flotte, ville)
+    assert parcours == clients
+    for affectation in resultat:
+        depart = flotte[affectation.taxi]
+        assert affectation.itineraire.etapes[0] == depart
+        assert affectation.itineraire.etapes[-1] == affectation.client
+        assert affectation.duree == duree_trajet(affectation.itineraire, ville)
+        assert affectation.duree == duree_trajet(
+            determine_trajet(depart, affectation.client, ville), ville
+        )
@@ -0,0 +1,132 @@
+"""Description.
+Tests unitaires du module `libasynchrone`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    CacheTrajets,
+    determine_trajet,
+    MemeEmplacement,
+    PasDeChemin,
+)
+from source.libasynchrone import (
+    RoutageAsynchrone,
+    SurchargeRoutage,
+    determine_trajet_async,
+    determine_trajets_async,
+)
+
+
+class ExecuteurManuel(Executor):
+    """Exécuteur qui ne calcule qu'à la demande du test."""
+
+    def __init__(self):
+        self.taches = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.taches.append((future, fn, args))
+        return future
+
+    def execute(self):
+        for future, fn, args in self.taches:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        self.taches = []
+
+
+def test_trajet_async():
+    async def scenario():
+        return await determine_trajet_async(Emplacement(2), Emplacement(8), CARTE_VILLE)
+
+    assert asyncio.run(scenario()) == determine_trajet(
+        Emplacement(2), Emplacement(8), CARTE_VILLE
+    )
+
+
+def test_trajets_async():
+    e_1, e_2, e_5 = Emplacement(1), Emplacement(2), Emplacement(5)
+    ville = Ville(emplacements=[e_1, e_2, e_5], arretes=[(e_1, e_2, 5.0)])
+
+    async def scenario():
+        return await determine_trajets_async(
+            [(e_1, e_2), (e_1, e_5)], ville, erreurs=True
+        )
+
+    trajet, erreur = asyncio.run(scenario())
+    assert trajet.etapes == [e_1, e_2]
+    assert isinstance(erreur, PasDeChemin)
+
+    with pytest.raises(MemeEmplacement):
+        asyncio.run(determine_trajet_async(e_1, e_1, ville))
+
+
+def test_regroupement():
+    executeur = ExecuteurManuel()
+    routage = RoutageAsynchrone(executeur=executeur)
+
+    async def scenario():
+        demandes = [
+            asyncio.ensure_future(
+                routage.determine_trajet(Emplacement(1), Emplacement(16), CARTE_VILLE)
+            )
+            for _ in range(10)
+        ]
+        await asyncio.sleep(0.01)
+        assert len(executeur.taches) == 1
+        executeur.execute()
+        return await asyncio.gather(*demandes)
+
+    resultats = asyncio.run(scenario())
+    assert routage.calculs == 1
+    assert routage.regroupements == 9
+    assert all(r == resultats[0] for r in resultats)
+
+
+def test_contre_pression():
+    executeur = ExecuteurManuel()
+    routage = RoutageAsynchrone(executeur=executeur, max_en_cours=1, max_en_attente=1)
+
+    async def scenario():
+        premiere = asyncio.ensure_future(
+            routage.determine_trajet(Emplacement(1), Emplacement(16), CARTE_VILLE)
+        )
+        seconde = asyncio.ensure_future(
+            routage.determine_trajet(Emplacement(2), Emplacement(16), CARTE_VILLE)
+        )
+        await asyncio.sleep(0.01)
+        assert routage.en_attente == 1
+        with pytest.raises(SurchargeRoutage):
+            await routage.determine_trajet(Emplacement(3), Emplacement(16), CARTE_VILLE)
+        while not (premiere.done() and seconde.done()):
+            executeur.execute()
+            await asyncio.sleep(0.01)
+        return premiere.result(), seconde.result()
+
+    premiere, seconde = asyncio.run(scenario())
+    assert premiere.etapes[0] == Emplacement(1)
+    assert seconde.etapes[0] == Emplacement(2)
+
+
+def test_processus_et_cache():
+    cache = CacheTrajets()
+    with ProcessPoolExecutor(max_workers=2) as executeur:
+        routage = RoutageAsynchrone(executeur=executeur, cache=cache)
+        paires = [(Emplacement(1), Emplacement(e)) for e in range(2, 17)]
+        resultats = asyncio.run(routage.determine_trajets(paires, CARTE_VILLE))
+        assert resultats == [determine_trajet(a, b, CARTE_VILLE) for a, b in paires]
+        asyncio.run(routage.determine_trajets(paires, CARTE_VILLE))
+    assert routage.calculs == len(paires)
+    assert cache.succes == len(paires)
@@ -0,0 +1,74 @@
+"""Description.
+Tests unitaires du module `libcriticite`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+import networkx as nx
+from source.libtaxi import Emplacement, Ville, CARTE_VILLE, _convertit_en_nx
+from source.libcriticite import analyse_criticite
+
+
+def _somme_durees(G: nx.Graph) -> float:
+    return (
+        sum(
+            duree
+            for _, durees in nx.all_pairs_dijkstra_path_length(G, weight="duree")
+            for duree in durees.values()
+        )
+        / 2
+    )
+
+
+@pytest.fixture(scope="module")
+def analyse():
+    return analyse_criticite(CARTE_VILLE, processus=1)
+
+
+def test_intermediarite(analyse):
+    G = _convertit_en_nx(CARTE_VILLE)
+    routes = nx.edge_betweenness_centrality(G, normalized=False, weight="duree")
+    for route in analyse.routes:
+        cle = (route.depart, route.arrivee)
+        attendu = routes[cle] if cle in routes else routes[cle[::-1]]
+        assert route.intermediarite == pytest.approx(attendu)
+    emplacements = nx.betweenness_centrality(G, normalized=False, weight="duree")
+    for emplacement, attendu in emplacements.items():
+        assert analyse.emplacements[emplacement] == pytest.approx(attendu)
+
+
+def test_impact_fermeture(analyse):
+    G = _convertit_en_nx(CARTE_VILLE)
+    reference = _somme_durees(G)
+    for route in analyse.routes:
+        H = G.copy()
+        H.remove_edge(route.depart, route.arrivee)
+        assert route.impact == pytest.approx(_somme_durees(H) - reference)
+        assert route.paires_deconnectees == 0
+    impacts = [route.impact for route in analyse.routes]
+    assert impacts == sorted(impacts, reverse=True)
+
+
+def test_pool_de_processus(analyse):
+    parallele = analyse_criticite(CARTE_VILLE, processus=3)
+    for route, attendu in zip(parallele.routes, analyse.routes):
+        assert (route.depart, route.arrivee) == (attendu.depart, attendu.arrivee)
+        assert route.impact == pytest.approx(attendu.impact)
+        assert route.intermediarite == pytest.approx(attendu.intermediarite)
+
+
+def test_pont():
+    e_1, e_2, e_3, e_4 = Emplacement(1), Emplacement(2), Emplacement(3), Emplacement(4)
+    ville = Ville(
+        emplacements=[e_1, e_2, e_3, e_4],
+        arretes=[(e_1, e_2, 1.0), (e_2, e_3, 1.0), (e_1, e_3, 1.0), (e_3, e_4, 2.0)],
+    )
+    analyse = analyse_criticite(ville, processus=2)
+    pont = analyse.routes[0]
+    assert (pont.depart, pont.arrivee) == (e_3, e_4)
+    assert pont.paires_deconnectees == 3
+    assert pont.intermediarite == 3.0
@@ -0,0 +1,140 @@
+"""Description.
+Tests différentiels des moteurs de calcul de trajets (module `libdifferentiel`).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import networkx as nx
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    PasDeChemin,
+    _convertit_en_nx,
+    determine_trajet,
+)
+from source.libdifferentiel import (
+    MOTEURS,
+    compare,
+    reduit,
+    reproduction,
+    verifie,
+    ville_aleatoire,
+)
+
+
+@pytest.mark.parametrize("graines", [range(0, 10), range(10, 20), range(20, 30)])
+def test_differentiel(graines):
+    rapports = verifie(graines)
+    if rapports:
+        pytest.fail("\n\n".join(str(rapport) for rapport in rapports))
+
+
+def test_ville_aleatoire():
+    assert ville_aleatoire(4) == ville_aleatoire(4)
+    villes = [ville_aleatoire(graine) for graine in range(30)]
+    assert any(not nx.is_connected(_convertit_en_nx(ville)) for ville in villes)
+    assert any(ville.travaux for ville in villes)
+    assert any(ville.coordonnees for ville in villes)
+    assert len(ville_aleatoire(1, emplacements=7).emplacements) == 7
+
+
+def _moteur_sans_travaux(ville: Ville):
+    """Moteur volontairement faux : il ignore les emplacements en travaux."""
+    sans_travaux = Ville(emplacements=ville.emplacements, arretes=ville.arretes)
+    return lambda depart, arrivee: (
+        None,
+        determine_trajet(depart, arrivee, sans_travaux).etapes,
+    )
+
+
+def _moteur_toujours_relie(ville: Ville):
+    """Moteur volontairement faux : il annonce un trajet direct entre tous les emplacements."""
+    return lambda depart, arrivee: (1.0, None)
+
+
+def test_compare_detecte():
+    ville = Ville(
+        emplacements=[Emplacement(nom=i) for i in range(1, 5)],
+        arretes=[
+            (Emplacement(nom=1), Emplacement(nom=2), 1.0),
+            (Emplacement(nom=2), Emplacement(nom=3), 1.0),
+            (Emplacement(nom=1), Emplacement(nom=3), 2.5),
+        ],
+        travaux={Emplacement(nom=2): 3.0},
+    )
+    ecarts = compare(ville, {"faux": _moteur_sans_travaux})
+    assert {(e.depart.nom, e.arrivee.nom) for e in ecarts} == {(1, 3), (3, 1)}
+    ecarts = compare(ville, {"relie": _moteur_toujours_relie})
+    assert any(e.depart.nom == 4 and e.attendu is None for e in ecarts)
+    assert compare(ville, MOTEURS) == []
+
+
+def test_routes_multiples():
+    """Tous les moteurs, y compris la référence, retiennent la route la plus rapide."""
+    ville = Ville(
+        emplacements=[Emplacement(nom=i) for i in range(1, 4)],
+        arretes=[
+            (Emplacement(nom=1), Emplacement(nom=2), 2.0),
+            (Emplacement(nom=2), Emplacement(nom=3), 1.0),
+            (Emplacement(nom=2), Emplacement(nom=1), 9.0),
+            (Emplacement(nom=1), Emplacement(nom=3), 4.0),
+            (Emplacement(nom=3), Emplacement(nom=1), 2.5),
+        ],
+    )
+    assert "asynchrone" in MOTEURS
+    assert compare(ville) == []
+
+
+def test_reduction_minimale():
+    moteur = {"faux": _moteur_sans_travaux}
+    rapports = verifie(range(15), moteur)
+    assert rapports
+    for rapport in rapports:
+        reduite = rapport.reduite
+        assert compare(reduite, moteur)
+        # deux chemins entre deux emplacements dont l'un passe par des travaux
+        assert len(reduite.emplacements) == 3
+        assert len(reduite.arretes) == 3
+        assert 1 <= len(reduite.travaux) <= 2
+        # retirer une seule route suffit à faire disparaître l'échec
+        for k in range(len(reduite.arretes)):
+            assert not compare(
+                Ville(
+                    emplacements=reduite.emplacements,
+                    arretes=reduite.arretes[:k] + reduite.arretes[k + 1 :],
+                    travaux=reduite.travaux,
+                ),
+                moteur,
+            )
+        assert reproduction(reduite) in str(rapport)
+
+
+def test_reduction_pas_de_chemin():
+    def moteur_sans_chemin(ville):
+        def requete(depart, arrivee):
+            raise PasDeChemin("")
+
+        return requete
+
+    ville = ville_aleatoire(2, emplacements=12, composantes=1)
+    reduite = reduit(ville, lambda v: bool(compare(v, {"vide": moteur_sans_chemin})))
+    assert reduite == Ville(
+        emplacements=[Emplacement(nom=1), Emplacement(nom=2)],
+        arretes=[(Emplacement(nom=1), Emplacement(nom=2), 1.0)],
+    )
+
+
+def test_reproduction():
+    ville = Ville(
+        emplacements=[Emplacement(nom=1), Emplacement(nom=2)],
+        arretes=[(Emplacement(nom=1), Emplacement(nom=2), 1.5)],
+        coordonnees={Emplacement(nom=1): (0.0, 0.0), Emplacement(nom=2): (1.0, 0.0)},
+        travaux={Emplacement(nom=2): 2.0},
+    )
+    relue = eval(reproduction(ville))
+    assert relue == ville
+    assert relue.coordonnees == ville.coordonnees
@@ -0,0 +1,113 @@
+"""Description.
+Tests unitaires du module `libevaluation`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import numpy as np
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Itineraire,
+    CARTE_VILLE,
+    ArreteInexistante,
+    determine_trajet,
+    duree_trajet,
+    genere_bouchons,
+    genere_travaux,
+)
+from source.libevaluation import IndexRoutes, evalue_trajets, evalue_trajets_plats
+
+
+def _itineraire(*noms: int) -> Itineraire:
+    return Itineraire(etapes=[Emplacement(nom=nom) for nom in noms])
+
+
+def test_index_routes():
+    index = IndexRoutes(CARTE_VILLE)
+    durees = index.durees(np.array([1, 2, 1, 99]), np.array([2, 1, 16, 1]))
+    assert durees[:2].tolist() == [5.0, 5.0]
+    assert np.isnan(durees[2:]).all()
+    assert index.indices(np.array([1, 16, 99])).tolist() == [0, 15, -1]
+
+
+def test_evaluation_accord():
+    """Les durées vectorisées sont celles de `duree_trajet`, trajet par trajet."""
+    generateur = random.Random(0)
+    itineraires = [
+        determine_trajet(*generateur.sample(CARTE_VILLE.emplacements, 2), CARTE_VILLE)
+        for _ in range(200)
+    ]
+    evaluation = evalue_trajets(itineraires, CARTE_VILLE)
+    assert len(evaluation) == 200
+    assert evaluation.valides.all()
+    for k, itineraire in enumerate(itineraires):
+        assert evaluation.durees[k] == pytest.approx(duree_trajet(itineraire, CARTE_VILLE))
+        assert len(evaluation.troncons(k)) == len(itineraire.etapes) - 1
+
+
+def test_evaluation_travaux():
+    ville = genere_travaux([Emplacement(nom=2), Emplacement(nom=5)], 3.0, CARTE_VILLE)
+    evaluation = evalue_trajets(
+        [_itineraire(1, 2, 5), _itineraire(1, 3)], ville
+    )
+    assert evaluation.durees.tolist() == [
+        duree_trajet(_itineraire(1, 2, 5), ville),
+        duree_trajet(_itineraire(1, 3), ville),
+    ]
+    assert evaluation.durees[0] == evaluation.troncons(0).sum() + 6.0
+
+
+def test_evaluation_routes_inexistantes():
+    itineraires = [
+        _itineraire(1, 2, 5),
+        _itineraire(1, 16, 12),
+        _itineraire(),
+        _itineraire(1, 99),
+    ]
+    with pytest.raises(ArreteInexistante):
+        duree_trajet(itineraires[1], CARTE_VILLE)
+    evaluation = evalue_trajets(itineraires, CARTE_VILLE)
+    assert evaluation.valides.tolist() == [True, False, True, False]
+    assert evaluation.invalides.tolist() == [1, 3]
+    assert evaluation.durees[0] == duree_trajet(itineraires[0], CARTE_VILLE)
+    assert evaluation.durees[2] == 0.0
+    assert np.isnan(evaluation.durees[[1, 3]]).all()
+    assert np.isnan(evaluation.troncons(1)[0])
+    assert evaluation.troncons(1)[1] == 9.0
+    assert evaluation.debuts_troncons.tolist() == [0, 2, 4, 4, 5]
+
+
+def test_evaluation_plats():
+    emplacements = np.array([1, 2, 5, 5, 2, 1, 3])
+    routes = IndexRoutes(genere_bouchons(Emplacement(1), Emplacement(2), 2.0, CARTE_VILLE))
+    evaluation = evalue_trajets_plats(
+        emplacements, np.array([0, 3, 6, 6, 7]), routes=routes
+    )
+    # un trajet vide puis un trajet d'un seul emplacement
+    assert evaluation.durees.tolist() == [10.0, 10.0, 0.0, 0.0]
+    assert evaluation.debuts_troncons.tolist() == [0, 2, 4, 4, 4]
+    with pytest.raises(ValueError):
+        evalue_trajets_plats(emplacements, np.array([0, 4, 3]), routes=routes)
+    with pytest.raises(ValueError):
+        evalue_trajets_plats(emplacements, np.array([0, 3]), routes=routes)
+    with pytest.raises(ValueError):
+        evalue_trajets_plats(emplacements, np.array([0, 7]))
+
+
+@pytest.mark.parametrize(
+    "ville", [CARTE_VILLE, genere_travaux([Emplacement(1)], 3.0, CARTE_VILLE)]
+)
+def test_evaluation_sans_troncon(ville):
+    """Un lot sans aucune route : lot vide ou trajets d'un seul emplacement."""
+    vide = evalue_trajets([], ville)
+    assert vide.durees.dtype == np.float64 and len(vide.durees) == 0
+    assert vide.debuts_troncons.tolist() == [0]
+    evaluation = evalue_trajets_plats(np.array([1, 7]), np.array([0, 1, 1, 2]), ville=ville)
+    assert evaluation.durees.dtype == np.float64
+    assert evaluation.durees.tolist() == [0.0, 0.0, 0.0]
+    assert evaluation.valides.tolist() == [True, True, True]
@@ -0,0 +1,159 @@
+"""Description.
+Tests unitaires du module `libexport`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+import json
+import math
+import numpy as np
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    EmplacementInconnu,
+    MemeEmplacement,
+    determine_trajet,
+    duree_trajet,
+    genere_travaux,
+)
+from source import libexport as lex
+from source.libexport import (
+    SCHEMA_ROUTES,
+    exporte,
+    exporte_durees,
+    exporte_routes,
+    exporte_trajets,
+    format_export,
+    lit_export,
+    lots_durees,
+    pyarrow_disponible,
+)
+
+FORMATS = ["npz", "jsonl"] + (["parquet", "arrow"] if pyarrow_disponible() else [])
+
+VILLE_ILOT = Ville(
+    emplacements=[Emplacement(nom=i) for i in range(1, 6)],
+    arretes=[
+        (Emplacement(nom=1), Emplacement(nom=2), 3.0),
+        (Emplacement(nom=2), Emplacement(nom=3), 1.5),
+        (Emplacement(nom=4), Emplacement(nom=5), 2.0),
+    ],
+)
+"""Deux groupes d'emplacements non reliés entre eux."""
+
+
+def test_format_export():
+    assert format_export("routes.npz") == ("routes.npz", "npz")
+    assert format_export("routes.JSONL") == ("routes.JSONL", "jsonl")
+    if not pyarrow_disponible():
+        assert format_export("routes.parquet") == ("routes.npz", "npz")
+    with pytest.raises(ValueError):
+        format_export("routes.csv")
+
+
+@pytest.mark.parametrize("format_", FORMATS)
+def test_export_routes(tmp_path, format_):
+    resultat = exporte_routes(CARTE_VILLE, str(tmp_path / f"routes.{format_}"))
+    assert (resultat.format, resultat.lignes) == (format_, len(CARTE_VILLE.arretes))
+    colonnes = lit_export(resultat.chemin)
+    assert list(colonnes) == ["depart", "arrivee", "duree"]
+    assert [
+        (Emplacement(nom=int(u)), Emplacement(nom=int(v)), d)
+        for u, v, d in zip(colonnes["depart"], colonnes["arrivee"], colonnes["duree"])
+    ] == CARTE_VILLE.arretes
+    assert not os.path.exists(resultat.chemin + ".tmp")
+
+
+@pytest.mark.parametrize("format_", FORMATS)
+def test_export_durees(tmp_path, format_):
+    ville = genere_travaux([Emplacement(nom=5)], 2.0, CARTE_VILLE)
+    resultat = exporte_durees(ville, str(tmp_path / f"durees.{format_}"), taille=5)
+    assert resultat.lots == 4
+    colonnes = lit_export(resultat.chemin)
+    assert resultat.lignes == len(colonnes["duree"]) == 16 * 15
+    for depart, arrivee, duree in zip(
+        colonnes["depart"], colonnes["arrivee"], colonnes["duree"]
+    ):
+        depart, arrivee = Emplacement(nom=int(depart)), Emplacement(nom=int(arrivee))
+        assert duree == pytest.approx(
+            duree_trajet(determine_trajet(depart, arrivee, ville), ville)
+        )
+
+
+def test_lots_durees_delta(monkeypatch):
+    """Au-delà du seuil, les durées viennent du delta-stepping et restent identiques."""
+    ville = genere_travaux([Emplacement(nom=5)], 2.0, CARTE_VILLE)
+    attendus = list(lots_durees(ville, taille=5))
+    monkeypatch.setattr(lex, "SEUIL_DELTA", 0)
+    for lot, attendu in zip(lots_durees(ville, taille=5), attendus, strict=True):
+        assert lot["depart"].tolist() == attendu["depart"].tolist()
+        assert lot["arrivee"].tolist() == attendu["arrivee"].tolist()
+        np.testing.assert_allclose(lot["duree"], attendu["duree"])
+    assert len(next(lots_durees(VILLE_ILOT))["duree"]) == 8
+
+
+def test_export_durees_non_connectees(tmp_path):
+    """Les paires non reliées ne sont pas exportées."""
+    colonnes = lit_export(exporte_durees(VILLE_ILOT, str(tmp_path / "d.npz")).chemin)
+    paires = set(zip(colonnes["depart"].tolist(), colonnes["arrivee"].tolist()))
+    assert paires == {(1, 2), (2, 1), (1, 3), (3, 1), (2, 3), (3, 2), (4, 5), (5, 4)}
+
+
+def test_lots_durees_emplacements():
+    lots = list(lots_durees(CARTE_VILLE, [Emplacement(nom=1), Emplacement(nom=16)]))
+    assert len(lots) == 1
+    assert lots[0]["depart"].tolist() == [1, 16]
+    assert lots[0]["arrivee"].tolist() == [16, 1]
+    with pytest.raises(EmplacementInconnu):
+        list(lots_durees(CARTE_VILLE, [Emplacement(nom=99)]))
+
+
+@pytest.mark.parametrize("format_", FORMATS)
+def test_export_trajets(tmp_path, format_):
+    paires = [
+        (Emplacement(nom=a), Emplacement(nom=b))
+        for a, b in itertools.permutations(range(1, 17), 2)
+    ]
+    resultat = exporte_trajets(
+        CARTE_VILLE, iter(paires), str(tmp_path / f"t.{format_}"), taille=50
+    )
+    assert (resultat.lignes, resultat.lots) == (240, 5)
+    colonnes = lit_export(resultat.chemin)
+    etapes = np.split(colonnes["etapes"], np.cumsum(colonnes["longueur"])[:-1])
+    for k, (depart, arrivee) in enumerate(paires):
+        assert (colonnes["depart"][k], colonnes["arrivee"][k]) == (depart.nom, arrivee.nom)
+        attendu = duree_trajet(determine_trajet(depart, arrivee, CARTE_VILLE), CARTE_VILLE)
+        assert colonnes["duree"][k] == pytest.approx(attendu)
+        assert etapes[k][0] == depart.nom and etapes[k][-1] == arrivee.nom
+
+
+def test_export_trajets_impossibles(tmp_path):
+    chemin = str(tmp_path / "t.jsonl")
+    exporte_trajets(VILLE_ILOT, [(Emplacement(nom=1), Emplacement(nom=4))], chemin)
+    with open(chemin, encoding="utf-8") as fichier:
+        ligne = json.loads(fichier.readline())
+    assert ligne == {"depart": 1, "arrivee": 4, "duree": None, "longueur": 0, "etapes": []}
+    assert math.isinf(lit_export(chemin)["duree"][0])
+
+
+def test_export_trajets_invalides(tmp_path):
+    chemin = tmp_path / "t.npz"
+    with pytest.raises(MemeEmplacement):
+        exporte_trajets(CARTE_VILLE, [(Emplacement(nom=1), Emplacement(nom=1))], str(chemin))
+    with pytest.raises(EmplacementInconnu):
+        exporte_trajets(CARTE_VILLE, [(Emplacement(nom=1), Emplacement(nom=99))], str(chemin))
+    # aucun fichier partiel ne reste après une erreur
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("format_", FORMATS)
+def test_export_vide(tmp_path, format_):
+    resultat = exporte(iter([]), SCHEMA_ROUTES, str(tmp_path / f"vide.{format_}"))
+    assert (resultat.lignes, resultat.lots) == (0, 0)
+    assert os.path.exists(resultat.chemin)
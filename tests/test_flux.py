@@ -0,0 +1,118 @@
+"""Description.
+Tests unitaires du module `libflux`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import time
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    CARTE_VILLE,
+    MemeEmplacement,
+    genere_bouchons,
+    genere_travaux,
+)
+from source.libinstantane import DepotVille
+from source.libflux import EvenementInvalide, FluxTrafic, lit_evenement
+
+
+def _ligne(**evenement) -> str:
+    return json.dumps(evenement) + "\n"
+
+
+def test_lit_evenement():
+    evenement = lit_evenement(_ligne(type="bouchon", depart=1, arrivee=3, duree=2))
+    assert evenement.emplacements == (Emplacement(1), Emplacement(3))
+    assert evenement.duree == 2.0
+    travaux = lit_evenement(_ligne(type="travaux", emplacements=[3, 5], duree=1))
+    assert travaux.emplacements == (Emplacement(3), Emplacement(5))
+    for ligne in [
+        "pas du json",
+        _ligne(type="grele", depart=1, arrivee=3, duree=2),
+        _ligne(type="bouchon", depart=1, duree=2),
+        _ligne(type="bouchon", depart=1, arrivee=3, duree=-2),
+    ]:
+        with pytest.raises(EvenementInvalide):
+            lit_evenement(ligne)
+
+
+def test_flux_regroupement():
+    """Les événements d'une même fenêtre sont fusionnés et publiés en une seule version."""
+    depot = DepotVille(CARTE_VILLE)
+    lignes = [
+        _ligne(type="bouchon", depart=1, arrivee=3, duree=2),
+        _ligne(type="bouchon", depart=3, arrivee=1, duree=3),
+        _ligne(type="fluidification", depart=1, arrivee=2, duree=1),
+        _ligne(type="travaux", emplacements=[16], duree=1),
+    ]
+    statistiques = FluxTrafic(depot, fenetre=10.0).traite(lignes)
+    assert (statistiques.recus, statistiques.rejetes, statistiques.lots) == (4, 0, 1)
+    assert depot.instantane.version == 1
+    attendu = genere_bouchons(Emplacement(1), Emplacement(3), 5.0, CARTE_VILLE)
+    attendu = genere_bouchons(Emplacement(1), Emplacement(2), -1.0, attendu)
+    attendu = genere_travaux([Emplacement(16)], 1.0, attendu)
+    assert depot.ville == attendu
+    assert len(statistiques.latences) == 4
+    assert statistiques.debit > 0
+
+
+def test_flux_rejets():
+    depot = DepotVille(CARTE_VILLE)
+    lignes = [
+        "pas du json\n",
+        _ligne(type="bouchon", depart=1, arrivee=6, duree=2),
+        _ligne(type="bouchon", depart=1, arrivee=18, duree=2),
+        _ligne(type="fluidification", depart=3, arrivee=6, duree=1),
+        _ligne(type="bouchon", depart=1, arrivee=2, duree=1),
+    ]
+    statistiques = FluxTrafic(depot, fenetre=10.0).traite(lignes)
+    assert (statistiques.recus, statistiques.rejetes) == (5, 4)
+    assert depot.ville.arretes[0][2] == 6.0
+    assert depot.ville.arretes[6][2] == 1.0
+
+
+def test_flux_travaux():
+    """Un événement répétant un emplacement est rejeté, deux événements sur un emplacement
+    s'additionnent comme deux appels à `genere_travaux`."""
+    depot = DepotVille(CARTE_VILLE)
+    lignes = [
+        _ligne(type="travaux", emplacements=[3, 3], duree=1),
+        _ligne(type="travaux", emplacements=[3, 5], duree=1),
+        _ligne(type="travaux", emplacements=[3], duree=2),
+    ]
+    with pytest.raises(MemeEmplacement):
+        genere_travaux([Emplacement(3), Emplacement(3)], 1.0, CARTE_VILLE)
+    statistiques = FluxTrafic(depot, fenetre=10.0).traite(lignes)
+    assert (statistiques.recus, statistiques.rejetes, statistiques.lots) == (3, 1, 1)
+    attendu = genere_travaux([Emplacement(3), Emplacement(5)], 1.0, CARTE_VILLE)
+    attendu = genere_travaux([Emplacement(3)], 2.0, attendu)
+    assert depot.ville == attendu
+    assert depot.ville.travaux == {Emplacement(3): 3.0, Emplacement(5): 1.0}
+
+
+def test_flux_fenetre():
+    """Un lot est publié à l'expiration de la fenêtre, sans attendre la fin du flux."""
+    depot = DepotVille(CARTE_VILLE)
+
+    def lignes():
+        yield _ligne(type="bouchon", depart=1, arrivee=2, duree=1)
+        time.sleep(0.2)
+        yield _ligne(type="bouchon", depart=1, arrivee=2, duree=1)
+
+    statistiques = FluxTrafic(depot, fenetre=0.01).traite(lignes())
+    assert statistiques.lots == 2
+    assert statistiques.latence(0.99) < 0.2
+    assert depot.ville.arretes[0][2] == 7.0
+
+
+def test_flux_taille_lot():
+    depot = DepotVille(CARTE_VILLE)
+    lignes = [_ligne(type="bouchon", depart=1, arrivee=2, duree=1)] * 10
+    statistiques = FluxTrafic(depot, fenetre=10.0, taille_lot=4).traite(lignes)
+    assert statistiques.lots == 3
+    assert depot.ville.arretes[0][2] == 15.0
@@ -60,3 +60,10 @@ def test_markdown_trajet(itineraire_simple):
     assert calcul.parsed[11].content == "Emplacement 1 (durée : 5.0 minutes)"
     assert calcul.parsed[16].content == "Emplacement 2"
     assert calcul.parsed[22].content == "`Durée totale du trajet` : 5.0 minutes"
+
+
+def test_format_trajet_route_inexistante():
+    itineraire = Itineraire(etapes=[Emplacement(nom=1), Emplacement(nom=16)])
+    calcul = format_trajet(itineraire)
+    assert "route inexistante" in calcul.markup
+    assert "indéterminée" in calcul.markup
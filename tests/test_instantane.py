@@ -0,0 +1,173 @@
+"""Description.
+Tests unitaires du module `libinstantane`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import threading
+import pytest
+import networkx as nx
+from source.libtaxi import (
+    Emplacement,
+    CARTE_VILLE,
+    duree_trajet,
+    genere_bouchons,
+    ArreteInexistante,
+    DureeNegative,
+    VilleFigee,
+)
+from source.libinstantane import DepotVille, compile_ville
+
+
+def test_instantane_fige():
+    instantane = compile_ville(CARTE_VILLE, version=2)
+    assert instantane.version == 2
+    assert instantane.ville == CARTE_VILLE
+    assert not CARTE_VILLE.figee
+    with pytest.raises(VilleFigee):
+        instantane.ville.arretes = []
+    with pytest.raises(nx.NetworkXError):
+        instantane.graphe.add_edge(Emplacement(1), Emplacement(16))
+    with pytest.raises(AttributeError):
+        instantane.version = 3
+
+
+def test_depot_modifie():
+    depot = DepotVille(CARTE_VILLE)
+    ancien = depot.instantane
+    nouveau = depot.modifie(
+        lambda ville: genere_bouchons(Emplacement(1), Emplacement(3), 4.0, ville)
+    )
+    assert nouveau is depot.instantane
+    assert nouveau.version == 1
+    assert ancien.ville.arretes[1][2] == 9.0
+    assert nouveau.ville.arretes[1][2] == 13.0
+
+    with pytest.raises(ArreteInexistante):
+        depot.modifie(
+            lambda ville: genere_bouchons(Emplacement(1), Emplacement(6), 4.0, ville)
+        )
+    assert depot.instantane is nouveau
+
+
+def test_depot_lecteurs_concurrents():
+    """Des lecteurs calculent des trajets pendant qu'un écrivain publie des bouchons."""
+    depot = DepotVille(CARTE_VILLE)
+    routes = [(u, v) for u, v, _ in CARTE_VILLE.arretes]
+    erreurs = []
+    fin = threading.Event()
+
+    def lecteur(graine):
+        generateur = random.Random(graine)
+        derniere_version = -1
+        try:
+            while not fin.is_set():
+                instantane = depot.instantane
+                assert instantane.version >= derniere_version
+                derniere_version = instantane.version
+                depart, arrivee = generateur.sample(CARTE_VILLE.emplacements, 2)
+                itineraire = instantane.determine_trajet(depart, arrivee)
+                # le trajet est optimal pour la version sur laquelle il a été calculé
+                assert duree_trajet(itineraire, instantane.ville) == pytest.approx(
+                    nx.shortest_path_length(
+                        instantane.graphe, depart, arrivee, weight="duree"
+                    )
+                )
+        except Exception as e:  # remonté au thread principal
+            erreurs.append(e)
+
+    def ecrivain():
+        generateur = random.Random(0)
+        for _ in range(200):
+            u, v = generateur.choice(routes)
+            duree = generateur.choice([2.0, -1.0])
+            try:
+                depot.modifie(lambda ville: genere_bouchons(u, v, duree, ville))
+            except DureeNegative:  # fluidification impossible sur une route trop courte
+                pass
+
+    lecteurs = [threading.Thread(target=lecteur, args=(i,)) for i in range(6)]
+    for thread in lecteurs:
+        thread.start()
+    ecriture = threading.Thread(target=ecrivain)
+    ecriture.start()
+    ecriture.join()
+    fin.set()
+    for thread in lecteurs:
+        thread.join()
+
+    assert not erreurs
+    assert depot.instantane.version > 100
+
+
+def _constructeur_bloque(feu: threading.Event):
+    """Index dont la construction attend le feu vert du test."""
+
+    def constructeur(ville):
+        assert feu.wait(5)
+        return len(ville.emplacements)
+
+    return constructeur
+
+
+def test_prechauffage():
+    feu = threading.Event()
+    depot = DepotVille(
+        CARTE_VILLE, constructeurs={"taille": _constructeur_bloque(feu)}, prechauffage=True
+    )
+    instantane = depot.instantane
+    assert not depot.pret
+    assert instantane.index("taille") is None
+    # la requête n'attend pas la fin du préchauffage
+    itineraire = instantane.determine_trajet(Emplacement(1), Emplacement(12))
+    assert duree_trajet(itineraire, CARTE_VILLE) == 17.0
+
+    feu.set()
+    assert instantane.structures.attend(5)
+    assert depot.pret
+    assert instantane.graphe is not None and nx.is_frozen(instantane.graphe)
+    assert instantane.index("taille") == 16
+    assert set(instantane.structures.durees) == {"graphe", "taille"}
+    assert instantane.structures.duree >= 0
+
+
+def test_prechauffage_abandon():
+    feu = threading.Event()
+    appels = []
+
+    def second(ville):
+        appels.append(ville)
+        return None
+
+    depot = DepotVille(
+        CARTE_VILLE,
+        constructeurs={"premier": _constructeur_bloque(feu), "second": second},
+        prechauffage=True,
+    )
+    ancien = depot.instantane
+    nouveau = depot.modifie(
+        lambda ville: genere_bouchons(Emplacement(1), Emplacement(3), 4.0, ville)
+    )
+    feu.set()
+    assert ancien.structures.attend(5) and nouveau.structures.attend(5)
+    # la version remplacée n'a pas construit les index restants
+    assert "second" not in ancien.structures.index
+    assert appels == [nouveau.ville]
+
+
+def test_prechauffage_erreur():
+    def defaillant(ville):
+        raise RuntimeError("index impossible")
+
+    instantane = compile_ville(
+        CARTE_VILLE, constructeurs={"defaillant": defaillant}, arriere_plan=True
+    )
+    assert instantane.structures.attend(5)
+    assert isinstance(instantane.structures.erreur, RuntimeError)
+    assert instantane.graphe is not None
+    with pytest.raises(RuntimeError):
+        compile_ville(CARTE_VILLE, constructeurs={"defaillant": defaillant})
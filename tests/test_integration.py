@@ -7,6 +7,7 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import re
 from subprocess import run
 from typer.testing import CliRunner
 from source.app import app
@@ -221,3 +222,149 @@ def test_travaux_2():
         "Attention, vous ne pouvez pas sélectionner 2 mêmes emplacements !"
         in result.output
     )
+
+
+def test_tournee_1():
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["tournee", "1", "16", "5"])
+    assert result.exit_code == 0
+    assert "Le taxi dessert les emplacements dans l'ordre suivant" in result.output
+    assert "Emplacement 5 (via" in result.output
+    assert "Emplacement 16 (via" in result.output
+    assert "Durée totale de la tournée" in result.output
+
+    result = runner.invoke(app, ["tournee", "1", "16", "18"])
+    assert result.exit_code == 0
+    assert "Attention, 18 n'est pas un emplacement valide !" in result.output
+
+
+def test_taxis_1():
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["taxis", "3", "16", "6", "3", "--nombre", "2"])
+    assert result.exit_code == 0
+    assert "Taxi 3" in result.output
+    assert "déjà sur place" in result.output
+
+    result = runner.invoke(app, ["taxis", "3", "18"])
+    assert result.exit_code == 0
+    assert "Attention, 18 n'est pas un emplacement valide !" in result.output
+
+
+def test_isochrone_1():
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["isochrone", "1", "4", "6"])
+    assert result.exit_code == 0
+    assert "Emplacements accessibles depuis l'emplacement 1" in result.output
+
+    result = runner.invoke(app, ["isochrone", "18", "4"])
+    assert result.exit_code == 0
+    assert "Attention, 18 n'est pas un emplacement valide !" in result.output
+
+
+def test_criticite_1():
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["criticite", "--nombre", "3", "--processus", "1"])
+    assert result.exit_code == 0
+    assert "Routes les plus critiques de la ville" in result.output
+
+
+def test_flux_1(tmp_path):
+    evenements = tmp_path / "evenements.jsonl"
+    evenements.write_text(
+        '{"type": "bouchon", "depart": 1, "arrivee": 3, "duree": 2.0}\n'
+        '{"type": "travaux", "emplacements": [16], "duree": 1.0}\n'
+        "ligne invalide\n"
+    )
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["flux", "--fichier", str(evenements)])
+    assert result.exit_code == 0
+    assert "Intégration du flux d'événements" in result.output
+    assert "Carte de la ville" in result.output
+
+    result = runner.invoke(
+        app, ["flux"], input='{"type": "bouchon", "depart": 1, "arrivee": 3, "duree": 2.0}\n'
+    )
+    assert result.exit_code == 0
+    assert "Lots publiés" in result.output
+
+
+def test_journal_1(tmp_path):
+    runner = CliRunner()
+    dossier = str(tmp_path / "journal")
+
+    result = runner.invoke(
+        app, ["--journal", dossier, "bouchons", "1", "2", "3"], input="n\n"
+    )
+    assert result.exit_code == 0
+    assert os.path.exists(os.path.join(dossier, "journal.jsonl"))
+
+    result = runner.invoke(app, ["routes"], env={"TAXIDRIVER_JOURNAL": dossier})
+    assert result.exit_code == 0
+    assert "8.0 min" in result.output
+
+
+def test_oracle_1(tmp_path):
+    runner = CliRunner()
+    fichier = str(tmp_path / "oracle.bin")
+    result = runner.invoke(app, ["oracle", "--fichier", fichier])
+    assert result.exit_code == 0
+    assert "Oracle des durées de trajet" in result.output
+    assert os.path.exists(fichier)
+
+    result = runner.invoke(app, ["duree", "3", "5", "--oracle", fichier])
+    assert result.exit_code == 0
+    assert "Le trajet le plus court entre 3 et 5 dure" in result.output
+
+    result = runner.invoke(app, ["duree", "3", "99"])
+    assert result.exit_code == 0
+    assert "n'est pas un emplacement valide" in result.output
+
+
+def test_export_1(tmp_path):
+    runner = CliRunner()
+    fichier = str(tmp_path / "routes.jsonl")
+    result = runner.invoke(app, ["export", "routes", fichier])
+    assert result.exit_code == 0
+    assert "lignes exportées" in result.output
+    assert os.path.exists(fichier)
+
+    fichier = str(tmp_path / "trajets.npz")
+    result = runner.invoke(app, ["export", "trajets", fichier], input="1 16\n2,9\n")
+    assert result.exit_code == 0
+    assert "2 lignes exportées" in result.output
+
+    result = runner.invoke(app, ["export", "trajets", fichier], input="1 99\n")
+    assert "n'est pas un emplacement valide" in result.output
+    result = runner.invoke(app, ["export", "inconnue", fichier])
+    assert result.exit_code == 1
+
+
+def _duree_route(sortie: str, depart: int, arrivee: int) -> list[str]:
+    """Durées affichées pour la route `depart`-`arrivee` dans les tableaux de la sortie."""
+    return re.findall(rf"│ {depart} +│ {arrivee} +│ ([0-9.]+) min", sortie)
+
+
+def test_shell_1():
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        ["shell"],
+        input="trajet 2 8\nbouchons 1 2 4\nroutes\nannule\nroutes\ntrajet 2 99\ninconnue\nquitte\n",
+    )
+    assert result.exit_code == 0
+    assert result.output.count(":stopwatch:") + result.output.count("⏱") == 6
+    assert "Voulez-vous recalculer" not in result.output
+    # la carte peut déjà avoir été modifiée par les tests précédents
+    apres, _, avant = map(float, _duree_route(result.output, 1, 2))
+    assert apres == avant + 4
+    assert "Dernière modification annulée" in result.output
+    assert "n'est pas un emplacement valide" in result.output
+    assert "Commande inconnue : inconnue" in result.output
+
+    result = runner.invoke(app, ["routes"])
+    assert _duree_route(result.output, 1, 2) == [str(avant)]
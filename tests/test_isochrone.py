@@ -0,0 +1,63 @@
+"""Description.
+Tests unitaires du module `libisochrone`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+import networkx as nx
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    _convertit_en_nx,
+    DureeNegative,
+    EmplacementInconnu,
+)
+from source.libisochrone import isochrone, isochrones, zones_isochrones
+
+
+def test_isochrone_1():
+    assert isochrone(Emplacement(1), 4.0, CARTE_VILLE) == {
+        Emplacement(1): 0,
+        Emplacement(4): 4.0,
+    }
+    assert isochrone(Emplacement(1), 0, CARTE_VILLE) == {Emplacement(1): 0}
+
+
+@pytest.mark.parametrize("budget", [3.0, 7.5, 12.0, 100.0])
+def test_isochrone_2(budget):
+    attendu = nx.single_source_dijkstra_path_length(
+        _convertit_en_nx(CARTE_VILLE), Emplacement(9), cutoff=budget, weight="duree"
+    )
+    assert isochrone(Emplacement(9), budget, CARTE_VILLE) == attendu
+
+
+def test_isochrones_plusieurs_durees():
+    zones = isochrones(Emplacement(1), [12.0, 4.0, 6.0], CARTE_VILLE)
+    assert list(zones) == [12.0, 4.0, 6.0]
+    assert set(zones[4.0]) <= set(zones[6.0]) <= set(zones[12.0])
+    for budget, atteints in zones.items():
+        assert atteints == isochrone(Emplacement(1), budget, CARTE_VILLE)
+    bandes = zones_isochrones(zones)
+    assert bandes[Emplacement(4)] == 4.0
+    assert bandes[Emplacement(2)] == 6.0
+    assert bandes[Emplacement(8)] == 12.0
+
+
+def test_isochrone_composante():
+    e_1, e_2, e_3 = Emplacement(1), Emplacement(2), Emplacement(3)
+    ville = Ville(emplacements=[e_1, e_2, e_3], arretes=[(e_1, e_2, 2.0)])
+    assert isochrone(e_1, 50.0, ville) == {e_1: 0, e_2: 2.0}
+
+
+def test_isochrone_erreurs():
+    with pytest.raises(EmplacementInconnu):
+        isochrone(Emplacement(18), 5.0, CARTE_VILLE)
+    with pytest.raises(DureeNegative):
+        isochrone(Emplacement(1), -5.0, CARTE_VILLE)
+    with pytest.raises(ValueError):
+        isochrones(Emplacement(1), [], CARTE_VILLE)
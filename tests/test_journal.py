@@ -0,0 +1,131 @@
+"""Description.
+Tests unitaires du module `libjournal`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from source.libtaxi import Emplacement, Ville, CARTE_VILLE, genere_bouchons, genere_travaux
+from source.libflux import Evenement
+from source.libjournal import (
+    Journal,
+    JournalCorrompu,
+    applique,
+    ecrit_instantane,
+    lit_instantane,
+)
+
+BOUCHON = Evenement("bouchon", (Emplacement(1), Emplacement(2)), 3.0)
+FLUIDIFICATION = Evenement("fluidification", (Emplacement(1), Emplacement(2)), 1.0)
+TRAVAUX = Evenement("travaux", (Emplacement(3), Emplacement(16)), 2.0)
+
+
+def _modifie(journal: Journal, ville, evenements):
+    for evenement in evenements:
+        ville = applique(evenement, ville)
+        journal.ajoute(evenement, ville)
+    return ville
+
+
+def test_applique():
+    attendu = genere_bouchons(Emplacement(1), Emplacement(2), -1.0, CARTE_VILLE)
+    assert applique(FLUIDIFICATION, CARTE_VILLE) == attendu
+    attendu = genere_travaux([Emplacement(3), Emplacement(16)], 2.0, CARTE_VILLE)
+    assert applique(TRAVAUX, CARTE_VILLE) == attendu
+
+
+def test_instantane(tmp_path):
+    chemin = str(tmp_path / "ville.bin")
+    ville = applique(TRAVAUX, CARTE_VILLE)
+    ecrit_instantane(chemin, ville, 42)
+    numero, relue = lit_instantane(chemin)
+    assert numero == 42
+    assert relue == ville
+    assert relue.version != ville.version
+    assert not relue.figee
+
+
+def test_instantane_corrompu(tmp_path):
+    chemin = tmp_path / "ville.bin"
+    ecrit_instantane(str(chemin), CARTE_VILLE, 1)
+    contenu = bytearray(chemin.read_bytes())
+    contenu[-1] ^= 0xFF
+    chemin.write_bytes(bytes(contenu))
+    with pytest.raises(JournalCorrompu):
+        lit_instantane(str(chemin))
+    chemin.write_bytes(b"")
+    with pytest.raises(JournalCorrompu):
+        lit_instantane(str(chemin))
+    chemin.write_bytes(b"pas un instantane de ville")
+    with pytest.raises(JournalCorrompu):
+        lit_instantane(str(chemin))
+
+
+def test_journal_rejeu(tmp_path):
+    journal = Journal(str(tmp_path))
+    ville = _modifie(journal, journal.charge(CARTE_VILLE), [BOUCHON, TRAVAUX])
+    assert not os.path.exists(journal.chemin_instantane)
+
+    nouveau = Journal(str(tmp_path))
+    assert nouveau.charge(CARTE_VILLE) == ville
+    assert nouveau.numero == 2
+
+
+def test_journal_compaction(tmp_path):
+    journal = Journal(str(tmp_path), compaction=2)
+    ville = journal.charge(CARTE_VILLE)
+    ville = _modifie(journal, ville, [BOUCHON, TRAVAUX, FLUIDIFICATION])
+    assert journal.numero_instantane == 2
+    with open(journal.chemin_journal) as fichier:
+        assert len(fichier.readlines()) == 1
+
+    nouveau = Journal(str(tmp_path), compaction=2)
+    assert nouveau.charge(CARTE_VILLE) == ville
+    assert (nouveau.numero_instantane, nouveau.numero) == (2, 3)
+
+
+def test_journal_coordonnees(tmp_path):
+    """L'instantané ne stocke pas les coordonnées : elles sont reprises de la ville initiale."""
+    initiale = Ville(
+        emplacements=CARTE_VILLE.emplacements,
+        arretes=CARTE_VILLE.arretes,
+        coordonnees={e: (float(e.nom), 0.0) for e in CARTE_VILLE.emplacements},
+    )
+    journal = Journal(str(tmp_path), compaction=1)
+    _modifie(journal, journal.charge(initiale), [BOUCHON])
+    assert Journal(str(tmp_path)).charge(initiale).coordonnees == initiale.coordonnees
+
+
+def test_journal_compaction_interrompue(tmp_path):
+    """Les modifications déjà présentes dans l'instantané ne sont pas rejouées."""
+    journal = Journal(str(tmp_path))
+    ville = _modifie(journal, journal.charge(CARTE_VILLE), [BOUCHON, TRAVAUX])
+    ecrit_instantane(journal.chemin_instantane, ville, journal.numero)
+    assert Journal(str(tmp_path)).charge(CARTE_VILLE) == ville
+
+
+def test_journal_ligne_incomplete(tmp_path):
+    journal = Journal(str(tmp_path))
+    ville = _modifie(journal, journal.charge(CARTE_VILLE), [BOUCHON])
+    with open(journal.chemin_journal, "a") as fichier:
+        fichier.write('{"numero": 2, "type": "trav')
+
+    nouveau = Journal(str(tmp_path))
+    assert nouveau.charge(CARTE_VILLE) == ville
+    ville = _modifie(nouveau, ville, [TRAVAUX])
+    assert Journal(str(tmp_path)).charge(CARTE_VILLE) == ville
+
+
+def test_journal_corrompu(tmp_path):
+    journal = Journal(str(tmp_path))
+    with open(journal.chemin_journal, "w") as fichier:
+        fichier.write('{"numero": 1, "type": "bouchon", "depart": 1, "arrivee": 16, "duree": 1}\n')
+    with pytest.raises(JournalCorrompu):
+        journal.charge(CARTE_VILLE)
+    with open(journal.chemin_journal, "w") as fichier:
+        fichier.write("pas du json\n")
+    with pytest.raises(JournalCorrompu):
+        journal.charge(CARTE_VILLE)
@@ -0,0 +1,89 @@
+"""Description.
+Tests unitaires du module `liboracle`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    EmplacementInconnu,
+    PasDeChemin,
+    genere_bouchons,
+    genere_travaux,
+)
+from source.liboracle import OracleCorrompu, charge_oracle, construit_oracle
+from tests.outils import paires_aleatoires, verifie_accord, ville_aleatoire
+
+
+def _verifie_accord(ville: Ville, graine: int, nombre: int = 200):
+    """Compare l'oracle à determine_trajet sur des paires d'emplacements tirées au hasard."""
+    oracle = construit_oracle(ville)
+    verifie_accord(ville, duree=oracle.duree, paires=paires_aleatoires(ville, graine, nombre))
+
+
+def test_oracle_carte_ville():
+    _verifie_accord(CARTE_VILLE, graine=0)
+    oracle = construit_oracle(CARTE_VILLE)
+    assert oracle.duree(Emplacement(1), Emplacement(12)) == 17.0
+    assert oracle.duree(Emplacement(5), Emplacement(5)) == 0.0
+    with pytest.raises(EmplacementInconnu):
+        oracle.duree(Emplacement(1), Emplacement(99))
+
+
+def test_oracle_bouchons():
+    ville = genere_bouchons(Emplacement(1), Emplacement(4), 10.0, CARTE_VILLE)
+    _verifie_accord(ville, graine=1)
+
+
+def test_oracle_travaux():
+    ville = genere_travaux([Emplacement(5), Emplacement(10)], 4.0, CARTE_VILLE)
+    _verifie_accord(ville, graine=2)
+    ville = ville_aleatoire(3, n=40, m=70)
+    ville = genere_travaux(ville.emplacements[::7], 3.0, ville)
+    _verifie_accord(ville, graine=3)
+
+
+@pytest.mark.parametrize("graine", range(5))
+def test_oracle_villes_aleatoires(graine):
+    # 70 routes pour 40 emplacements : certaines villes ne sont pas connexes
+    _verifie_accord(ville_aleatoire(graine, n=40, m=70), graine=graine)
+
+
+def test_oracle_etiquettes_triees():
+    oracle = construit_oracle(ville_aleatoire(7, n=40, m=70))
+    for i in range(len(oracle)):
+        hubs = oracle.hubs[oracle.debuts[i] : oracle.debuts[i + 1]]
+        assert list(hubs) == sorted(set(hubs))
+    memoire = oracle.memoire()
+    assert memoire["emplacements"] == 40
+    assert memoire["etiquettes"] == len(oracle.hubs)
+    assert memoire["octets"] == 8 * 40 + 8 * 41 + 12 * memoire["etiquettes"]
+
+
+def test_oracle_sauvegarde(tmp_path):
+    chemin = str(tmp_path / "oracle.bin")
+    ville = ville_aleatoire(3, n=40, m=70)
+    oracle = construit_oracle(ville)
+    oracle.sauvegarde(chemin)
+    relu = charge_oracle(chemin)
+    assert relu.memoire() == oracle.memoire()
+    for depart in ville.emplacements[:10]:
+        for arrivee in ville.emplacements:
+            try:
+                assert relu.duree(depart, arrivee) == oracle.duree(depart, arrivee)
+            except PasDeChemin:
+                pass
+
+    with open(chemin, "r+b") as fichier:
+        fichier.seek(-1, os.SEEK_END)
+        dernier = fichier.read(1)[0]
+        fichier.seek(-1, os.SEEK_END)
+        fichier.write(bytes([dernier ^ 0xFF]))
+    with pytest.raises(OracleCorrompu):
+        charge_oracle(chemin)
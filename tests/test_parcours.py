@@ -0,0 +1,124 @@
+"""Description.
+Tests unitaires du module `libparcours`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    PasDeChemin,
+    determine_trajet,
+    duree_trajet,
+    genere_travaux,
+)
+from source.libcriticite import _adjacence, _distances
+from source.libdifferentiel import ville_aleatoire
+from source import libparcours as lp
+from source.libparcours import (
+    GrapheCSR,
+    arbre_delta,
+    banc_essai,
+    chemin,
+    distances_delta,
+    graphe_csr,
+    ville_quadrillage,
+)
+
+
+def _reference(ville: Ville, source: int) -> np.ndarray:
+    distances = np.asarray(_distances(_adjacence(ville), source))
+    distances[np.isfinite(distances)] += ville._penalites.get(source, 0.0)
+    distances[source] = 0.0
+    return distances
+
+
+def test_graphe_csr():
+    graphe = GrapheCSR(CARTE_VILLE)
+    assert len(graphe) == 16
+    assert len(graphe.routes.voisins) == 2 * len(CARTE_VILLE.arretes)
+    assert np.all(np.diff(graphe.routes.debuts) >= 0)
+    assert graphe_csr(CARTE_VILLE) is graphe_csr(CARTE_VILLE)
+    ville = genere_travaux([Emplacement(nom=3)], 2.0, CARTE_VILLE)
+    assert graphe_csr(ville) is not graphe_csr(CARTE_VILLE)
+
+
+def test_distances_carte():
+    ville = genere_travaux([Emplacement(nom=5), Emplacement(nom=1)], 2.0, CARTE_VILLE)
+    graphe = graphe_csr(ville)
+    for i in range(len(graphe)):
+        distances = distances_delta(graphe, i)
+        for j in range(len(graphe)):
+            if i != j:
+                depart = Emplacement(nom=int(graphe.noms[i]))
+                arrivee = Emplacement(nom=int(graphe.noms[j]))
+                attendu = duree_trajet(determine_trajet(depart, arrivee, ville), ville)
+                assert distances[j] == pytest.approx(attendu)
+
+
+@pytest.mark.parametrize("graine", range(20))
+@pytest.mark.parametrize("largeur", [0.1, 1.0, 10.0])
+def test_distances_aleatoires(graine, largeur):
+    ville = ville_aleatoire(graine)
+    graphe = graphe_csr(ville)
+    for i in range(len(graphe)):
+        distances = distances_delta(graphe, i, largeur * graphe.delta_defaut())
+        np.testing.assert_allclose(distances, _reference(ville, i))
+
+
+def test_distances_fils(monkeypatch):
+    monkeypatch.setattr(lp, "MORCEAU_FILS", 2)
+    ville = ville_quadrillage(20, graine=3)
+    graphe = graphe_csr(ville)
+    for source in (0, 210):
+        np.testing.assert_allclose(
+            distances_delta(graphe, source, fils=3), _reference(ville, source)
+        )
+
+
+def test_distances_limite():
+    ville = ville_aleatoire(5, emplacements=20, composantes=1)
+    graphe = graphe_csr(ville)
+    reference = _reference(ville, 0)
+    limite = float(np.median(reference))
+    distances = distances_delta(graphe, 0, limite=limite)
+    proches = reference <= limite
+    np.testing.assert_allclose(distances[proches], reference[proches])
+    assert np.all(np.isinf(distances[~proches]))
+
+
+def test_delta_invalide():
+    with pytest.raises(ValueError):
+        distances_delta(graphe_csr(CARTE_VILLE), 0, delta=0.0)
+
+
+@pytest.mark.parametrize("graine", range(10))
+def test_arbre_delta(graine):
+    ville = ville_aleatoire(graine)
+    graphe = graphe_csr(ville)
+    durees = {(u.nom, v.nom): d for u, v, d in ville.arretes}
+    durees.update({(v, u): d for (u, v), d in list(durees.items())})
+    distances, predecesseurs = arbre_delta(graphe, 0)
+    for j in range(1, len(graphe)):
+        if np.isinf(distances[j]):
+            with pytest.raises(PasDeChemin):
+                chemin(predecesseurs, 0, j)
+            continue
+        etapes = [int(graphe.noms[k]) for k in chemin(predecesseurs, 0, j)]
+        total = sum(durees[u, v] for u, v in zip(etapes, etapes[1:]))
+        total += sum(ville._penalites.get(k, 0.0) for k in chemin(predecesseurs, 0, j))
+        assert total == pytest.approx(distances[j])
+
+
+def test_banc_essai():
+    mesures = banc_essai([5, 8], largeurs=[0.5, 2.0], fils=[1, 2], sources=2)
+    assert len(mesures) == 2 * (1 + 2 * 2)
+    assert all(mesure.accord for mesure in mesures)
+    assert [m.methode for m in mesures[:5]] == ["tas"] + ["delta"] * 4
+    assert mesures[0].emplacements == 25 and mesures[-1].emplacements == 64
@@ -0,0 +1,76 @@
+"""Description.
+Tests unitaires du module `libregion`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    EmplacementInconnu,
+    MemeEmplacement,
+    determine_trajet,
+    duree_trajet,
+    genere_travaux,
+)
+from source.libregion import RoutageRegional, partitionne, ville_region
+from tests.outils import verifie_accord, ville_aleatoire
+
+
+def _verifie_accord(routage: RoutageRegional, ville: Ville):
+    """Les trajets régionaux ont la durée des trajets calculés sur la ville entière."""
+    verifie_accord(ville, chemin=routage.determine_trajet)
+
+
+@pytest.mark.parametrize("regions", [1, 2, 4, 16])
+def test_partition(regions):
+    partition = partitionne(CARTE_VILLE, regions)
+    assert len(partition.regions) == regions
+    assert sorted(e.nom for region in partition.regions for e in region) == sorted(
+        e.nom for e in CARTE_VILLE.emplacements
+    )
+    for depart, arrivee, _ in partition.routes_frontieres:
+        assert depart in partition.frontieres[partition.appartenance[depart.nom]]
+        assert arrivee in partition.frontieres[partition.appartenance[arrivee.nom]]
+    routes_internes = sum(
+        len(ville_region(CARTE_VILLE, partition, r).arretes) for r in range(regions)
+    )
+    assert routes_internes + len(partition.routes_frontieres) == len(CARTE_VILLE.arretes)
+
+
+@pytest.mark.parametrize("regions", [1, 2, 3, 4, 16])
+def test_routage_carte_ville(regions):
+    _verifie_accord(RoutageRegional(CARTE_VILLE, regions, processus=False), CARTE_VILLE)
+
+
+@pytest.mark.parametrize("graine", range(3))
+def test_routage_villes_aleatoires(graine):
+    # certaines villes aléatoires ne sont pas connexes
+    ville = ville_aleatoire(graine)
+    _verifie_accord(RoutageRegional(ville, regions=4, processus=False), ville)
+
+
+def test_routage_travaux():
+    ville = ville_aleatoire(4)
+    ville = genere_travaux(ville.emplacements[::3], 5.0, ville)
+    _verifie_accord(RoutageRegional(ville, regions=4, processus=False), ville)
+
+
+def test_routage_erreurs():
+    routage = RoutageRegional(CARTE_VILLE, regions=2, processus=False)
+    with pytest.raises(EmplacementInconnu):
+        routage.determine_trajet(Emplacement(1), Emplacement(99))
+    with pytest.raises(MemeEmplacement):
+        routage.determine_trajet(Emplacement(1), Emplacement(1))
+
+
+def test_routage_processus():
+    with RoutageRegional(CARTE_VILLE, regions=3) as routage:
+        itineraire = routage.determine_trajet(Emplacement(1), Emplacement(12))
+        attendu = determine_trajet(Emplacement(1), Emplacement(12), CARTE_VILLE)
+        assert duree_trajet(itineraire, CARTE_VILLE) == duree_trajet(attendu, CARTE_VILLE)
@@ -0,0 +1,93 @@
+"""Description.
+Tests unitaires du module `libroutage`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    EmplacementInconnu,
+    MemeEmplacement,
+    genere_travaux,
+)
+from source.libroutage import (
+    TableCorrompue,
+    charge_table,
+    construit_table,
+    type_cases,
+)
+from tests.outils import verifie_accord, ville_aleatoire
+
+
+def _verifie_accord(table, ville: Ville):
+    verifie_accord(ville, duree=table.duree, chemin=table.chemin)
+
+
+def test_type_cases():
+    assert type_cases(16) == "h"
+    assert type_cases(32767) == "h"
+    assert type_cases(32768) == "i"
+
+
+def test_table_carte_ville():
+    table = construit_table(CARTE_VILLE)
+    _verifie_accord(table, CARTE_VILLE)
+    assert table.memoire()["matrice"] == 2 * 16 * 16
+    with pytest.raises(EmplacementInconnu):
+        table.chemin(Emplacement(1), Emplacement(99))
+    with pytest.raises(MemeEmplacement):
+        table.duree(Emplacement(1), Emplacement(1))
+
+
+@pytest.mark.parametrize("graine", range(3))
+def test_table_villes_aleatoires(graine):
+    ville = ville_aleatoire(graine)
+    _verifie_accord(construit_table(ville), ville)
+
+
+def test_table_travaux(tmp_path):
+    ville = ville_aleatoire(2)
+    ville = genere_travaux(ville.emplacements[::5], 6.0, ville)
+    table = construit_table(ville)
+    _verifie_accord(table, ville)
+    chemin = str(tmp_path / "table.bin")
+    table.sauvegarde(chemin)
+    with charge_table(chemin) as relue:
+        _verifie_accord(relue, ville)
+
+
+def test_table_processus():
+    ville = ville_aleatoire(5)
+    assert list(construit_table(ville, processus=3).suivants) == list(
+        construit_table(ville).suivants
+    )
+
+
+@pytest.mark.parametrize("projection", [True, False])
+def test_table_sauvegarde(tmp_path, projection):
+    chemin = str(tmp_path / "table.bin")
+    ville = ville_aleatoire(1)
+    construit_table(ville).sauvegarde(chemin)
+    with charge_table(chemin, projection=projection) as table:
+        _verifie_accord(table, ville)
+        assert isinstance(table.suivants, memoryview) == projection
+
+
+def test_table_corrompue(tmp_path):
+    chemin = tmp_path / "table.bin"
+    construit_table(CARTE_VILLE).sauvegarde(str(chemin))
+    contenu = bytearray(chemin.read_bytes())
+    contenu[-1] ^= 0xFF
+    chemin.write_bytes(bytes(contenu))
+    with pytest.raises(TableCorrompue):
+        charge_table(str(chemin))
+    charge_table(str(chemin), verifie=False).fermer()
+    chemin.write_bytes(bytes(contenu[:-2]))
+    with pytest.raises(TableCorrompue):
+        charge_table(str(chemin), verifie=False)
@@ -0,0 +1,128 @@
+"""Description.
+Tests unitaires du module `libspatial` et des coordonnées des emplacements.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import copy
+import math
+import random
+import numpy as np
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    CARTE_VILLE,
+    _heuristique,
+    determine_trajet,
+    duree_trajet,
+    genere_bouchons,
+)
+from source.libspatial import IndexSpatial
+from source.libparcours import ville_quadrillage
+
+
+def test_coordonnees_ville():
+    ville = ville_quadrillage(3, coordonnees=True)
+    assert len(ville.coordonnees) == 9
+    assert CARTE_VILLE.coordonnees == {}
+    # les modifications de la carte conservent les coordonnées
+    bouchee = genere_bouchons(Emplacement(nom=0), Emplacement(nom=1), 2.0, ville)
+    assert bouchee.coordonnees == ville.coordonnees
+    assert copy.deepcopy(ville).coordonnees == ville.coordonnees
+    ville.arretes = ville.arretes[:-1]
+    assert len(ville.coordonnees) == 9
+
+
+def test_coordonnees_emplacement_inconnu():
+    with pytest.raises(ValueError):
+        Ville(
+            emplacements=[Emplacement(nom=1)],
+            arretes=[],
+            coordonnees={Emplacement(nom=2): (0.0, 0.0)},
+        )
+
+
+def test_heuristique_admissible():
+    """L'heuristique ne surestime jamais la durée restante."""
+    ville = ville_quadrillage(5, coordonnees=True)
+    heuristique = _heuristique(ville)
+    arrivee = Emplacement(nom=24)
+    for depart in ville.emplacements[:-1]:
+        duree = duree_trajet(determine_trajet(depart, arrivee, ville), ville)
+        assert heuristique(depart, arrivee) <= duree + 1e-9
+
+
+def test_heuristique_coordonnees_partielles():
+    ville = ville_quadrillage(3, coordonnees=True)
+    partielle = Ville(
+        emplacements=ville.emplacements,
+        arretes=ville.arretes,
+        coordonnees=dict(list(ville.coordonnees.items())[:4]),
+    )
+    assert _heuristique(partielle) is None
+    assert _heuristique(CARTE_VILLE) is None
+
+
+def test_astar_accord():
+    """A* trouve des trajets de même durée que Bellman-Ford sur la ville sans coordonnées."""
+    ville = ville_quadrillage(6, graine=3, coordonnees=True)
+    sans_coordonnees = Ville(emplacements=ville.emplacements, arretes=ville.arretes)
+    generateur = random.Random(1)
+    for _ in range(40):
+        depart, arrivee = generateur.sample(ville.emplacements, 2)
+        assert duree_trajet(
+            determine_trajet(depart, arrivee, ville), ville
+        ) == pytest.approx(
+            duree_trajet(
+                determine_trajet(depart, arrivee, sans_coordonnees), sans_coordonnees
+            )
+        )
+
+
+def test_plus_proches_force_brute():
+    ville = ville_quadrillage(12, graine=5, coordonnees=True)
+    index = IndexSpatial(ville)
+    generateur = np.random.default_rng(0)
+    points = generateur.uniform(-3.0, 15.0, size=(500, 2))
+    noms, distances = index.plus_proches(points)
+
+    emplacements = list(ville.coordonnees)
+    positions = np.array([ville.coordonnees[e] for e in emplacements])
+    toutes = np.hypot(*(points[:, None, :] - positions[None, :, :]).transpose(2, 0, 1))
+    assert np.allclose(distances, toutes.min(axis=1))
+    attendus = np.array([e.nom for e in emplacements])[toutes.argmin(axis=1)]
+    assert (noms == attendus).all()
+
+
+def test_plus_proche_cas_limites():
+    aligne = Ville(
+        emplacements=[Emplacement(nom=i) for i in range(4)],
+        arretes=[],
+        coordonnees={Emplacement(nom=i): (float(i), 0.0) for i in range(4)},
+    )
+    index = IndexSpatial(aligne)
+    assert index.plus_proche(2.2, 5.0) == Emplacement(nom=2)
+    assert index.plus_proche(-10.0, 0.0) == Emplacement(nom=0)
+    noms, distances = index.plus_proches(np.empty((0, 2)))
+    assert len(noms) == len(distances) == 0
+
+    unique = Ville(
+        emplacements=[Emplacement(nom=7)],
+        arretes=[],
+        coordonnees={Emplacement(nom=7): (1.0, 1.0)},
+    )
+    assert IndexSpatial(unique).plus_proche(4.0, 5.0) == Emplacement(nom=7)
+    with pytest.raises(ValueError):
+        IndexSpatial(CARTE_VILLE)
+
+
+def test_plus_proches_distance():
+    ville = ville_quadrillage(4, coordonnees=True)
+    _, distances = IndexSpatial(ville).plus_proches(np.array([[100.0, 100.0]]))
+    assert distances[0] == pytest.approx(
+        min(math.dist((100.0, 100.0), p) for p in ville.coordonnees.values())
+    )
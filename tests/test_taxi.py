@@ -7,8 +7,13 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import copy
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import matplotlib
+import numpy as np
 import networkx as nx
 from source.libtaxi import (
     Emplacement,
@@ -20,10 +25,16 @@ from source.libtaxi import (
     determine_trajet,
     genere_bouchons,
     genere_travaux,
+    genere_modifications,
+    matrice_durees,
+    duree_trajet,
     CARTE_VILLE,
+    CacheTrajets,
     EmplacementInconnu,
     MemeEmplacement,
     PasDeChemin,
+    ArreteInexistante,
+    DureeNegative,
 )
 
 matplotlib.use("Agg")  # backend graph
@@ -60,6 +71,89 @@ def test_emplacement_2():
     )
 
 
+def test_emplacement_3():
+    assert Emplacement(4) is Emplacement(nom=4)
+    assert not hasattr(Emplacement(4), "__dict__")
+    assert pickle.loads(pickle.dumps(Emplacement(4))) is Emplacement(4)
+    with pytest.raises(ValueError):
+        Emplacement(-2)
+
+
+def test_emplacement_interne_immuable():
+    emplacement = Emplacement(7)
+    assert Emplacement(np.int64(7)) is emplacement
+    assert type(emplacement.nom) is int
+    with pytest.raises(TypeError):
+        Emplacement(nom=7.0)
+    assert emplacement.nom == 7 and str(emplacement) == "7"
+
+
+def test_emplacement_fils():
+    barriere = threading.Barrier(8)
+
+    def cree(_):
+        barriere.wait()
+        return [Emplacement(nom) for nom in range(5000, 5200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executeur:
+        resultats = list(executeur.map(cree, range(8)))
+    for resultat in resultats[1:]:
+        assert all(a is b for a, b in zip(resultat, resultats[0]))
+
+
+def test_ville_routes_multiples():
+    ville = Ville(
+        emplacements=[Emplacement(1), Emplacement(2), Emplacement(3)],
+        arretes=[
+            (Emplacement(1), Emplacement(2), 4.0),
+            (Emplacement(2), Emplacement(3), 1.0),
+            (Emplacement(2), Emplacement(1), 2.5),
+            (Emplacement(1), Emplacement(2), 3.0),
+        ],
+    )
+    assert ville.arretes == [
+        (Emplacement(1), Emplacement(2), 2.5),
+        (Emplacement(2), Emplacement(3), 1.0),
+    ]
+    assert _convertit_en_nx(ville)[Emplacement(1)][Emplacement(2)]["duree"] == 2.5
+
+
+def test_ville_listes_lecture_seule():
+    ville = Ville(
+        emplacements=[Emplacement(1), Emplacement(2)],
+        arretes=[(Emplacement(1), Emplacement(2), 3.0)],
+    )
+    with pytest.raises(TypeError):
+        ville.arretes[0] = (Emplacement(1), Emplacement(2), 1.0)
+    with pytest.raises(TypeError):
+        ville.emplacements.append(Emplacement(3))
+    assert ville.arretes == [(Emplacement(1), Emplacement(2), 3.0)]
+    assert ville.emplacements + [Emplacement(3)] == [Emplacement(i) for i in (1, 2, 3)]
+    copie = pickle.loads(pickle.dumps(ville.emplacements))
+    copie.append(Emplacement(3))
+    assert len(ville.emplacements) == 2
+
+
+def test_ville_compacte():
+    e_1, e_3, e_9 = Emplacement(1), Emplacement(3), Emplacement(900)
+    ville = Ville(
+        emplacements=[e_1, e_3, e_9],
+        arretes=[(e_1, e_3, 9.0), (e_9, e_3, 2.5)],
+    )
+    assert ville.emplacements == [e_1, e_3, e_9]
+    assert ville.arretes == [(e_1, e_3, 9.0), (e_9, e_3, 2.5)]
+    assert list(ville._topologie.depart) == [0, 2]
+    assert list(ville._topologie.arrivee) == [1, 1]
+    assert e_9 in ville and Emplacement(2) not in ville
+    assert copy.deepcopy(ville) == ville
+    assert pickle.loads(pickle.dumps(ville)) == ville
+
+    ville.arretes = [(e_1, e_9, 1.0)]
+    assert ville.arretes == [(e_1, e_9, 1.0)]
+    with pytest.raises(ValueError):
+        ville.arretes = [(e_1, Emplacement(2), 1.0)]
+
+
 def test_itineraire_1():
     with pytest.raises(ValueError):
         Itineraire(etapes=[Emplacement(1), Emplacement(1)])
@@ -133,6 +227,13 @@ def test_graphe_3():
     assert isinstance(resultat, nx.Graph)
 
 
+def test_graphe_4():
+    ville = CARTE_VILLE
+    isochrone = {Emplacement(1): 4.0, Emplacement(4): 4.0, Emplacement(2): 6.0}
+    resultat = carte_graphe(ville=ville, isochrone=isochrone)
+    assert isinstance(resultat, nx.Graph)
+
+
 def test_trajet_1():
     e_1, e_2, e_5 = Emplacement(1), Emplacement(2), Emplacement(5)
     ville = Ville(
@@ -169,4 +270,154 @@ def test_bouchons_1():
     genere_bouchons(depart=e_1, arrivee=e_8, ville=ville, duree=8)
 
 
+def test_bouchons_2():
+    e_1, e_2, e_8 = Emplacement(1), Emplacement(2), Emplacement(8)
+    ville = Ville(
+        emplacements=[e_1, e_2, e_8], arretes=[(e_1, e_2, 4.0), (e_1, e_8, 4.0)]
+    )
+    nouvelle_ville = genere_bouchons(depart=e_8, arrivee=e_1, ville=ville, duree=-1.5)
+    assert nouvelle_ville.arretes == [(e_1, e_2, 4.0), (e_1, e_8, 2.5)]
+    assert ville.arretes == [(e_1, e_2, 4.0), (e_1, e_8, 4.0)]
+    with pytest.raises(ArreteInexistante):
+        genere_bouchons(depart=e_2, arrivee=e_8, ville=ville, duree=1.0)
+    with pytest.raises(DureeNegative):
+        genere_bouchons(depart=e_1, arrivee=e_2, ville=ville, duree=-4.0)
+
+
 ##### Tests unitaires sur l'implémentation des travaux à faire
+
+
+def test_travaux_1():
+    e_1, e_2, e_3 = Emplacement(1), Emplacement(2), Emplacement(3)
+    ville = Ville(
+        emplacements=[e_1, e_2, e_3], arretes=[(e_1, e_2, 4.0), (e_2, e_3, 1.0)]
+    )
+    nouvelle_ville = genere_travaux(emplacements=[e_1, e_2], duree=2.0, ville=ville)
+    # les routes ne sont pas modifiées : les travaux sont des pénalités de passage
+    assert nouvelle_ville.arretes == ville.arretes
+    assert nouvelle_ville.travaux == {e_1: 2.0, e_2: 2.0}
+    assert nouvelle_ville._duree is ville._duree
+    assert ville.travaux == {}
+    assert genere_travaux([e_2], 1.0, nouvelle_ville).travaux == {e_1: 2.0, e_2: 3.0}
+
+
+def test_travaux_2():
+    """Chaque emplacement en travaux traversé est compté une seule fois, départ et arrivée compris."""
+    e_1, e_2, e_3, e_4 = Emplacement(1), Emplacement(2), Emplacement(3), Emplacement(4)
+    ville = Ville(
+        emplacements=[e_1, e_2, e_3, e_4],
+        arretes=[(e_1, e_2, 1.0), (e_2, e_3, 1.0), (e_1, e_4, 2.0), (e_4, e_3, 2.0)],
+    )
+    travaux = genere_travaux([e_2], 3.0, ville)
+    assert determine_trajet(e_1, e_3, travaux).etapes == [e_1, e_4, e_3]
+    assert duree_trajet(Itineraire(etapes=[e_1, e_2, e_3]), travaux) == 5.0
+    assert duree_trajet(Itineraire(etapes=[e_2, e_3]), travaux) == 4.0
+    assert matrice_durees([e_1, e_2, e_3], travaux).durees == [
+        [0, 4.0, 4.0],
+        [4.0, 0, 4.0],
+        [4.0, 4.0, 0],
+    ]
+
+    # deux emplacements voisins en travaux : chacun compté une fois
+    voisins = genere_travaux([e_1, e_2], 1.0, ville)
+    assert duree_trajet(Itineraire(etapes=[e_1, e_2, e_3]), voisins) == 4.0
+    assert voisins != ville
+    assert "travaux=" in repr(voisins)
+
+
+##### Tests unitaires sur la table des durées
+
+
+def test_matrice_durees_1():
+    e_2, e_3, e_8 = Emplacement(2), Emplacement(3), Emplacement(8)
+    table = matrice_durees([e_2, e_3, e_8], CARTE_VILLE)
+    assert table.durees == [[0, 3.0, 7.0], [3.0, 0, 10.0], [7.0, 10.0, 0]]
+    assert table.chemin(0, 2) == [e_2, Emplacement(5), e_8]
+    assert duree_trajet(Itineraire(etapes=table.chemin(1, 2)), CARTE_VILLE) == 10.0
+
+
+def test_matrice_durees_2():
+    e_1, e_2, e_5 = Emplacement(1), Emplacement(2), Emplacement(5)
+    ville = Ville(emplacements=[e_1, e_2, e_5], arretes=[(e_1, e_2, 5.0)])
+    table = matrice_durees([e_1, e_5], ville)
+    assert table.durees[0][1] == float("inf")
+    with pytest.raises(PasDeChemin):
+        table.chemin(0, 1)
+    with pytest.raises(EmplacementInconnu):
+        matrice_durees([e_1, Emplacement(18)], ville)
+
+
+##### Tests unitaires sur le cache des trajets
+
+
+def test_cache_1():
+    cache = CacheTrajets(capacite=2)
+    e_2, e_12 = Emplacement(2), Emplacement(12)
+    aller = determine_trajet(e_2, e_12, CARTE_VILLE, cache=cache)
+    assert determine_trajet(e_2, e_12, CARTE_VILLE, cache=cache) == aller
+    retour = determine_trajet(e_12, e_2, CARTE_VILLE, cache=cache)
+    assert retour.etapes == list(reversed(aller.etapes))
+    assert cache.statistiques == {
+        "succes": 2,
+        "echecs": 1,
+        "evictions": 0,
+        "taille": 1,
+        "capacite": 2,
+    }
+
+    determine_trajet(Emplacement(1), Emplacement(16), CARTE_VILLE, cache=cache)
+    determine_trajet(Emplacement(3), Emplacement(9), CARTE_VILLE, cache=cache)
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.cherche(CARTE_VILLE, e_2, e_12) is None
+
+
+def test_cache_2():
+    """Une ville modifiée ne réutilise pas les trajets de la version précédente."""
+    cache = CacheTrajets()
+    e_3, e_6 = Emplacement(3), Emplacement(6)
+    assert len(determine_trajet(e_3, e_6, CARTE_VILLE, cache=cache).etapes) == 2
+    bouchons = genere_bouchons(e_3, e_6, 20.0, CARTE_VILLE)
+    assert bouchons.version != CARTE_VILLE.version
+    assert len(determine_trajet(e_3, e_6, bouchons, cache=cache).etapes) > 2
+    assert cache.echecs == 2
+
+    cache.invalide(bouchons)
+    assert len(cache) == 1
+    cache.invalide()
+    assert len(cache) == 0
+
+
+def test_cache_3():
+    e_1, e_2, e_5 = Emplacement(1), Emplacement(2), Emplacement(5)
+    ville = Ville(emplacements=[e_1, e_2, e_5], arretes=[(e_1, e_2, 5.0)])
+    cache = CacheTrajets()
+    for _ in range(2):
+        with pytest.raises(PasDeChemin):
+            determine_trajet(depart=e_5, arrivee=e_1, ville=ville, cache=cache)
+    assert cache.succes == 1
+
+    version = ville.version
+    ville.arretes = [(e_1, e_2, 5.0), (e_2, e_5, 1.0)]
+    assert ville.version != version
+    assert determine_trajet(e_5, e_1, ville, cache=cache).etapes == [e_5, e_2, e_1]
+    assert pickle.loads(pickle.dumps(ville)).version != ville.version
+
+
+def test_modifications_1():
+    e_1, e_2, e_3 = Emplacement(1), Emplacement(2), Emplacement(3)
+    ville = Ville(
+        emplacements=[e_1, e_2, e_3], arretes=[(e_1, e_2, 4.0), (e_2, e_3, 1.0)]
+    )
+    nouvelle_ville = genere_modifications(
+        ville, bouchons={(e_2, e_1): -1.0}, travaux={e_3: 2.0, e_2: 1.0}
+    )
+    attendu = genere_travaux([e_3], 2.0, genere_travaux([e_2], 1.0, ville))
+    attendu = genere_bouchons(e_1, e_2, -1.0, attendu)
+    assert nouvelle_ville == attendu
+    with pytest.raises(DureeNegative):
+        genere_modifications(ville, bouchons={(e_2, e_3): -1.0})
+    with pytest.raises(ArreteInexistante):
+        genere_modifications(ville, bouchons={(e_1, e_3): 1.0})
+    with pytest.raises(EmplacementInconnu):
+        genere_modifications(ville, travaux={Emplacement(9): 1.0})
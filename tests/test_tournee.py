@@ -0,0 +1,135 @@
+"""Description.
+Tests unitaires du module `libtournee`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+import pytest
+from source.libtaxi import (
+    Emplacement,
+    Ville,
+    Itineraire,
+    CARTE_VILLE,
+    determine_trajet,
+    duree_trajet,
+    genere_travaux,
+    matrice_durees,
+    MemeEmplacement,
+    PasDeChemin,
+)
+from source.libtournee import SEUIL_EXACT, ordonne_tournee, _cout, _insertion_proche
+
+
+def _force_brute(depart, arrets, ville, retour):
+    durees = matrice_durees([depart, *arrets], ville).durees
+    return min(
+        _cout([0, *ordre], durees, retour)
+        for ordre in itertools.permutations(range(1, len(arrets) + 1))
+    )
+
+
+def test_tournee_simple():
+    tournee = ordonne_tournee(
+        depart=Emplacement(1),
+        arrets=[Emplacement(16), Emplacement(5)],
+        ville=CARTE_VILLE,
+    )
+    assert tournee.ordre == [Emplacement(1), Emplacement(5), Emplacement(16)]
+    assert tournee.duree == 21.0
+    assert tournee.chemin[0] == Emplacement(1)
+    assert tournee.chemin[-1] == Emplacement(16)
+
+
+@pytest.mark.parametrize("retour", [False, True])
+def test_tournee_exacte(retour):
+    arrets = [Emplacement(e) for e in (3, 8, 11, 12, 14, 16)]
+    tournee = ordonne_tournee(Emplacement(1), arrets, CARTE_VILLE, retour=retour)
+    assert tournee.duree == _force_brute(Emplacement(1), arrets, CARTE_VILLE, retour)
+    if retour:
+        assert tournee.ordre[-1] == Emplacement(1)
+
+
+@pytest.mark.parametrize("retour", [False, True])
+def test_tournee_travaux(retour):
+    """Chaque passage par un emplacement en travaux est pénalisé, un arrêt une seule fois."""
+    arrets = [Emplacement(e) for e in (3, 8, 11, 14)]
+    ville = genere_travaux([Emplacement(3), Emplacement(6)], 5.0, CARTE_VILLE)
+
+    def duree_parcours(ordre):
+        parcours = [Emplacement(1)]
+        for a, b in zip(ordre, ordre[1:]):
+            parcours += determine_trajet(a, b, ville).etapes[1:]
+        routes = sum(
+            duree_trajet(Itineraire(etapes=[a, b]), CARTE_VILLE)
+            for a, b in zip(parcours, parcours[1:])
+        )
+        return routes + sum(ville.penalite(e) for e in parcours)
+
+    tournee = ordonne_tournee(Emplacement(1), arrets, ville, retour=retour)
+    attendu = min(
+        duree_parcours([Emplacement(1), *permutation] + ([Emplacement(1)] if retour else []))
+        for permutation in itertools.permutations(arrets)
+    )
+    assert tournee.duree == pytest.approx(attendu)
+
+
+@pytest.mark.parametrize("retour", [False, True])
+def test_tournee_heuristique(retour):
+    arrets = [Emplacement(e) for e in range(2, 10)]
+    heuristique = ordonne_tournee(
+        Emplacement(1), arrets, CARTE_VILLE, retour=retour, seuil_exact=0
+    )
+    assert sorted(e.nom for e in heuristique.ordre[1:]) == sorted(
+        [e.nom for e in arrets] + ([1] if retour else [])
+    )
+    assert heuristique.duree >= _force_brute(
+        Emplacement(1), arrets, CARTE_VILLE, retour
+    )
+    assert heuristique.duree == sum(
+        matrice_durees([a, b], CARTE_VILLE).durees[0][1]
+        for a, b in zip(heuristique.ordre, heuristique.ordre[1:])
+    )
+
+
+@pytest.mark.parametrize("retour", [False, True])
+def test_tournee_heuristique_travaux(retour):
+    """Au-delà du seuil exact, le 2-opt n'aggrave jamais la tournée construite par insertion."""
+    depart = Emplacement(1)
+    arrets = [Emplacement(e) for e in range(2, 17)]
+    assert len(arrets) > SEUIL_EXACT
+    for nombre in (4, 8, 15):
+        ville = genere_travaux(arrets[:nombre:2] + [Emplacement(1)], 7.0, CARTE_VILLE)
+        tournee = ordonne_tournee(depart, arrets, ville, retour=retour)
+        table = matrice_durees([depart, *arrets], ville)
+        durees = [
+            [d - ville.penalite(table.emplacements[i]) if i else d for d in ligne]
+            for i, ligne in enumerate(table.durees)
+        ]
+        for i in range(len(durees)):
+            durees[i][i] = 0
+        insertion = _cout(_insertion_proche(durees, retour), durees, retour)
+        assert tournee.duree <= insertion + 1e-9
+        ordre = [table.emplacements.index(e) for e in tournee.ordre]
+        assert tournee.duree == pytest.approx(
+            _cout(ordre[:-1] if retour else ordre, durees, retour)
+        )
+
+
+def test_tournee_erreurs():
+    with pytest.raises(MemeEmplacement):
+        ordonne_tournee(Emplacement(1), [Emplacement(2), Emplacement(2)], CARTE_VILLE)
+    with pytest.raises(MemeEmplacement):
+        ordonne_tournee(Emplacement(1), [Emplacement(1)], CARTE_VILLE)
+    with pytest.raises(ValueError):
+        ordonne_tournee(Emplacement(1), [], CARTE_VILLE)
+
+
+def test_tournee_pas_de_chemin():
+    e_1, e_2, e_3 = Emplacement(1), Emplacement(2), Emplacement(3)
+    ville = Ville(emplacements=[e_1, e_2, e_3], arretes=[(e_1, e_2, 2.0)])
+    with pytest.raises(PasDeChemin):
+        ordonne_tournee(e_1, [e_2, e_3], ville)